@@ -0,0 +1,203 @@
+# benchmarks/_comun.py
+
+import sys
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# Ajuste de PATH para importar módulos del proyecto
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import datetime, timedelta
+from functools import lru_cache
+import cv2
+import numpy as np
+from sqlalchemy import insert
+from modulos.utilidades import engine, Session, Base, Student, Attendance, create_db_engine, DB_PROFILE
+from modulos.cache_alumnos import roster_cache
+from modulos.alumnos import render_qr_image
+
+
+@contextmanager
+def temp_database(profile: str = DB_PROFILE):
+    """
+    Crea una base de datos temporal y redirige Session hacia ella.
+
+    Los benchmarks nunca tocan base_datos/asistencia.db: al salir se restaura
+    el motor original y se borra el archivo temporal.
+
+    Args:
+        profile (str): Perfil de SQLite (ver DB_PROFILES en modulos/utilidades.py).
+
+    Yields:
+        Engine: Motor de SQLAlchemy de la base temporal.
+    """
+    tmp_dir = tempfile.TemporaryDirectory(prefix="bench_asistencia_")
+    db_path = Path(tmp_dir.name) / "bench.db"
+    bench_engine = create_db_engine(db_path, profile)
+    Base.metadata.create_all(bench_engine)
+    Session.configure(bind=bench_engine)
+    roster_cache.invalidate()
+    try:
+        yield bench_engine
+    finally:
+        Session.configure(bind=engine)
+        roster_cache.invalidate()
+        bench_engine.dispose()
+        tmp_dir.cleanup()
+
+
+def seed_students(bind, count: int, courses: int = 10, prefix: str = "B", matriculas: list = None) -> list:
+    """
+    Inserta `count` alumnos sintéticos y devuelve sus matrículas.
+
+    Args:
+        bind: Motor donde insertar.
+        count (int): Número de alumnos (se ignora si se pasan `matriculas`).
+        courses (int): Número de cursos distintos entre los que se reparten.
+        prefix (str): Prefijo de las matrículas generadas.
+        matriculas (list): Matrículas a usar en lugar de las generadas (ej: las de videos grabados).
+    """
+    if matriculas is None:
+        matriculas = [f"{prefix}{i:07d}" for i in range(count)]
+    rows = [
+        {
+            "matricula": matricula,
+            "first_name": f"Nombre{i}",
+            "last_name": f"Apellido{i}",
+            "course": f"Curso {i % courses}",
+            "qr_data": matricula,
+            "qr_color": "000000",
+            "photo_path": "",
+            "active": True,
+        }
+        for i, matricula in enumerate(matriculas)
+    ]
+    with bind.begin() as conn:
+        for start in range(0, len(rows), 5000):
+            conn.execute(insert(Student), rows[start:start + 5000])
+    return matriculas
+
+
+def seed_attendance(bind, matriculas: list, count: int, end_date=None) -> int:
+    """
+    Inserta `count` asistencias sintéticas (una por alumno y día, hacia atrás desde `end_date`).
+
+    Args:
+        bind: Motor donde insertar.
+        matriculas (list): Matrículas devueltas por seed_students (en orden, ids 1..N).
+        count (int): Número total de asistencias.
+        end_date (date): Último día con registros (por defecto, ayer).
+
+    Returns:
+        int: Número de filas insertadas.
+    """
+    end_date = end_date or (datetime.now() - timedelta(days=1)).date()
+    per_day = len(matriculas)
+    batch = []
+    with bind.begin() as conn:
+        for i in range(count):
+            day = end_date - timedelta(days=i // per_day)
+            index = i % per_day
+            time_stamp = datetime(day.year, day.month, day.day, 7) + timedelta(seconds=index % 7200)
+            batch.append({
+                "student_id": index + 1,
+                "matricula": matriculas[index],
+                "time_stamp": time_stamp,
+                "attendance_date": day,
+            })
+            if len(batch) == 20000:
+                conn.execute(insert(Attendance), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Attendance), batch)
+    return count
+
+
+@lru_cache(maxsize=256)
+def _qr_pixels(data: str) -> np.ndarray:
+    """QR en gris tal como lo genera generate_qr_code (mismo render, sin escribir el PNG)."""
+    return np.array(render_qr_image(data).convert("L"), dtype=np.float32)
+
+
+def synthetic_qr_frame(data: str, frame_size=(1280, 720), qr_side: int = 160, center=None,
+                       angle: float = 0.0, blur: int = 0, noise: float = 0.0, rng=None):
+    """
+    Genera un frame BGR sintético con un QR sobre un fondo con textura.
+
+    Args:
+        data (str): Contenido del QR (matrícula); None genera un frame sin QR.
+        frame_size: (ancho, alto) del frame.
+        qr_side (int): Lado del QR en píxeles (incluye el margen blanco).
+        center: (x, y) del centro del QR; por defecto, el centro del frame.
+        angle (float): Rotación en grados.
+        blur (int): Tamaño del kernel de desenfoque gaussiano (0 = sin desenfoque).
+        noise (float): Desvío estándar del ruido gaussiano (en niveles de gris).
+        rng: np.random.Generator para que la secuencia sea reproducible.
+    """
+    rng = rng or np.random.default_rng(0)
+    width, height = frame_size
+    # Fondo: degradado suave más textura, como una pared o un uniforme
+    gradient = np.linspace(90, 170, width, dtype=np.float32)[None, :].repeat(height, axis=0)
+    frame = gradient + rng.normal(0, 12, (height, width)).astype(np.float32)
+    if data is None:
+        return cv2.cvtColor(np.clip(frame, 0, 255).astype(np.uint8), cv2.COLOR_GRAY2BGR)
+
+    qr_pixels = _qr_pixels(data)
+    interpolation = cv2.INTER_AREA if qr_side < qr_pixels.shape[0] else cv2.INTER_NEAREST
+    qr_image = cv2.resize(qr_pixels, (qr_side, qr_side), interpolation=interpolation)
+    if angle:
+        # Se rota con un canal de máscara para pegar solo el QR (no las esquinas vacías)
+        diagonal = int(qr_side * 1.5)
+        pad = (diagonal - qr_side) // 2
+        patch = cv2.copyMakeBorder(qr_image, pad, pad, pad, pad, cv2.BORDER_CONSTANT, value=0)
+        mask = cv2.copyMakeBorder(np.ones_like(qr_image), pad, pad, pad, pad, cv2.BORDER_CONSTANT, value=0)
+        matrix = cv2.getRotationMatrix2D((patch.shape[1] / 2, patch.shape[0] / 2), angle, 1.0)
+        patch = cv2.warpAffine(patch, matrix, patch.shape[::-1], flags=cv2.INTER_LINEAR)
+        mask = cv2.warpAffine(mask, matrix, mask.shape[::-1], flags=cv2.INTER_LINEAR)
+    else:
+        patch, mask = qr_image, np.ones_like(qr_image)
+
+    cx, cy = center or (width // 2, height // 2)
+    x0, y0 = cx - patch.shape[1] // 2, cy - patch.shape[0] // 2
+    x1, y1 = max(0, x0), max(0, y0)
+    x2, y2 = min(width, x0 + patch.shape[1]), min(height, y0 + patch.shape[0])
+    sub_patch = patch[y1 - y0:y2 - y0, x1 - x0:x2 - x0]
+    sub_mask = mask[y1 - y0:y2 - y0, x1 - x0:x2 - x0]
+    frame[y1:y2, x1:x2] = sub_patch * sub_mask + frame[y1:y2, x1:x2] * (1 - sub_mask)
+
+    if blur:
+        kernel = blur | 1
+        frame = cv2.GaussianBlur(frame, (kernel, kernel), 0)
+    if noise:
+        frame = frame + rng.normal(0, noise, frame.shape).astype(np.float32)
+
+    gray = np.clip(frame, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+def latency_percentiles(samples: list, prefix: str = "") -> dict:
+    """
+    p50/p95/p99 y máximo (ms) de una lista de duraciones en segundos.
+
+    Usa el mismo criterio que ScanPipeline.stats(): el valor en la posición
+    int(p * n) de la lista ordenada.
+    """
+    ordered = sorted(samples)
+    result = {}
+    for name, p in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99), ("max", 1.0)):
+        value = ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000 if ordered else 0.0
+        result[f"{prefix}{name}_ms"] = round(value, 2)
+    return result
+
+
+class Timer:
+    """Cronómetro simple para usar con `with`."""
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
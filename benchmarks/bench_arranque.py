@@ -0,0 +1,122 @@
+# benchmarks/bench_arranque.py
+"""
+Mide el arranque de la aplicación con inicio diferido (pestañas e imports
+pesados bajo demanda, DB en segundo plano) contra la carga completa previa:
+
+- import: tiempo de `python -X importtime` de los módulos que se cargan antes
+  de mostrar la ventana.
+- primera ventana: desde el lanzamiento del proceso hasta la primera vuelta del
+  bucle de eventos con la ventana visible.
+- lista: hasta que la DB está preparada y la pestaña inicial construida.
+
+Cada medición se hace en un proceso nuevo sobre una base de datos temporal.
+
+Uso:
+    python benchmarks/bench_arranque.py --alumnos 2000 --repeticiones 5
+"""
+
+import sys
+import os
+import argparse
+import json
+import statistics
+import subprocess
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+MODES = ["diferido", "completo"]
+
+# Módulos que cada modo importa antes de mostrar la ventana
+STARTUP_IMPORTS = {
+    "diferido": "import interfaz.principal",
+    "completo": "import interfaz.principal, interfaz.reportes_widget, interfaz.alumnos_widget, interfaz.camara_widget",
+}
+
+
+def run_worker(mode: str, launched_at: float):
+    """Abre la ventana principal y muestra los tiempos como JSON."""
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import QTimer
+
+    app = QApplication(sys.argv[:1])
+    from interfaz.principal import MainWindow
+
+    window = MainWindow(lazy=(mode == "diferido"))
+    window.show()
+    timings = {}
+
+    def wait_until_ready():
+        if window.backend_ready and window.tab_dashboard is not None:
+            timings["ready"] = time.time() - launched_at
+            app.quit()
+        else:
+            QTimer.singleShot(5, wait_until_ready)
+
+    def first_window():
+        timings["first_window"] = time.time() - launched_at
+        wait_until_ready()
+
+    QTimer.singleShot(0, first_window)
+    app.exec()
+    print(json.dumps(timings))
+
+
+def import_time(mode: str, env: dict) -> float:
+    """Suma del tiempo acumulado de los imports de primer nivel (segundos)."""
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", STARTUP_IMPORTS[mode]],
+                            capture_output=True, text=True, env=env)
+    total_us = 0
+    for line in output.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit() and not parts[2].startswith("  "):
+            total_us += int(parts[1])
+    return total_us / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alumnos", type=int, default=2000, help="Alumnos en la base temporal")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--lanzado", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.lanzado)
+        return
+
+    from benchmarks._comun import temp_database, seed_students
+
+    print(f"--- Benchmark de arranque ({args.alumnos} alumnos, mediana de {args.repeticiones}) ---")
+    with temp_database() as bind:
+        seed_students(bind, args.alumnos)
+        bind.dispose()
+
+        env = dict(os.environ, PROYECTIS_BASE_DATOS_RUTA=bind.url.database)
+        if not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+            env.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+        print(f"{'Modo':<10} {'Import (s)':>11} {'1.ª ventana (s)':>16} {'Lista (s)':>10}")
+        for mode in MODES:
+            imports, first, ready = [], [], []
+            for _ in range(args.repeticiones):
+                imports.append(import_time(mode, env))
+                output = subprocess.run(
+                    [sys.executable, __file__, "--worker", mode, "--lanzado", str(time.time())],
+                    capture_output=True, text=True, env=env
+                )
+                if output.returncode != 0:
+                    print(f"{mode:<10} falló: {output.stderr.strip().splitlines()[-1]}")
+                    break
+                timings = json.loads(output.stdout.strip().splitlines()[-1])
+                first.append(timings["first_window"])
+                ready.append(timings["ready"])
+            if first:
+                print(f"{mode:<10} {statistics.median(imports):>11.2f} "
+                      f"{statistics.median(first):>16.2f} {statistics.median(ready):>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
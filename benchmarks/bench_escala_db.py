@@ -0,0 +1,235 @@
+# benchmarks/bench_escala_db.py
+"""
+Mide cómo escalan las operaciones de base de datos con el tamaño del padrón y
+del historial de asistencias, para saber dónde dejan de ser aceptables:
+
+- roster_cache.warm: carga del padrón en memoria (inicio de la aplicación).
+- load_students: recarga de la tabla de AlumnosWidget (primera página del modelo).
+- get_attendance_data: historial completo como DataFrame (reportes).
+- register_attendance: registro de un escaneo (sin escritor, un commit por escaneo).
+- delete_student: eliminación de un alumno con todo su historial.
+- delete_selected_student: eliminación más la actualización de la tabla, como en la GUI.
+
+Cada escala se siembra en una base de datos temporal (nunca en
+base_datos/asistencia.db) con el esquema de modulos/utilidades.py. Cada
+operación corre en un subproceso propio para que el pico de memoria (RSS) de una
+no contamine a la siguiente; las que superan --limite segundos se cortan.
+
+Uso:
+    python benchmarks/bench_escala_db.py --escalas 1k:100k 10k:1M 100k:10M
+    python benchmarks/bench_escala_db.py --escalas 20k:2M --operaciones load_students --salida escala.json
+"""
+
+import sys
+import os
+import argparse
+import json
+import random
+import resource
+import subprocess
+import time
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Operaciones en el orden en que se ejecutan (las que modifican la base van al final)
+OPERATIONS = [
+    "roster_cache.warm",
+    "load_students",
+    "get_attendance_data",
+    "register_attendance",
+    "delete_student",
+    "delete_selected_student",
+]
+
+# Repeticiones por defecto: las operaciones sobre todo el historial son caras
+DEFAULT_REPETITIONS = {
+    "roster_cache.warm": 5,
+    "load_students": 5,
+    "get_attendance_data": 3,
+    "register_attendance": 200,
+    "delete_student": 20,
+    "delete_selected_student": 5,
+}
+
+# Operaciones que reciben una matrícula
+TARGETED_OPERATIONS = {"register_attendance", "delete_student", "delete_selected_student"}
+
+SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_count(text: str) -> int:
+    """'10k' -> 10000, '1M' -> 1000000."""
+    text = text.strip().lower()
+    if text and text[-1] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def parse_scale(text: str) -> tuple:
+    """'10k:1M' -> (10000 alumnos, 1000000 asistencias)."""
+    students, _, rows = text.partition(":")
+    return parse_count(students), parse_count(rows or "0")
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss está en KiB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_worker(operation: str, db_path: str, repetitions: int, seed: int):
+    """Ejecuta una sola operación `repetitions` veces y muestra el resultado como JSON."""
+    from modulos.utilidades import Session, Student, create_db_engine
+    from modulos.cache_alumnos import roster_cache
+    from benchmarks._comun import latency_percentiles
+
+    Session.configure(bind=create_db_engine(db_path))
+    roster_cache.invalidate()
+
+    # Las operaciones por alumno se repiten sobre alumnos distintos, elegidos al azar
+    targets = [None] * repetitions
+    if operation in TARGETED_OPERATIONS:
+        session = Session()
+        matriculas = [m for (m,) in session.query(Student.matricula)]
+        session.close()
+        targets = random.Random(seed).sample(matriculas, min(repetitions, len(matriculas)))
+
+    # Lo que hace falta antes de medir (la aplicación también lo tiene listo)
+    widget = None
+    if operation in ("load_students", "delete_selected_student"):
+        from PyQt6.QtWidgets import QApplication
+        from interfaz.alumnos_widget import AlumnosWidget
+        app = QApplication.instance() or QApplication(sys.argv[:1])
+        widget = AlumnosWidget()
+    if operation == "register_attendance":
+        roster_cache.warm()
+    if operation == "get_attendance_data":
+        import pandas  # noqa: F401  (el import no es parte de la consulta)
+
+    if operation == "roster_cache.warm":
+        def step(_):
+            roster_cache.invalidate()
+            roster_cache.warm()
+    elif operation == "load_students":
+        def step(_):
+            widget.load_students()
+    elif operation == "get_attendance_data":
+        from modulos.reportes import get_attendance_data
+
+        def step(_):
+            get_attendance_data()
+    elif operation == "register_attendance":
+        from modulos.asistencia import register_attendance
+
+        def step(matricula):
+            result = register_attendance(matricula)
+            assert result["status"] == "success", result["message"]
+    elif operation == "delete_student":
+        from modulos.alumnos import delete_student
+
+        def step(matricula):
+            delete_student(matricula)
+    else:
+        from modulos.alumnos import delete_student
+
+        def step(matricula):
+            # Lo mismo que AlumnosWidget.delete_selected_student, sin el diálogo de confirmación
+            delete_student(matricula)
+            widget.student_model.remove_student(matricula)
+
+    baseline_mb = peak_rss_mb()
+    samples = []
+    for target in targets:
+        start = time.perf_counter()
+        step(target)
+        samples.append(time.perf_counter() - start)
+
+    print(json.dumps({
+        "operacion": operation,
+        "repeticiones": len(samples),
+        **latency_percentiles(samples),
+        "pico_rss_mb": round(peak_rss_mb(), 1),
+        "incremento_rss_mb": round(peak_rss_mb() - baseline_mb, 1),
+    }))
+
+
+def seed_scale(bind, students: int, rows: int):
+    """Siembra alumnos, historial y resumen diario en la base temporal."""
+    from benchmarks._comun import seed_students, seed_attendance
+    from modulos.resumen import rebuild_daily_summary
+
+    start = time.perf_counter()
+    matriculas = seed_students(bind, students)
+    seed_attendance(bind, matriculas, rows)
+    rebuild_daily_summary()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--escalas", nargs="+", default=["1k:100k", "10k:1M"],
+                        help="ALUMNOS:ASISTENCIAS (admite sufijos k y M)")
+    parser.add_argument("--operaciones", nargs="+", choices=OPERATIONS, default=OPERATIONS)
+    parser.add_argument("--repeticiones", type=int, help="Repeticiones por operación (por defecto, según la operación)")
+    parser.add_argument("--limite", type=float, default=600, help="Segundos máximos por operación")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="Archivo JSON con los resultados")
+    parser.add_argument("--worker", choices=OPERATIONS, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.db, args.repeticiones, args.semilla)
+        return
+
+    from benchmarks._comun import temp_database
+
+    env = dict(os.environ)
+    if not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+        env.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    report = {"benchmark": "escala_db", "fecha": datetime.now().isoformat(timespec="seconds"), "escalas": []}
+    for scale in args.escalas:
+        students, rows = parse_scale(scale)
+        print(f"\n--- Escala: {students} alumnos, {rows} asistencias ---")
+        with temp_database() as bind:
+            seeded = seed_scale(bind, students, rows)
+            bind.dispose()
+            size_mb = os.path.getsize(bind.url.database) / 1e6
+            print(f"Siembra: {seeded:.1f} s, base de {size_mb:.0f} MB")
+
+            results = []
+            print(f"{'Operación':<26}{'n':>5}{'p50 (ms)':>11}{'p95 (ms)':>11}{'p99 (ms)':>11}"
+                  f"{'máx (ms)':>11}{'Pico RSS (MB)':>15}{'+RSS (MB)':>11}")
+            for operation in args.operaciones:
+                repetitions = args.repeticiones or DEFAULT_REPETITIONS[operation]
+                command = [sys.executable, __file__, "--worker", operation, "--db", bind.url.database,
+                           "--repeticiones", str(repetitions), "--semilla", str(args.semilla)]
+                try:
+                    output = subprocess.run(command, capture_output=True, text=True, env=env, timeout=args.limite)
+                except subprocess.TimeoutExpired:
+                    print(f"{operation:<26} tiempo agotado (más de {args.limite:.0f} s)")
+                    results.append({"operacion": operation, "error": "tiempo agotado"})
+                    continue
+                if output.returncode != 0:
+                    error = (output.stderr.strip().splitlines() or ["sin salida"])[-1]
+                    print(f"{operation:<26} falló: {error}")
+                    results.append({"operacion": operation, "error": error})
+                    continue
+                stats = json.loads(output.stdout.strip().splitlines()[-1])
+                results.append(stats)
+                print(f"{operation:<26}{stats['repeticiones']:>5}{stats['p50_ms']:>11.1f}{stats['p95_ms']:>11.1f}"
+                      f"{stats['p99_ms']:>11.1f}{stats['max_ms']:>11.1f}{stats['pico_rss_mb']:>15.1f}"
+                      f"{stats['incremento_rss_mb']:>11.1f}")
+
+        report["escalas"].append({"alumnos": students, "asistencias": rows, "siembra_s": round(seeded, 2),
+                                  "base_mb": round(size_mb, 1), "resultados": results})
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
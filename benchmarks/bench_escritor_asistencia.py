@@ -0,0 +1,70 @@
+# benchmarks/bench_escritor_asistencia.py
+"""
+Compara el registro de asistencias con un commit por escaneo contra el
+escritor con commit agrupado (AttendanceWriter).
+
+Uso:
+    python benchmarks/bench_escritor_asistencia.py --scans 2000 --threads 8 --perfil durable
+"""
+
+import sys
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks._comun import temp_database, seed_students, Timer
+from modulos.cache_alumnos import roster_cache
+from modulos.asistencia import AttendanceWriter, _register_batch
+from modulos.utilidades import DB_PROFILE, DB_PROFILES
+
+
+def bench_per_row(matriculas: list, threads: int) -> float:
+    """Un commit por escaneo (comportamiento sin escritor)."""
+    with ThreadPoolExecutor(max_workers=threads) as pool, Timer() as timer:
+        results = list(pool.map(lambda m: _register_batch([m])[0], matriculas))
+    assert all(r["status"] == "success" for r in results), "Registros fallidos en modo por fila"
+    return timer.elapsed
+
+
+def bench_group_commit(matriculas: list, threads: int, max_batch: int, max_delay: float) -> tuple:
+    """Commit agrupado a través del escritor con cola acotada."""
+    writer = AttendanceWriter(max_batch=max_batch, max_delay=max_delay)
+    writer.start()
+    with ThreadPoolExecutor(max_workers=threads) as pool, Timer() as timer:
+        futures = list(pool.map(writer.submit, matriculas))
+        results = [future.result() for future in futures]
+    writer.stop()
+    assert all(r["status"] == "success" for r in results), "Registros fallidos en modo agrupado"
+    return timer.elapsed, writer.batches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scans", type=int, default=2000, help="Escaneos (alumnos distintos) por modo")
+    parser.add_argument("--threads", type=int, default=8, help="Hilos que escanean en paralelo")
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-delay", type=float, default=0.05)
+    parser.add_argument("--perfil", choices=sorted(DB_PROFILES), default=DB_PROFILE, help="Perfil de SQLite")
+    args = parser.parse_args()
+
+    print(f"--- Benchmark de escritura de asistencias ({args.scans} escaneos, {args.threads} hilos, perfil {args.perfil}) ---")
+
+    with temp_database(args.perfil) as bind:
+        matriculas = seed_students(bind, args.scans)
+        roster_cache.warm()
+        per_row = bench_per_row(matriculas, args.threads)
+
+    with temp_database(args.perfil) as bind:
+        matriculas = seed_students(bind, args.scans)
+        roster_cache.warm()
+        grouped, batches = bench_group_commit(matriculas, args.threads, args.max_batch, args.max_delay)
+
+    print(f"Commit por fila : {per_row:8.3f} s  ({args.scans / per_row:10.1f} escaneos/s)")
+    print(f"Commit agrupado : {grouped:8.3f} s  ({args.scans / grouped:10.1f} escaneos/s, {batches} transacciones)")
+    print(f"Aceleración     : {per_row / grouped:8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
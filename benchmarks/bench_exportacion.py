@@ -0,0 +1,87 @@
+# benchmarks/bench_exportacion.py
+"""
+Compara la exportación actual (DataFrame completo + to_csv) contra la
+exportación por bloques (CSV, CSV gzip y Parquet): tiempo y pico de memoria (RSS).
+
+Cada modo se ejecuta en un subproceso propio para que el pico de RSS de uno
+no contamine al siguiente.
+
+Uso:
+    python benchmarks/bench_exportacion.py --students 2000 --rows 500000
+"""
+
+import sys
+import os
+import argparse
+import json
+import resource
+import subprocess
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+MODES = ["dataframe", "csv", "csv.gz", "parquet"]
+
+
+def run_worker(mode: str, db_path: str, out_dir: str, chunksize: int):
+    """Ejecuta un solo modo de exportación y muestra el resultado como JSON."""
+    from modulos.utilidades import Session, create_db_engine
+    from modulos import reportes
+
+    Session.configure(bind=create_db_engine(db_path))
+    start = time.perf_counter()
+    if mode == "dataframe":
+        result = reportes.export_attendance_to_csv(reportes.get_attendance_data(), "bench", out_dir)
+    else:
+        result = reportes.export_attendance_streaming("bench", mode, chunksize, out_dir)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss está en KiB en Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    size_mb = os.path.getsize(result) / 1e6 if not result.startswith("Error") else 0.0
+    print(json.dumps({"mode": mode, "seconds": elapsed, "peak_rss_mb": peak_rss_mb,
+                      "size_mb": size_mb, "result": result}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--rows", type=int, default=500000, help="Asistencias en el historial")
+    parser.add_argument("--chunksize", type=int, default=50000)
+    parser.add_argument("--worker", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.db, args.out, args.chunksize)
+        return
+
+    from benchmarks._comun import temp_database, seed_students, seed_attendance
+
+    print(f"--- Benchmark de exportación ({args.rows} asistencias, {args.students} alumnos) ---")
+    with temp_database() as bind, tempfile.TemporaryDirectory(prefix="bench_export_") as out_dir:
+        matriculas = seed_students(bind, args.students)
+        seed_attendance(bind, matriculas, args.rows)
+        bind.dispose()
+
+        print(f"{'Modo':<10} {'Tiempo (s)':>11} {'Pico RSS (MB)':>14} {'Archivo (MB)':>13}")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--worker", mode, "--db", bind.url.database,
+                 "--out", out_dir, "--chunksize", str(args.chunksize)],
+                capture_output=True, text=True
+            )
+            if output.returncode != 0:
+                print(f"{mode:<10} falló: {output.stderr.strip().splitlines()[-1]}")
+                continue
+            stats = json.loads(output.stdout.strip().splitlines()[-1])
+            if stats["result"].startswith("Error"):
+                print(f"{mode:<10} {stats['result']}")
+                continue
+            print(f"{mode:<10} {stats['seconds']:>11.2f} {stats['peak_rss_mb']:>14.1f} {stats['size_mb']:>13.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/bench_preprocesado.py
+"""
+Compara la decodificación de QR sobre el frame BGR completo contra el
+preprocesado adaptativo (gris, escala según el tamaño del QR, región de interés
+y umbral opcional): tasa de decodificación y CPU por frame.
+
+Los frames son sintéticos: cada "alumno" cruza el cuadro durante unos frames
+con un QR de tamaño aleatorio, y entre alumnos hay frames sin QR.
+
+Uso:
+    python benchmarks/bench_preprocesado.py --frames 300 --resolucion 1280x720
+    python benchmarks/bench_preprocesado.py --decodificador opencv   # sin libzbar
+"""
+
+import sys
+import os
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks._comun import synthetic_qr_frame
+from modulos.escaneo import FramePreprocessor, DecodedQR, _pyzbar_decode
+
+
+def opencv_decode(frame):
+    """Decodificador alternativo (cv2.QRCodeDetector) con la misma interfaz que pyzbar."""
+    import cv2
+    data, points, _ = cv2.QRCodeDetector().detectAndDecode(frame)
+    if not data or points is None:
+        return []
+    return [DecodedQR(data.encode("utf-8"), [tuple(p) for p in points[0].astype(int)])]
+
+
+DECODERS = {"pyzbar": _pyzbar_decode, "opencv": opencv_decode}
+
+Frame = namedtuple("Frame", "image expected")
+
+
+def build_scene(count: int, frame_size, seed: int = 0) -> list:
+    """Secuencia de frames: alumnos que cruzan el cuadro (25 frames) y 5 frames vacíos entre ellos."""
+    rng = np.random.default_rng(seed)
+    width, height = frame_size
+    frames = []
+    student = 0
+    while len(frames) < count:
+        data = f"2025{student:04d}"
+        side = int(rng.integers(min(height, 100), min(height, 320)))
+        start = np.array([rng.integers(side, width - side), rng.integers(side // 2 + 1, height - side // 2)])
+        step = rng.normal(0, 4, 2)
+        for i in range(25):
+            cx, cy = (start + step * i).astype(int)
+            cx = int(np.clip(cx, side // 2, width - side // 2))
+            cy = int(np.clip(cy, side // 2, height - side // 2))
+            image = synthetic_qr_frame(data, frame_size, side, (cx, cy), noise=4, rng=rng)
+            frames.append(Frame(image, data))
+        for _ in range(5):
+            frames.append(Frame(synthetic_qr_frame(None, frame_size, rng=rng), None))
+        student += 1
+    return frames[:count]
+
+
+def run_mode(frames: list, decode) -> dict:
+    """Decodifica toda la secuencia y mide CPU (del hilo) y tiempo real por frame."""
+    found = 0
+    expected = 0
+    cpu_start, wall_start = time.thread_time(), time.perf_counter()
+    for frame in frames:
+        data = {result.data.decode("utf-8") for result in decode(frame.image)}
+        if frame.expected is not None:
+            expected += 1
+            found += frame.expected in data
+    cpu = time.thread_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    return {
+        "decode_rate": found / expected if expected else 0.0,
+        "cpu_ms": cpu / len(frames) * 1000,
+        "wall_ms": wall / len(frames) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--resolucion", default="1280x720", help="ANCHOxALTO del frame")
+    parser.add_argument("--decodificador", choices=sorted(DECODERS), default="pyzbar")
+    args = parser.parse_args()
+
+    frame_size = tuple(int(value) for value in args.resolucion.lower().split("x"))
+    decoder = DECODERS[args.decodificador]
+    print(f"--- Benchmark de preprocesado ({args.frames} frames {args.resolucion}, {args.decodificador}) ---")
+    frames = build_scene(args.frames, frame_size)
+
+    modes = {
+        "Frame BGR completo": decoder,
+        "Preprocesado": FramePreprocessor(decoder, threshold=False).decode,
+        "Preprocesado + umbral": FramePreprocessor(decoder, threshold=True).decode,
+    }
+    baseline = None
+    print(f"{'Modo':<24}{'Decodificados':>14}{'CPU/frame':>12}{'Real/frame':>12}{'Mejora':>9}")
+    for name, decode in modes.items():
+        result = run_mode(frames, decode)
+        baseline = baseline or result["cpu_ms"]
+        print(f"{name:<24}{result['decode_rate']:>13.1%}{result['cpu_ms']:>9.1f} ms"
+              f"{result['wall_ms']:>9.1f} ms{baseline / result['cpu_ms']:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,375 @@
+# benchmarks/bench_reproduccion.py
+"""
+Reproduce frames grabados o sintéticos a través del camino completo de escaneo
+(fuente de archivo -> captura -> decodificación -> registro de asistencia) sin
+necesidad de una cámara.
+
+- Escena sintética: cada alumno pasa frente a la "cámara" durante unos frames con
+  un QR (el mismo render que generate_qr_code) de tamaño, desenfoque, rotación y
+  ruido aleatorios; entre alumnos hay frames vacíos. Los frames se escriben en una
+  carpeta de imágenes (o en un video con --formato video) y se leen como archivo.
+- --video: reproduce uno o más videos grabados (sin datos de referencia: la tasa
+  de éxito es la de frames con algún QR decodificado). El padrón temporal se
+  siembra con las matrículas de --padron o, si no se indica, con las que se leen
+  en una primera pasada por los videos; así los registros miden el camino real
+  y no terminan todos en "matrícula no existe".
+
+Los registros van a una base de datos temporal a través del escritor de
+asistencias. Informa frames/s, tasa de decodificación, latencia p50/p95/p99
+desde la captura del frame hasta el registro, y guarda todo en un JSON para
+comparar entre versiones (--comparar).
+
+Uso:
+    python benchmarks/bench_reproduccion.py --alumnos 60 --salida reproduccion.json
+    python benchmarks/bench_reproduccion.py --decodificador opencv --comparar reproduccion.json
+    python benchmarks/bench_reproduccion.py --video entrada_norte.mp4 --tiempo-real
+    python benchmarks/bench_reproduccion.py --video entrada_norte.mp4 --padron padron.csv
+"""
+
+import sys
+import os
+import argparse
+import json
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter, namedtuple
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks._comun import temp_database, seed_students, synthetic_qr_frame, latency_percentiles
+from benchmarks.bench_preprocesado import DECODERS
+from modulos.cache_alumnos import roster_cache
+from modulos.asistencia import start_attendance_writer, stop_attendance_writer, submit_attendance
+from modulos.escaneo import ScanPipeline, DebounceCache, PREPROCESS, DECODE_WORKERS
+
+# Condiciones de la escena sintética (se elige una al azar por alumno)
+BLUR_LEVELS = (0, 3, 5, 7)
+NOISE_LEVELS = (0, 4, 8, 16)
+MAX_ANGLE = 45
+ANGLE_BUCKETS = (15, 30, 45)
+
+# Métricas que se comparan con --comparar: (clave, mayor es mejor)
+COMPARED_METRICS = [
+    ("fps", True),
+    ("tasa_frames", True),
+    ("tasa_alumnos", True),
+    ("latencia_registro_p50_ms", False),
+    ("latencia_registro_p95_ms", False),
+    ("latencia_registro_p99_ms", False),
+]
+
+Shown = namedtuple("Shown", "matricula side blur angle noise")
+
+
+class RecordingDebounce(DebounceCache):
+    """Filtro de repeticiones que además anota cada QR decodificado (por frame)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.decoded = set()
+        self._record_lock = threading.Lock()
+
+    def allow(self, data: str, now: float = None) -> bool:
+        with self._record_lock:
+            # captured_at identifica el frame: un mismo QR cuenta una vez por frame
+            self.decoded.add((data, now))
+        return super().allow(data, now)
+
+
+def build_synthetic_source(folder: str, matriculas: list, frames_per_student: int, gap: int,
+                           frame_size, fmt: str, fps: float, seed: int = 0) -> tuple:
+    """
+    Escribe la escena sintética en `folder` (PNG numerados o un video).
+
+    Returns:
+        tuple: (ruta de la fuente, lista de Shown, frames con QR, frames totales).
+    """
+    rng = np.random.default_rng(seed)
+    width, height = frame_size
+    writer = None
+    if fmt == "video":
+        source = os.path.join(folder, "escena.mp4")
+        writer = cv2.VideoWriter(source, cv2.VideoWriter_fourcc(*"mp4v"), fps, frame_size)
+    else:
+        source = folder
+
+    index = 0
+
+    def emit(frame):
+        nonlocal index
+        if writer is not None:
+            writer.write(frame)
+        else:
+            cv2.imwrite(os.path.join(folder, f"{index:06d}.png"), frame)
+        index += 1
+
+    shown = []
+    qr_frames = 0
+    for matricula in matriculas:
+        side = int(rng.integers(min(height, 80), min(height, 260)))
+        blur = int(rng.choice(BLUR_LEVELS))
+        angle = float(rng.uniform(-MAX_ANGLE, MAX_ANGLE))
+        noise = float(rng.choice(NOISE_LEVELS))
+        shown.append(Shown(matricula, side, blur, angle, noise))
+
+        # El alumno se mueve un poco mientras muestra el QR
+        margin = int(side * 0.75)
+        start = np.array([rng.integers(margin, width - margin), rng.integers(margin, height - margin)])
+        step = rng.normal(0, 3, 2)
+        for i in range(frames_per_student):
+            cx, cy = (start + step * i).astype(int)
+            center = (int(np.clip(cx, margin, width - margin)), int(np.clip(cy, margin, height - margin)))
+            emit(synthetic_qr_frame(matricula, frame_size, side, center, angle, blur, noise, rng))
+            qr_frames += 1
+        for _ in range(gap):
+            emit(synthetic_qr_frame(None, frame_size, rng=rng))
+
+    if writer is not None:
+        writer.release()
+    return source, shown, qr_frames, index
+
+
+def replay(sources: list, decoder, preprocess: bool, decode_workers: int, realtime: bool) -> dict:
+    """
+    Pasa las fuentes (una tras otra) por ScanPipeline y registra cada lectura.
+
+    Returns:
+        dict: Estadísticas sumadas de los pipelines, QR decodificados por frame,
+            latencias captura -> registro y resultado de cada registro.
+    """
+    debounce = RecordingDebounce()
+    registrations = {}
+    latencies = []
+    lock = threading.Lock()
+
+    def on_detection(detection):
+        def done(future):
+            registered_at = time.monotonic()
+            result = future.result()
+            with lock:
+                latencies.append(registered_at - detection.captured_at)
+                registrations.setdefault(detection.data, result["status"])
+        submit_attendance(detection.data).add_done_callback(done)
+
+    totals = Counter()
+    elapsed = 0.0
+    for source in sources:
+        pipeline = ScanPipeline(source, decode_workers=decode_workers, on_detection=on_detection,
+                                decoder=decoder, preprocess=preprocess, debounce=debounce,
+                                realtime=realtime, drop_frames=realtime)
+        started = time.perf_counter()
+        if not pipeline.run():
+            raise SystemExit(f"No se pudo abrir la fuente {source}")
+        elapsed += time.perf_counter() - started
+        stats = pipeline.stats()
+        for key in ("frames_captured", "frames_decoded", "frames_dropped", "detections"):
+            totals[key] += stats[key]
+
+    return {
+        "totals": totals,
+        "elapsed": elapsed,
+        "decoded": debounce.decoded,
+        "suppressed": debounce.suppressed,
+        "latencies": latencies,
+        "registrations": registrations,
+    }
+
+
+def collect_payloads(sources: list, decoder, preprocess: bool, decode_workers: int) -> set:
+    """Primera pasada por las fuentes, sin registrar: devuelve los QR que se leen."""
+    debounce = RecordingDebounce()
+    for source in sources:
+        pipeline = ScanPipeline(source, decode_workers=decode_workers, on_detection=lambda detection: None,
+                                decoder=decoder, preprocess=preprocess, debounce=debounce,
+                                realtime=False, drop_frames=False)
+        if not pipeline.run():
+            raise SystemExit(f"No se pudo abrir la fuente {source}")
+    return {data for data, _ in debounce.decoded}
+
+
+def load_roster_matriculas(path: str) -> list:
+    """Matrículas de un padrón CSV/XLSX (mismo formato que la importación de alumnos)."""
+    from modulos.importacion import read_roster
+    roster = read_roster(path)
+    return sorted({m.strip() for m in roster["matricula"].dropna() if m.strip()})
+
+
+def rate_by(shown: list, registrations: dict, key) -> dict:
+    """Fracción de alumnos registrados agrupando por una condición de la escena."""
+    groups = {}
+    for item in shown:
+        groups.setdefault(key(item), []).append(registrations.get(item.matricula) == "success")
+    return {str(group): round(sum(hits) / len(hits), 3) for group, hits in sorted(groups.items())}
+
+
+def angle_bucket(item: Shown) -> str:
+    limit = next(limit for limit in ANGLE_BUCKETS if abs(item.angle) <= limit)
+    return f"<={limit}°"
+
+
+def git_revision() -> str:
+    try:
+        output = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+        return output.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results: dict, previous_path: str):
+    """Muestra la diferencia de las métricas principales con un JSON anterior."""
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    print(f"\nComparación con {previous_path} (versión {previous.get('version') or '?'}):")
+    print(f"{'Métrica':<28}{'Anterior':>12}{'Actual':>12}{'Cambio':>10}")
+    for key, higher_is_better in COMPARED_METRICS:
+        before, after = previous["resultados"].get(key), results.get(key)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before if before else 0.0
+        worse = change < 0 if higher_is_better else change > 0
+        mark = " (peor)" if worse and abs(change) > 0.05 else ""
+        print(f"{key:<28}{before:>12.3f}{after:>12.3f}{change:>+9.1%}{mark}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", action="append", help="Video grabado a reproducir (se puede repetir)")
+    parser.add_argument("--padron", help="Padrón CSV/XLSX con las matrículas de los videos "
+                                         "(por defecto, las leídas en una primera pasada)")
+    parser.add_argument("--alumnos", type=int, default=60, help="Alumnos en la escena sintética")
+    parser.add_argument("--frames-por-alumno", type=int, default=10)
+    parser.add_argument("--frames-vacios", type=int, default=3, help="Frames sin QR entre alumnos")
+    parser.add_argument("--resolucion", default="1280x720", help="ANCHOxALTO de la escena sintética")
+    parser.add_argument("--formato", choices=["carpeta", "video"], default="carpeta",
+                        help="Escribir la escena como imágenes PNG o como video mp4")
+    parser.add_argument("--fps", type=float, default=30, help="FPS nominales del video sintético")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--decodificador", choices=sorted(DECODERS), default="pyzbar")
+    parser.add_argument("--sin-preprocesado", action="store_true")
+    parser.add_argument("--hilos", type=int, default=DECODE_WORKERS, help="Hilos de decodificación")
+    parser.add_argument("--tiempo-real", action="store_true",
+                        help="Leer los archivos a su ritmo nominal, descartando frames como una cámara")
+    parser.add_argument("--salida", default="reproduccion.json", help="Archivo JSON con los resultados")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+    for video in args.video or []:
+        if not os.path.isfile(video):
+            parser.error(f"No existe el video: {video}")
+    if args.padron and not args.video:
+        parser.error("--padron solo se usa con --video")
+    if args.padron and not os.path.isfile(args.padron):
+        parser.error(f"No existe el padrón: {args.padron}")
+
+    frame_size = tuple(int(value) for value in args.resolucion.lower().split("x"))
+    preprocess = PREPROCESS and not args.sin_preprocesado
+    mode = "tiempo real" if args.tiempo_real else "todos los frames"
+    scene = "videos grabados" if args.video else f"escena sintética de {args.alumnos} alumnos"
+    print(f"--- Benchmark de reproducción ({scene}, {args.decodificador}, {mode}) ---")
+
+    decoder = DECODERS[args.decodificador]
+    with tempfile.TemporaryDirectory(prefix="bench_reproduccion_") as folder, temp_database() as bind:
+        shown, qr_frames = [], None
+        if args.video:
+            # Los videos traen QR reales: el padrón debe tener esas matrículas
+            if args.padron:
+                roster, roster_source = load_roster_matriculas(args.padron), args.padron
+            else:
+                roster, roster_source = sorted(collect_payloads(args.video, decoder, preprocess, args.hilos)), \
+                    "primera pasada por los videos"
+            seed_students(bind, len(roster), matriculas=roster)
+            print(f"Padrón: {len(roster)} matrículas ({roster_source})")
+        else:
+            matriculas = seed_students(bind, args.alumnos, prefix="R")
+        roster_cache.warm()
+
+        if args.video:
+            sources = args.video
+        else:
+            source, shown, qr_frames, total_frames = build_synthetic_source(
+                folder, matriculas, args.frames_por_alumno, args.frames_vacios,
+                frame_size, args.formato, args.fps, args.semilla)
+            sources = [source]
+            print(f"Escena: {total_frames} frames ({qr_frames} con QR) en {args.formato}")
+
+        start_attendance_writer()
+        try:
+            run = replay(sources, decoder, preprocess, args.hilos, args.tiempo_real)
+        finally:
+            # Vacía la cola: los registros pendientes se resuelven antes de medir
+            stop_attendance_writer()
+
+    totals = run["totals"]
+    registrations = run["registrations"]
+    expected = {item.matricula for item in shown}
+    decoded_frames = {captured_at for data, captured_at in run["decoded"] if not expected or data in expected}
+    results = {
+        "frames": totals["frames_captured"],
+        "frames_decodificados": totals["frames_decoded"],
+        "frames_descartados": totals["frames_dropped"],
+        "duracion_s": round(run["elapsed"], 3),
+        "fps": round(totals["frames_decoded"] / run["elapsed"], 2) if run["elapsed"] else 0.0,
+        # Sintética: frames con QR en los que se leyó el QR correcto; videos: frames con alguna lectura
+        "tasa_frames": round(len(decoded_frames) / (qr_frames or totals["frames_captured"] or 1), 3),
+        "lecturas": totals["detections"],
+        "lecturas_filtradas": run["suppressed"],
+        "registros": dict(Counter(registrations.values())),
+        "matriculas_leidas": len(registrations),
+        **latency_percentiles(run["latencies"], "latencia_registro_"),
+    }
+    if shown:
+        results["tasa_alumnos"] = round(sum(registrations.get(m) == "success" for m in expected) / len(expected), 3)
+        results["lecturas_erroneas"] = len({data for data, _ in run["decoded"]} - expected)
+        results["por_desenfoque"] = rate_by(shown, registrations, lambda item: item.blur)
+        results["por_rotacion"] = rate_by(shown, registrations, angle_bucket)
+        results["por_ruido"] = rate_by(shown, registrations, lambda item: int(item.noise))
+
+    print(f"Frames: {results['frames']} capturados, {results['frames_decodificados']} decodificados, "
+          f"{results['frames_descartados']} descartados en {results['duracion_s']:.2f} s ({results['fps']:.1f} FPS)")
+    print(f"Frames con QR leído: {results['tasa_frames']:.1%}")
+    # Estado del registro de cada matrícula leída: si no son casi todos 'success', el resto no es comparable
+    print(f"Registros por estado ({results['matriculas_leidas']} matrículas leídas):")
+    for status, count in sorted(results["registros"].items(), key=lambda item: -item[1]):
+        print(f"  {status:<10}{count:>6}  ({count / results['matriculas_leidas']:.1%})")
+    if shown:
+        print(f"Alumnos registrados: {results['tasa_alumnos']:.1%} (lecturas erróneas: {results['lecturas_erroneas']})")
+        print(f"  por desenfoque: {results['por_desenfoque']}")
+        print(f"  por rotación:   {results['por_rotacion']}")
+        print(f"  por ruido:      {results['por_ruido']}")
+    print(f"Latencia captura -> registro: p50 {results['latencia_registro_p50_ms']:.1f} ms, "
+          f"p95 {results['latencia_registro_p95_ms']:.1f} ms, p99 {results['latencia_registro_p99_ms']:.1f} ms")
+
+    report = {
+        "benchmark": "reproduccion",
+        "version": git_revision(),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {
+            "fuente": args.video or "sintetica",
+            "padron": (args.padron or "primera pasada") if args.video else None,
+            "alumnos": None if args.video else args.alumnos,
+            "frames_por_alumno": None if args.video else args.frames_por_alumno,
+            "resolucion": None if args.video else args.resolucion,
+            "formato": None if args.video else args.formato,
+            "semilla": args.semilla,
+            "decodificador": args.decodificador,
+            "preprocesado": preprocess,
+            "hilos": args.hilos,
+            "tiempo_real": args.tiempo_real,
+        },
+        "resultados": results,
+    }
+    if args.comparar:
+        compare(results, args.comparar)
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados guardados en {args.salida}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_vista_previa.py
+"""
+Mide la CPU del hilo principal por frame de la vista previa de la cámara:
+el camino anterior (cvtColor BGR->RGB, QImage RGB888, QPixmap y escalado
+suave) contra frame_to_pixmap (buffer BGR888 sin copia, escalado rápido una vez),
+y el costo por segundo de video con el tope de FPS de la vista previa.
+
+Uso:
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_vista_previa.py --frames 300 --fps-captura 60
+"""
+
+import sys
+import os
+import argparse
+import time
+
+import cv2
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtGui import QImage, QPixmap
+
+from benchmarks._comun import synthetic_qr_frame
+from interfaz.camara_widget import frame_to_pixmap, PREVIEW_FPS
+
+
+def legacy_frame_to_pixmap(frame, size) -> QPixmap:
+    """Camino original de CameraWidget.update_frame."""
+    rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    h, w, ch = rgb_image.shape
+    image = QImage(rgb_image.data, w, h, ch * w, QImage.Format.Format_RGB888)
+    return QPixmap.fromImage(image).scaled(size, Qt.AspectRatioMode.KeepAspectRatio,
+                                           Qt.TransformationMode.SmoothTransformation)
+
+
+def cpu_per_frame(render, frames: list, size) -> float:
+    """CPU del hilo (ms) por frame convertido."""
+    start = time.thread_time()
+    for frame in frames:
+        render(frame, size)
+    return (time.thread_time() - start) / len(frames) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--resolucion", default="1280x720", help="ANCHOxALTO del frame capturado")
+    parser.add_argument("--fps-captura", type=int, default=60, help="FPS de la cámara simulada")
+    parser.add_argument("--fps-vista", type=int, default=PREVIEW_FPS, help="Tope de FPS de la vista previa")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    frame_size = tuple(int(value) for value in args.resolucion.lower().split("x"))
+    # Se alternan unos pocos frames distintos para no medir solo cachés calientes
+    samples = [synthetic_qr_frame(f"2025{i:04d}", frame_size, 200) for i in range(8)]
+    frames = [samples[i % len(samples)] for i in range(args.frames)]
+    label_size = QSize(640, 480)
+
+    print(f"--- Benchmark de vista previa ({args.frames} frames {args.resolucion} -> 640x480) ---")
+    legacy = cpu_per_frame(legacy_frame_to_pixmap, frames, label_size)
+    current = cpu_per_frame(frame_to_pixmap, frames, label_size)
+    shown = min(args.fps_captura, args.fps_vista) if args.fps_vista > 0 else args.fps_captura
+
+    print(f"{'Camino':<30}{'CPU/frame':>12}{'CPU por s de video':>22}")
+    print(f"{'cvtColor + escalado suave':<30}{legacy:>9.2f} ms{legacy * args.fps_captura / 1000:>21.1%}")
+    print(f"{'BGR888 + escalado rápido':<30}{current:>9.2f} ms{current * args.fps_captura / 1000:>21.1%}")
+    print(f"{f'  con tope de {args.fps_vista} FPS':<30}{current:>9.2f} ms{current * shown / 1000:>21.1%}")
+    print(f"Mejora por frame: {legacy / current:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+# escaner.py
+"""
+Escáner de asistencia sin interfaz gráfica (estaciones desatendidas).
+
+Captura y decodifica QR con el mismo pipeline que la GUI (modulos/escaneo.py),
+registra las asistencias con el escritor de commit agrupado y escribe un
+resultado por línea en formato JSON. No importa PyQt6.
+
+Uso:
+    python escaner.py 0                          # webcam 0
+    python escaner.py 0 2 --duracion 3600        # dos cámaras durante una hora
+    python escaner.py entrada.mp4 --salida escaneos.jsonl
+    python escaner.py fotos/ --sin-registro      # solo decodificar una carpeta de imágenes
+"""
+
+import sys
+import os
+import argparse
+import contextlib
+import json
+import signal
+import threading
+import time
+from datetime import datetime
+
+from modulos.escaneo import (
+    MultiCameraScanner, DebounceCache, is_camera_source, source_label, duplicate_sources,
+    DECODE_WORKERS, DEBOUNCE_WINDOW
+)
+from modulos.metricas import metrics, start_metrics_exporter, stop_metrics_exporter
+
+
+class JsonLinesLog:
+    """Escribe un objeto JSON por línea (desde varios hilos)."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def _scan_record(source, detection, result: dict = None, registered_at: float = None) -> dict:
+    record = {
+        "time": datetime.now().isoformat(timespec="milliseconds"),
+        "source": source_label(source),
+        "matricula": detection.data,
+        # captura -> decodificación; latency_ms (si se registró) es captura -> registro
+        "decode_latency_ms": round((detection.decoded_at - detection.captured_at) * 1000, 1),
+    }
+    if registered_at is not None:
+        record["latency_ms"] = round((registered_at - detection.captured_at) * 1000, 1)
+    if result is not None:
+        student = result.get("data")
+        record.update({
+            "status": result["status"],
+            "message": result["message"],
+            "student": f"{student.first_name} {student.last_name}" if student else None,
+            "course": getattr(student, "course", None),
+        })
+    return record
+
+
+def run_scanner(sources: list, log: JsonLinesLog, register: bool = True, realtime: bool = False,
+                decode_workers: int = DECODE_WORKERS, debounce: float = DEBOUNCE_WINDOW,
+                duration: float = None, metrics_path: str = None) -> dict:
+    """
+    Escanea las fuentes hasta que terminen (archivos), venza `duration` o se
+    reciba Ctrl+C / SIGTERM.
+
+    Args:
+        sources (list): IDs de cámara, videos o carpetas de imágenes.
+        log (JsonLinesLog): Destino de los resultados.
+        register (bool): Registrar la asistencia (False = solo decodificar).
+        realtime (bool): Reproducir los archivos a su ritmo nominal (con descarte de
+            frames, como una cámara); por defecto se decodifican todos sus frames.
+        decode_workers (int): Hilos de decodificación por fuente.
+        debounce (float): Ventana del filtro de repeticiones (segundos).
+        duration (float): Segundos máximos de escaneo.
+        metrics_path (str): Archivo donde volcar las métricas por etapa (por defecto,
+            [metricas] archivo de config.ini; sin archivo no se vuelcan).
+
+    Returns:
+        dict: Estadísticas por fuente (ver ScanPipeline.stats()).
+    """
+    if register:
+        from modulos.utilidades import setup_database
+        from modulos.cache_alumnos import roster_cache
+        from modulos.asistencia import start_attendance_writer, submit_attendance
+
+        setup_database()
+        roster_cache.warm()
+        start_attendance_writer()
+
+    def on_detection(source, detection):
+        if not register:
+            log.write(_scan_record(source, detection))
+            return
+        future = submit_attendance(detection.data)
+
+        def write_result(f):
+            # Escaneo completo: incluye la cola del escritor y el commit agrupado
+            registered_at = time.monotonic()
+            metrics.observe("registro", registered_at - detection.captured_at)
+            # Corre en el hilo del escritor: un error acá perdería el escaneo sin dejar rastro
+            try:
+                record = _scan_record(source, detection, f.result(), registered_at)
+            except Exception as e:
+                record = _scan_record(source, detection, registered_at=registered_at)
+                record.update({"status": "error", "message": f"Error al registrar: {e}"})
+            log.write(record)
+
+        future.add_done_callback(write_result)
+
+    # Las cámaras siempre descartan frames viejos; los archivos solo en modo tiempo real
+    only_files = not any(is_camera_source(source) for source in sources)
+    scanner = MultiCameraScanner(
+        sources,
+        on_detection=on_detection,
+        debounce=DebounceCache(debounce),
+        decode_workers=decode_workers,
+        realtime=realtime,
+        drop_frames=realtime or not only_files,
+    )
+
+    start_metrics_exporter(metrics_path)
+    stop_event = threading.Event()
+    previous_handler = signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+    scanner.start()
+    started = time.monotonic()
+    try:
+        while scanner.running and not stop_event.is_set():
+            if duration is not None and time.monotonic() - started >= duration:
+                break
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scanner.stop()
+        signal.signal(signal.SIGTERM, previous_handler)
+        if register:
+            from modulos.asistencia import stop_attendance_writer
+            stop_attendance_writer()
+        stop_metrics_exporter()
+
+    return scanner.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fuentes", nargs="+", help="ID de cámara, archivo de video o carpeta de imágenes")
+    parser.add_argument("--salida", help="Archivo JSONL de salida (por defecto, la salida estándar)")
+    parser.add_argument("--sin-registro", action="store_true", help="Solo decodificar, sin tocar la base de datos")
+    parser.add_argument("--tiempo-real", action="store_true",
+                        help="Reproducir archivos a su ritmo nominal, descartando frames como una cámara")
+    parser.add_argument("--hilos", type=int, default=DECODE_WORKERS, help="Hilos de decodificación por fuente")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_WINDOW,
+                        help="Segundos sin ver un código antes de volver a registrarlo")
+    parser.add_argument("--duracion", type=float, help="Segundos máximos de escaneo")
+    parser.add_argument("--metricas", help="Archivo de métricas por etapa (.json o texto de Prometheus)")
+    args = parser.parse_args()
+
+    for source in args.fuentes:
+        if not is_camera_source(source) and not os.path.exists(source):
+            parser.error(f"No existe la fuente: {source}")
+    duplicates = duplicate_sources(args.fuentes)
+    if duplicates:
+        parser.error(f"Fuentes repetidas: {', '.join(duplicates)}")
+
+    output = open(args.salida, "a", encoding="utf-8") if args.salida else sys.stdout
+    # Los mensajes informativos de los módulos van a stderr: la salida estándar
+    # queda solo con las líneas JSON
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            stats = run_scanner(
+                args.fuentes, JsonLinesLog(output), register=not args.sin_registro,
+                realtime=args.tiempo_real, decode_workers=args.hilos,
+                debounce=args.debounce, duration=args.duracion, metrics_path=args.metricas,
+            )
+    finally:
+        if args.salida:
+            output.close()
+
+    # Resumen final en stderr (la salida estándar queda solo con los escaneos)
+    for source, source_stats in stats.items():
+        print(f"{source_label(source)}: {source_stats['frames_captured']} frames, "
+              f"{source_stats['detections']} lecturas, {source_stats['capture_fps']:.1f} FPS, "
+              f"captura→decodificación p50 {source_stats['latency_p50_ms']:.0f} ms", file=sys.stderr)
+    registration = metrics.snapshot().get("registro")
+    if registration and registration["count"]:
+        print(f"Captura→registro: p50 {registration['p50_ms']:.0f} ms, p95 {registration['p95_ms']:.0f} ms "
+              f"(últimos {metrics.window} s)", file=sys.stderr)
+    if stats:
+        # El filtro de repeticiones es compartido: el contador es el mismo en todas las fuentes
+        print(f"Lecturas repetidas filtradas: {next(iter(stats.values()))['suppressed']}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
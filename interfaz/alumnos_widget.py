@@ -2,20 +2,54 @@
 
 import sys
 import os
+import shutil
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
-    QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
-    QMessageBox, QColorDialog, QFormLayout
+    QPushButton, QTableView, QAbstractItemView, QHeaderView,
+    QMessageBox, QColorDialog, QFormLayout, QFileDialog, QInputDialog, QProgressDialog
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from PyQt6.QtGui import QColor
 
 # Añade la raíz del proyecto al PATH para las importaciones (necesario si se ejecuta solo)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) 
 
-from modulos.alumnos import create_student
-# Importamos también el modelo Attendance para eliminar registros relacionados
-from modulos.utilidades import Session, Student, MAIN_EXPORT_FOLDER, Attendance 
+from modulos.alumnos import create_student, delete_student, get_student_qr_path
+from modulos.utilidades import MAIN_EXPORT_FOLDER
+from interfaz.modelo_alumnos import StudentTableModel
+# La importación (pandas) y las hojas de QR se importan al usarlas, para no demorar el inicio
+
+class ImportWorker(QThread):
+    """Ejecuta la importación masiva fuera del hilo de la GUI."""
+    finished_import = pyqtSignal(dict)
+
+    def __init__(self, path, qr_color, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.qr_color = qr_color
+
+    def run(self):
+        from modulos.importacion import import_students
+        try:
+            report = import_students(self.path, self.qr_color)
+        except Exception as e:
+            report = {"fatal": str(e)}
+        self.finished_import.emit(report)
+
+class SheetWorker(QThread):
+    """Genera las hojas de QR de un curso fuera del hilo de la GUI."""
+    progress = pyqtSignal(int, int)
+    finished_sheets = pyqtSignal(str)
+
+    def __init__(self, course, fmt, parent=None):
+        super().__init__(parent)
+        self.course = course
+        self.fmt = fmt
+
+    def run(self):
+        from modulos.hojas_qr import generate_course_sheets
+        result = generate_course_sheets(self.course, self.fmt, progress=self.progress.emit)
+        self.finished_sheets.emit(result)
 
 class AlumnosWidget(QWidget):
     def __init__(self, parent=None):
@@ -58,6 +92,11 @@ class AlumnosWidget(QWidget):
         self.btn_register.setStyleSheet("background-color: #6a0dad;") # Morado más fuerte
         self.btn_register.clicked.connect(self.register_new_student)
 
+        # Importación masiva desde CSV/XLSX
+        self.btn_import = QPushButton("Importar Alumnos (CSV/XLSX)")
+        self.btn_import.clicked.connect(self.import_students_file)
+        self.import_worker = None
+
         # Organización de campos en un QFormLayout
         layout = QFormLayout()
         layout.addRow("Matrícula:", self.field_matricula)
@@ -68,6 +107,7 @@ class AlumnosWidget(QWidget):
         
         form_layout.addLayout(layout)
         form_layout.addWidget(self.btn_register)
+        form_layout.addWidget(self.btn_import)
         form_layout.addStretch(1) # Rellena el espacio
         
         self.main_layout.addWidget(form_widget)
@@ -100,14 +140,53 @@ class AlumnosWidget(QWidget):
 
         if new_student:
             QMessageBox.information(self, "Registro Exitoso", 
-                                    f"Alumno {nombre} {apellido} registrado. QR guardado en la carpeta 'datos QR'.")
+                                    f"Alumno {nombre} {apellido} registrado. Su QR se genera al descargarlo o imprimirlo.")
             self.clear_fields()
-            self.load_students() # Recargar la tabla
+            # Solo se agrega su fila (si ya se leyeron todas las páginas; si no, aparece al desplazarse)
+            self.student_model.insert_student(matricula)
         else:
             # El error ya fue impreso en consola por create_student (ej: matrícula duplicada)
             QMessageBox.critical(self, "Error de Registro", 
                                  "No se pudo registrar al alumno. Verifique que la matrícula no esté duplicada.")
 
+    def import_students_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Importar Alumnos", "", "Padrón de alumnos (*.csv *.xlsx)"
+        )
+        if not path:
+            return
+
+        # El color seleccionado se usa para las filas que no traen columna de color
+        self.import_worker = ImportWorker(path, self.selected_color.name()[1:], self)
+        self.import_worker.finished_import.connect(self.on_import_finished)
+        self.btn_import.setEnabled(False)
+        self.btn_import.setText("Importando...")
+        self.import_worker.start()
+
+    def on_import_finished(self, report):
+        self.btn_import.setEnabled(True)
+        self.btn_import.setText("Importar Alumnos (CSV/XLSX)")
+        self.import_worker = None
+
+        if "fatal" in report:
+            QMessageBox.critical(self, "Error de Importación", f"No se pudo leer el archivo:\n{report['fatal']}")
+            return
+
+        # Los QR no se generan al importar: se crean al descargarlos o imprimirlos
+        summary = (f"{report['inserted']} de {report['total']} alumnos importados.\n"
+                   f"Tiempo: {report['seconds']:.1f} s ({report['rows_per_second']:.0f} filas/s)")
+        if report["errors"]:
+            # Se muestran las primeras líneas con error; el resto se imprime en consola
+            details = "\n".join(f"Línea {line} ({matricula or 'sin matrícula'}): {message}"
+                                for line, matricula, message in report["errors"][:20])
+            for line, matricula, message in report["errors"]:
+                print(f"Importación - línea {line} ({matricula}): {message}")
+            QMessageBox.warning(self, "Importación con Errores",
+                                f"{summary}\n\n{len(report['errors'])} filas con error:\n{details}")
+        else:
+            QMessageBox.information(self, "Importación Exitosa", summary)
+        self.load_students()
+
     def clear_fields(self):
         self.field_matricula.clear()
         self.field_nombre.clear()
@@ -128,12 +207,16 @@ class AlumnosWidget(QWidget):
         
         list_layout.addWidget(QLabel("<h2>Alumnos Registrados</h2>"))
         
-        # Tabla
-        self.student_table = QTableWidget()
-        self.student_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers) # <--- DESHABILITA LA EDICIÓN
-        self.student_table.setColumnCount(4)
-        self.student_table.setHorizontalHeaderLabels(["Matrícula", "Nombre", "Curso", "Registrado"])
+        # Tabla: modelo con carga por páginas (solo se leen las filas a las que llega la vista)
+        self.student_model = StudentTableModel(parent=self)
+        self.student_table = QTableView()
+        self.student_table.setModel(self.student_model)
+        self.student_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers) # <--- DESHABILITA LA EDICIÓN
+        self.student_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.student_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self.student_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        # Alto de fila fijo: la vista no mide cada fila al insertar páginas
+        self.student_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         
         list_layout.addWidget(self.student_table)
         
@@ -144,6 +227,11 @@ class AlumnosWidget(QWidget):
         
         self.btn_export_qr = QPushButton("Descargar QR Seleccionado")
         self.btn_export_qr.setEnabled(False) # Se activa al seleccionar fila
+
+        # Hojas imprimibles con los QR de todo un curso
+        self.btn_print_course = QPushButton("Imprimir QR por Curso")
+        self.btn_print_course.clicked.connect(self.print_course_sheets)
+        self.sheet_worker = None
         
         # Botón de Eliminar
         self.btn_delete = QPushButton("Eliminar Alumno")
@@ -152,15 +240,18 @@ class AlumnosWidget(QWidget):
 
         # Conectar señales para habilitar/deshabilitar botones al seleccionar fila
         def enable_row_buttons():
-            is_row_selected = len(self.student_table.selectedItems()) > 0
+            is_row_selected = self.student_table.selectionModel().hasSelection()
             self.btn_export_qr.setEnabled(is_row_selected)
             self.btn_delete.setEnabled(is_row_selected)
 
-        self.student_table.itemSelectionChanged.connect(enable_row_buttons)
+        self.student_table.selectionModel().selectionChanged.connect(enable_row_buttons)
+        self.student_model.modelReset.connect(enable_row_buttons)
         self.btn_delete.clicked.connect(self.delete_selected_student) # Conexión a la nueva función
+        self.btn_export_qr.clicked.connect(self.download_selected_qr)
         
         control_layout.addWidget(self.btn_refresh)
         control_layout.addWidget(self.btn_export_qr)
+        control_layout.addWidget(self.btn_print_course)
         control_layout.addWidget(self.btn_delete)
         
         list_layout.addLayout(control_layout)
@@ -168,35 +259,90 @@ class AlumnosWidget(QWidget):
         self.main_layout.addWidget(list_widget, 1) # Toma el resto del espacio
 
     def load_students(self):
-        """Carga todos los alumnos de la base de datos en la tabla."""
-        session = Session()
-        students = session.query(Student).all()
-        session.close()
-
-        self.student_table.setRowCount(len(students))
-        
-        for row, student in enumerate(students):
-            # Matrícula
-            self.student_table.setItem(row, 0, QTableWidgetItem(student.matricula))
-            # Nombre completo
-            self.student_table.setItem(row, 1, QTableWidgetItem(f"{student.first_name} {student.last_name}"))
-            # Curso
-            self.student_table.setItem(row, 2, QTableWidgetItem(student.course or "N/A"))
-            # Fecha de Registro
-            self.student_table.setItem(row, 3, QTableWidgetItem(student.registered_on.strftime("%Y-%m-%d")))
+        """Recarga la tabla desde la primera página (el resto se lee al desplazarse)."""
+        self.student_model.refresh()
+
+    def selected_student(self):
+        """Fila (StudentRow) seleccionada en la tabla, o None."""
+        selected_rows = self.student_table.selectionModel().selectedRows()
+        if not selected_rows:
+            return None
+        return self.student_model.student_at(selected_rows[0].row())
+
+    def download_selected_qr(self):
+        """Genera (si no está en caché) el QR del alumno seleccionado y lo guarda donde elija el usuario."""
+        student = self.selected_student()
+        if student is None:
+            return
+
+        matricula = student.matricula
+        qr_path = get_student_qr_path(matricula)
+        if not qr_path:
+            QMessageBox.critical(self, "Error de QR", f"No se pudo generar el QR de la matrícula {matricula}.")
+            return
+
+        destination, _ = QFileDialog.getSaveFileName(
+            self, "Guardar QR", os.path.join(str(MAIN_EXPORT_FOLDER), os.path.basename(qr_path)), "Imagen PNG (*.png)"
+        )
+        if not destination:
+            return
+        try:
+            shutil.copyfile(qr_path, destination)
+            QMessageBox.information(self, "QR Guardado", f"QR guardado en:\n{destination}")
+        except OSError as e:
+            QMessageBox.critical(self, "Error al Guardar", f"No se pudo guardar el QR. Error: {e}")
+
+    def print_course_sheets(self):
+        """Genera un PDF (o PNG por hoja) con los QR y nombres de todos los alumnos de un curso."""
+        from modulos.hojas_qr import list_courses
+        courses = list_courses()
+        if not courses:
+            QMessageBox.warning(self, "Sin Cursos", "No hay alumnos con curso registrado.")
+            return
+
+        course, ok = QInputDialog.getItem(self, "Imprimir QR por Curso", "Curso:", courses, 0, False)
+        if not ok:
+            return
+        fmt, ok = QInputDialog.getItem(self, "Imprimir QR por Curso", "Formato:", ["pdf", "png"], 0, False)
+        if not ok:
+            return
+
+        self.sheet_progress = QProgressDialog(f"Generando hojas de QR de {course}...", None, 0, 0, self)
+        self.sheet_progress.setWindowTitle("Imprimir QR por Curso")
+        self.sheet_progress.setWindowModality(Qt.WindowModality.WindowModal)
+        self.sheet_progress.show()
+
+        self.sheet_worker = SheetWorker(course, fmt, self)
+        self.sheet_worker.progress.connect(self.on_sheet_progress)
+        self.sheet_worker.finished_sheets.connect(self.on_sheets_finished)
+        self.btn_print_course.setEnabled(False)
+        self.sheet_worker.start()
+
+    def on_sheet_progress(self, done, total):
+        self.sheet_progress.setMaximum(total)
+        self.sheet_progress.setValue(done)
+        self.sheet_progress.setLabelText(f"Hoja {done} de {total}...")
+
+    def on_sheets_finished(self, result):
+        self.sheet_progress.close()
+        self.btn_print_course.setEnabled(True)
+        self.sheet_worker = None
+
+        if result.startswith("Error"):
+            QMessageBox.critical(self, "Error al Generar Hojas", result)
+        else:
+            QMessageBox.information(self, "Hojas Generadas", f"✅ Hojas de QR guardadas en:\n{result}")
 
     def delete_selected_student(self):
         """Elimina al alumno seleccionado y sus registros de asistencia."""
-        selected_rows = self.student_table.selectedIndexes()
+        student = self.selected_student()
         
-        if not selected_rows:
+        if student is None:
             QMessageBox.warning(self, "Selección", "Debe seleccionar un alumno para eliminar.")
             return
 
-        # Obtenemos la matrícula de la fila seleccionada (columna 0)
-        row_index = selected_rows[0].row()
-        matricula = self.student_table.item(row_index, 0).text()
-        nombre = self.student_table.item(row_index, 1).text()
+        matricula = student.matricula
+        nombre = student.name
 
         # Preguntar confirmación
         reply = QMessageBox.question(self, 'Confirmar Eliminación',
@@ -204,24 +350,14 @@ class AlumnosWidget(QWidget):
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
 
         if reply == QMessageBox.StandardButton.Yes:
-            session = Session()
             try:
-                # 1. Eliminar asistencias relacionadas primero
-                session.query(Attendance).filter(Attendance.matricula == matricula).delete(synchronize_session=False) 
-                
-                # 2. Eliminar al alumno
-                student = session.query(Student).filter(Student.matricula == matricula).one()
-                session.delete(student)
-                
-                session.commit()
+                # Elimina asistencias, resumen diario, caché del padrón y al alumno
+                delete_student(matricula)
                 QMessageBox.information(self, "Eliminación Exitosa", f"Alumno {nombre} eliminado correctamente.")
-                self.load_students() # Recargar la tabla
+                self.student_model.remove_student(matricula) # Solo se quita su fila
                 
             except Exception as e:
-                session.rollback()
                 QMessageBox.critical(self, "Error de DB", f"No se pudo eliminar al alumno. Error: {e}")
-            finally:
-                session.close()
 
 # --- Prueba del Módulo (Opcional, pero no necesario si se integra directamente) ---
 if __name__ == '__main__':
@@ -0,0 +1,346 @@
+# interfaz/camara_widget.py
+
+import sys
+import os
+import math
+import time
+from PyQt6.QtWidgets import (
+    QWidget, QHBoxLayout, QVBoxLayout, QLabel, QPushButton, QComboBox,
+    QGridLayout, QSizePolicy, QFileDialog
+)
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+# Ajuste de PATH para importar módulos del proyecto (necesario si se ejecuta solo)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Importamos el módulo de cámara
+from modulos.camara import CameraStreamer, CameraDiscovery
+from modulos.escaneo import DebounceCache, source_label, load_camera_cache
+# Importamos la función de registro de asistencia (Prioridad 5)
+from modulos.asistencia import submit_attendance, pending_attendance
+from modulos.configuracion import get_setting
+from modulos.metricas import metrics, STAGES
+
+# Tope de FPS de la vista previa (independiente de la captura y la decodificación)
+PREVIEW_FPS = get_setting("camara", "preview_fps", 30, int)
+# Opción del selector que inicia todas las fuentes a la vez
+ALL_SOURCES = "__todas__"
+
+def frame_to_pixmap(frame, size, transform=Qt.TransformationMode.FastTransformation) -> QPixmap:
+    """
+    Convierte un frame BGR de OpenCV en un QPixmap del tamaño de la vista previa.
+
+    El buffer de numpy se envuelve directamente como Format_BGR888 (sin copia de
+    conversión de color) y se escala una sola vez antes de pasar a QPixmap.
+    """
+    h, w = frame.shape[:2]
+    image = QImage(frame.data, w, h, frame.strides[0], QImage.Format.Format_BGR888)
+    image = image.scaled(size, Qt.AspectRatioMode.KeepAspectRatio, transform)
+    return QPixmap.fromImage(image)
+
+
+class CameraWidget(QWidget):
+    """Widget que contiene la vista de la cámara y los controles."""
+    # Resultado de un registro (se emite desde el hilo escritor y llega al hilo de la GUI)
+    registration_done = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Un streamer y un recuadro de vista previa por fuente activa
+        self.camera_streamers = []
+        self.preview_tiles = []
+        # Filtro de repeticiones compartido por todas las cámaras
+        self.debounce = DebounceCache()
+
+        # Vista previa: CPU del hilo principal por frame mostrado
+        self.preview_frames = 0
+        self.preview_cpu = 0.0
+        
+        self.setup_ui()
+        self.registration_done.connect(self.show_registration_result)
+        self.setup_camera()
+
+    def setup_ui(self):
+        # Layout principal de la pestaña de asistencia
+        main_layout = QHBoxLayout(self)
+        
+        # Panel Izquierdo: Visualización de la Cámara (70% del ancho)
+        # Con varias cámaras, el área se reparte en una cuadrícula de recuadros
+        self.feed_area = QWidget()
+        self.feed_area.setFixedSize(640, 480) # Tamaño estándar para la vista de la cámara
+        self.feed_grid = QGridLayout(self.feed_area)
+        self.feed_grid.setContentsMargins(0, 0, 0, 0)
+        self.feed_grid.setSpacing(4)
+        self.camera_feed = QLabel("Iniciando Cámara...")
+        self.camera_feed.setObjectName("CameraFeed")
+        self.camera_feed.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.feed_grid.addWidget(self.camera_feed, 0, 0)
+        main_layout.addWidget(self.feed_area, 70) # 70% de espacio
+        
+        # Panel Derecho: Controles y Registro (30% del ancho)
+        control_panel = QVBoxLayout()
+        
+        # Selección de Cámara
+        control_panel.addWidget(QLabel("Seleccionar Cámara:"))
+        self.camera_selector = QComboBox()
+        control_panel.addWidget(self.camera_selector)
+        # Video o carpeta de imágenes en lugar de una webcam (pruebas y grabaciones)
+        self.btn_add_source = QPushButton("Agregar Video/Imágenes...")
+        self.btn_add_source.clicked.connect(self.add_file_source)
+        control_panel.addWidget(self.btn_add_source)
+        
+        # Botones
+        self.btn_start = QPushButton("Iniciar Asistencia")
+        self.btn_stop = QPushButton("Detener Asistencia")
+        self.btn_stop.setEnabled(False) # Deshabilitado al inicio
+        
+        control_panel.addWidget(self.btn_start)
+        control_panel.addWidget(self.btn_stop)
+        
+        # Área de Información / Registro
+        control_panel.addStretch(1) # Espacio flexible
+        control_panel.addWidget(QLabel("Último Registro:"))
+        self.last_registration_label = QLabel("Esperando escaneo...")
+        control_panel.addWidget(self.last_registration_label)
+        self.queue_label = QLabel("En cola: 0")
+        control_panel.addWidget(self.queue_label)
+        control_panel.addStretch(2)
+
+        # Rendimiento del escaneo (se actualiza cada segundo mientras la cámara está activa)
+        self.stats_label = QLabel("")
+        self.stats_label.setStyleSheet("color: #a6adc8; font-size: 11px;")
+        control_panel.addWidget(self.stats_label)
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setInterval(1000)
+        self.stats_timer.timeout.connect(self.update_stats)
+
+        # Panel de métricas por etapa (oculto por defecto)
+        self.btn_metrics = QPushButton("Mostrar Métricas")
+        self.btn_metrics.setCheckable(True)
+        self.btn_metrics.setEnabled(metrics.enabled)
+        self.btn_metrics.toggled.connect(self.toggle_metrics)
+        control_panel.addWidget(self.btn_metrics)
+        self.metrics_label = QLabel("")
+        self.metrics_label.setStyleSheet("color: #a6adc8; font-family: monospace; font-size: 11px;")
+        self.metrics_label.hide()
+        control_panel.addWidget(self.metrics_label)
+
+        # La vista previa toma el último frame del streamer a PREVIEW_FPS como máximo
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setInterval(int(1000 / PREVIEW_FPS) if PREVIEW_FPS > 0 else 1)
+        self.preview_timer.timeout.connect(self.pull_frame)
+        
+        main_layout.addLayout(control_panel, 30) # 30% de espacio
+
+    def setup_camera(self):
+        # 1. Conexión de señales
+        self.btn_start.clicked.connect(self.start_camera)
+        self.btn_stop.clicked.connect(self.stop_camera)
+
+        # 2. Mostrar al instante las cámaras de la última vez; la detección real
+        #    corre en segundo plano cuando la ventana ya está visible
+        self.populate_cameras(load_camera_cache())
+        self.camera_feed.setText("Buscando cámaras...")
+        self.camera_discovery = CameraDiscovery(self)
+        self.camera_discovery.cameras_found.connect(self.on_cameras_found)
+        QTimer.singleShot(0, self.camera_discovery.start)
+
+    def populate_cameras(self, cameras):
+        """Reemplaza las cámaras del selector (conserva videos/carpetas agregados)."""
+        selected = self.camera_selector.currentData()
+        files = [(self.camera_selector.itemText(i), self.camera_selector.itemData(i))
+                 for i in range(self.camera_selector.count())
+                 if isinstance(self.camera_selector.itemData(i), str) and self.camera_selector.itemData(i) != ALL_SOURCES]
+        self.camera_selector.clear()
+        for cam_id in cameras:
+            self.add_source(f"Cámara ID {cam_id}", cam_id)
+        for label, path in files:
+            self.add_source(label, path)
+        if self.camera_selector.findData(selected) >= 0:
+            self.camera_selector.setCurrentIndex(self.camera_selector.findData(selected))
+        self.btn_start.setEnabled(self.camera_selector.count() > 0 and not self.camera_streamers)
+
+    def on_cameras_found(self, cameras):
+        self.populate_cameras(cameras)
+        if self.camera_streamers:
+            return
+        if not cameras:
+            self.camera_feed.setText("❌ No se detectaron cámaras.")
+        else:
+            self.camera_feed.setText("Seleccione una cámara e inicie la asistencia.")
+
+    def add_source(self, label, source):
+        """Agrega una fuente al selector (y la opción 'Todas' cuando hay más de una)."""
+        self.camera_selector.addItem(label, source)
+        if self.camera_selector.count() == 2:
+            self.camera_selector.addItem("Todas las cámaras", ALL_SOURCES)
+        elif self.camera_selector.findData(ALL_SOURCES) >= 0:
+            # 'Todas' queda siempre al final
+            index = self.camera_selector.findData(ALL_SOURCES)
+            self.camera_selector.removeItem(index)
+            self.camera_selector.addItem("Todas las cámaras", ALL_SOURCES)
+        self.btn_start.setEnabled(not self.camera_streamers)
+
+    def add_file_source(self):
+        """Permite escanear desde un video o una carpeta de imágenes."""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Seleccionar video o imagen", "",
+            "Videos e imágenes (*.mp4 *.avi *.mkv *.mov *.png *.jpg *.jpeg *.bmp)"
+        )
+        if not path:
+            return
+        if not path.lower().endswith((".mp4", ".avi", ".mkv", ".mov")):
+            # Una imagen: se escanea toda su carpeta
+            path = os.path.dirname(path)
+        self.add_source(source_label(path), path)
+        self.camera_selector.setCurrentIndex(self.camera_selector.findData(path))
+
+    def selected_sources(self) -> list:
+        source = self.camera_selector.currentData()
+        if source == ALL_SOURCES:
+            return [self.camera_selector.itemData(i) for i in range(self.camera_selector.count())
+                    if self.camera_selector.itemData(i) != ALL_SOURCES]
+        return [source] if source is not None else []
+
+    def start_camera(self):
+        if self.camera_streamers:
+            return
+        sources = self.selected_sources()
+        if not sources:
+            return
+
+        # Cuadrícula de vista previa: 1 recuadro, 2x1, 2x2, 3x2...
+        columns = math.ceil(math.sqrt(len(sources)))
+        self.camera_feed.hide()
+        self.debounce.clear()
+        for index, source in enumerate(sources):
+            tile = QLabel(source_label(source))
+            tile.setObjectName("CameraFeed")
+            tile.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            tile.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+            self.feed_grid.addWidget(tile, index // columns, index % columns)
+            self.preview_tiles.append(tile)
+
+            # Inicializar el streamer (todas las fuentes comparten el filtro de repeticiones)
+            streamer = CameraStreamer(camera_id=source, debounce=self.debounce)
+            # Conectar las señales del hilo a los slots de la GUI
+            streamer.qr_detected.connect(self.handle_qr_scan)
+            streamer.start()
+            self.camera_streamers.append(streamer)
+
+        self.preview_timer.start()
+        self.stats_timer.start()
+        
+        self.btn_start.setEnabled(False)
+        self.btn_stop.setEnabled(True)
+
+    def stop_camera(self):
+        if self.camera_streamers:
+            self.preview_timer.stop()
+            self.stats_timer.stop()
+            for streamer in self.camera_streamers:
+                streamer.stop()
+            for tile in self.preview_tiles:
+                self.feed_grid.removeWidget(tile)
+                tile.deleteLater()
+            self.camera_streamers = []
+            self.preview_tiles = []
+            self.btn_start.setEnabled(True)
+            self.btn_stop.setEnabled(False)
+            self.camera_feed.setText("Cámara detenida.")
+            self.camera_feed.show()
+            
+    def update_stats(self):
+        """Muestra FPS de captura, decodificaciones por segundo y latencia de escaneo por cámara."""
+        if not self.camera_streamers:
+            return
+        self.update_queue_depth()
+        lines = []
+        for streamer in self.camera_streamers:
+            stats = streamer.stats()
+            lines.append(
+                f"{source_label(streamer.camera_id)}: {stats['capture_fps']:.1f} FPS | "
+                f"decod. {stats['decode_fps']:.1f}/s | captura→decodificación p50 {stats['latency_p50_ms']:.0f} ms, "
+                f"p95 {stats['latency_p95_ms']:.0f} ms | {stats['preview_dropped']} descartados"
+            )
+        registration = metrics.snapshot().get("registro")
+        if registration and registration["count"]:
+            lines.append(f"Captura→registro: p50 {registration['p50_ms']:.0f} ms, "
+                         f"p95 {registration['p95_ms']:.0f} ms (últimos {metrics.window} s)")
+        lines.append(f"Repeticiones filtradas: {self.debounce.suppressed}")
+        lines.append(f"Vista previa: {self.preview_cpu * 1000 / max(1, self.preview_frames):.1f} ms CPU/frame")
+        self.stats_label.setText("\n".join(lines))
+        if self.metrics_label.isVisible():
+            self.update_metrics()
+
+    def toggle_metrics(self, checked):
+        self.btn_metrics.setText("Ocultar Métricas" if checked else "Mostrar Métricas")
+        self.metrics_label.setVisible(checked)
+        if checked:
+            self.update_metrics()
+
+    def update_metrics(self):
+        """Tabla de tiempos por etapa (ventana deslizante de modulos/metricas.py)."""
+        snapshot = metrics.snapshot()
+        lines = [f"{'Etapa':<15}{'/s':>6}{'p50':>8}{'p95':>8}{'p99':>8}  (ms, últimos {metrics.window} s)"]
+        for stage in STAGES:
+            stats = snapshot.get(stage)
+            if stats is None or not stats["count"]:
+                lines.append(f"{stage:<15}{'-':>6}")
+                continue
+            lines.append(f"{stage:<15}{stats['rate']:>6.1f}{stats['p50_ms']:>8.1f}"
+                         f"{stats['p95_ms']:>8.1f}{stats['p99_ms']:>8.1f}")
+        self.metrics_label.setText("\n".join(lines))
+
+    def pull_frame(self):
+        """Toma el frame más reciente de cada streamer (los que no se alcanzaron a mostrar se descartan)."""
+        for streamer, tile in zip(self.camera_streamers, self.preview_tiles):
+            frame = streamer.latest_frame()
+            if frame is not None:
+                self.update_frame(frame, tile)
+
+    def update_frame(self, frame, tile):
+        """Muestra el frame de OpenCV en el recuadro de su cámara."""
+        cpu_start = time.thread_time()
+        render_start = time.perf_counter()
+        try:
+            tile.setPixmap(frame_to_pixmap(frame, tile.size()))
+        except Exception as e:
+            print(f"Error al actualizar frame: {e}")
+        metrics.observe("render", time.perf_counter() - render_start)
+        self.preview_cpu += time.thread_time() - cpu_start
+        self.preview_frames += 1
+
+    def handle_qr_scan(self, qr_data, captured_at):
+        """Maneja el dato del QR escaneado (matrícula) y registra la asistencia."""
+        # El streamer ya filtró las repeticiones del mismo código (ver DebounceCache),
+        # así que el stream sigue corriendo y cada alumno llega una sola vez.
+
+        # 1. Encolar el registro (Prioridad 5) sin bloquear la GUI: la consulta y el
+        #    commit ocurren en el hilo escritor y el resultado vuelve por una señal.
+        future = submit_attendance(qr_data, timeout=0)
+        future.add_done_callback(lambda f: self._registration_finished(f, captured_at))
+        self.update_queue_depth()
+
+    def _registration_finished(self, future, captured_at):
+        """Callback del escritor: mide el escaneo completo y pasa el resultado a la GUI."""
+        metrics.observe("registro", time.monotonic() - captured_at)
+        self.registration_done.emit(future.result())
+
+    def show_registration_result(self, result):
+        """Actualiza la etiqueta con el resultado del registro (hilo de la GUI)."""
+        self.last_registration_label.setText(f"{result['message']}")
+        
+        # Establecer el color del mensaje según el estado
+        color_map = {
+            "success": "lime",   # Verde
+            "warning": "yellow", # Amarillo
+            "error": "red"       # Rojo
+        }
+        status_color = color_map.get(result['status'], "white")
+        self.last_registration_label.setStyleSheet(f"color: {status_color}; font-weight: bold;")
+        self.update_queue_depth()
+
+    def update_queue_depth(self):
+        self.queue_label.setText(f"En cola: {pending_attendance()}")
@@ -0,0 +1,175 @@
+# interfaz/modelo_alumnos.py
+
+import sys
+import os
+from bisect import bisect_left
+from typing import NamedTuple, Optional
+from datetime import datetime
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+# Ajuste de PATH para importar módulos del proyecto (necesario si se ejecuta solo)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modulos.utilidades import Session, Student
+from modulos.configuracion import get_setting
+
+# Alumnos que se leen por página (la vista pide la siguiente al llegar al final)
+STUDENT_PAGE_SIZE = get_setting("interfaz", "pagina_alumnos", 200, int)
+
+COLUMNS = ["Matrícula", "Nombre", "Curso", "Registrado"]
+
+
+class StudentRow(NamedTuple):
+    """Fila de la tabla: solo las columnas que se muestran (sin objetos del ORM)."""
+    id: int
+    matricula: str
+    name: str
+    course: Optional[str]
+    registered_on: Optional[datetime]
+
+    def display(self, column: int) -> str:
+        if column == 0:
+            return self.matricula
+        if column == 1:
+            return self.name
+        if column == 2:
+            return self.course or "N/A"
+        return self.registered_on.strftime("%Y-%m-%d") if self.registered_on else ""
+
+
+def _student_rows(query) -> list:
+    return [StudentRow(row.id, row.matricula, f"{row.first_name} {row.last_name}", row.course, row.registered_on)
+            for row in query]
+
+
+class StudentTableModel(QAbstractTableModel):
+    """
+    Modelo de la tabla de alumnos con carga por páginas.
+
+    Las filas se leen en orden de id con paginación por clave (WHERE id > último
+    id leído LIMIT n), así que cada página cuesta lo mismo sin importar cuántas
+    se hayan leído antes. La vista pide la página siguiente (canFetchMore/fetchMore)
+    cuando se desplaza hasta el final. Altas y bajas se aplican fila por fila sin
+    recargar la tabla.
+    """
+
+    def __init__(self, page_size: int = STUDENT_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.page_size = max(1, page_size)
+        self._rows = []
+        self._ids = []          # ids de _rows (ordenados) para ubicar filas por búsqueda binaria
+        self._exhausted = False
+
+    # --- Interfaz de QAbstractTableModel ---
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self._rows[index.row()].display(index.column())
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return COLUMNS[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        rows = self._fetch_page(self._ids[-1] if self._ids else 0)
+        if len(rows) < self.page_size:
+            self._exhausted = True
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self._ids.extend(row.id for row in rows)
+        self.endInsertRows()
+
+    # --- Consultas ---
+
+    def _query(self, session):
+        return session.query(Student.id, Student.matricula, Student.first_name,
+                             Student.last_name, Student.course, Student.registered_on)
+
+    def _fetch_page(self, after_id: int) -> list:
+        """Siguiente página por clave: alumnos con id mayor a `after_id`."""
+        session = Session()
+        try:
+            return _student_rows(
+                self._query(session).filter(Student.id > after_id).order_by(Student.id).limit(self.page_size)
+            )
+        finally:
+            session.close()
+
+    # --- Operaciones de la pestaña ---
+
+    def refresh(self):
+        """Descarta las filas leídas y vuelve a leer la primera página."""
+        self.beginResetModel()
+        self._rows = []
+        self._ids = []
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def student_at(self, row: int) -> StudentRow:
+        return self._rows[row]
+
+    def row_of(self, matricula: str) -> int:
+        """Fila de la matrícula entre las leídas (-1 si no está cargada)."""
+        for row, student in enumerate(self._rows):
+            if student.matricula == matricula:
+                return row
+        return -1
+
+    def insert_student(self, matricula: str) -> int:
+        """
+        Agrega la fila de un alumno recién creado sin recargar la tabla.
+
+        Si todavía quedan páginas sin leer, no se agrega: el alumno aparecerá en
+        su lugar (por id) cuando la vista llegue a esa página.
+
+        Returns:
+            int: Fila insertada, o -1 si no se insertó.
+        """
+        if not self._exhausted:
+            return -1
+        session = Session()
+        try:
+            rows = _student_rows(self._query(session).filter(Student.matricula == matricula))
+        finally:
+            session.close()
+        if not rows:
+            return -1
+        student = rows[0]
+        position = bisect_left(self._ids, student.id)
+        if position < len(self._ids) and self._ids[position] == student.id:
+            return position
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.insert(position, student)
+        self._ids.insert(position, student.id)
+        self.endInsertRows()
+        return position
+
+    def remove_student(self, matricula: str) -> bool:
+        """Quita la fila de un alumno eliminado sin recargar la tabla."""
+        row = self.row_of(matricula)
+        if row < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        del self._ids[row]
+        self.endRemoveRows()
+        return True
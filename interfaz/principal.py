@@ -1,24 +1,28 @@
 # interfaz/principal.py
 
 import sys
-# Importamos utilidades para configurar la DB
-from modulos.utilidades import setup_database 
-# Importamos el módulo de cámara
-from modulos.camara import CameraStreamer, list_available_cameras
-# Importamos la función de registro de asistencia (Prioridad 5)
-from modulos.asistencia import register_attendance 
-from interfaz.alumnos_widget import AlumnosWidget
-from interfaz.reportes_widget import ReportesWidget # <--- IMPORTACIÓN AÑADIDA
+import importlib
 
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QTabWidget, QPushButton, QComboBox, QMessageBox
+    QApplication, QMainWindow, QWidget, QVBoxLayout,
+    QLabel, QTabWidget, QMessageBox
 )
-from PyQt6.QtCore import Qt, QSize, QTimer
-from PyQt6.QtGui import QFont, QPalette, QColor, QImage, QPixmap
+from PyQt6.QtCore import Qt, QSize, QTimer, QThread, pyqtSignal
+from PyQt6.QtGui import QFont
 
-# Conversión de imagen (Necesario para pasar de OpenCV a PyQt6)
-import cv2 
+from modulos.configuracion import get_setting
+
+# Inicio diferido: la ventana aparece de inmediato, la DB se prepara en segundo plano
+# y cada pestaña (con sus módulos pesados: OpenCV, pandas, qrcode...) se construye
+# la primera vez que se abre. Con False se construye todo antes de mostrar la ventana.
+LAZY_STARTUP = get_setting("interfaz", "inicio_diferido", True, bool)
+
+# Pestañas: (título, módulo, clase del widget)
+TABS = (
+    ("Inicio / Dashboard", "interfaz.reportes_widget", "ReportesWidget"),
+    ("Gestión de Alumnos", "interfaz.alumnos_widget", "AlumnosWidget"),
+    ("Registro de Asistencia", "interfaz.camara_widget", "CameraWidget"),
+)
 
 # Colores y estilos (Mantenemos el mismo STYLE_SHEET)
 STYLE_SHEET = """
@@ -61,148 +65,62 @@ STYLE_SHEET = """
     }
 """
 
-class CameraWidget(QWidget):
-    """Widget que contiene la vista de la cámara y los controles."""
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.camera_streamer = None
-        self.current_camera_id = -1
-        
-        self.setup_ui()
-        self.setup_camera()
 
-    def setup_ui(self):
-        # Layout principal de la pestaña de asistencia
-        main_layout = QHBoxLayout(self)
-        
-        # Panel Izquierdo: Visualización de la Cámara (70% del ancho)
-        self.camera_feed = QLabel("Iniciando Cámara...")
-        self.camera_feed.setObjectName("CameraFeed")
-        self.camera_feed.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.camera_feed.setFixedSize(640, 480) # Tamaño estándar para la vista de la cámara
-        main_layout.addWidget(self.camera_feed, 70) # 70% de espacio
-        
-        # Panel Derecho: Controles y Registro (30% del ancho)
-        control_panel = QVBoxLayout()
-        
-        # Selección de Cámara
-        control_panel.addWidget(QLabel("Seleccionar Cámara:"))
-        self.camera_selector = QComboBox()
-        control_panel.addWidget(self.camera_selector)
-        
-        # Botones
-        self.btn_start = QPushButton("Iniciar Asistencia")
-        self.btn_stop = QPushButton("Detener Asistencia")
-        self.btn_stop.setEnabled(False) # Deshabilitado al inicio
-        
-        control_panel.addWidget(self.btn_start)
-        control_panel.addWidget(self.btn_stop)
-        
-        # Área de Información / Registro
-        control_panel.addStretch(1) # Espacio flexible
-        control_panel.addWidget(QLabel("Último Registro:"))
-        self.last_registration_label = QLabel("Esperando escaneo...")
-        control_panel.addWidget(self.last_registration_label)
-        control_panel.addStretch(2)
-        
-        main_layout.addLayout(control_panel, 30) # 30% de espacio
-
-    def setup_camera(self):
-        # 1. Listar cámaras disponibles
-        cameras = list_available_cameras()
-        if not cameras:
-            self.camera_feed.setText("❌ No se detectaron cámaras.")
-            self.btn_start.setEnabled(False)
-            return
+def prepare_backend():
+    """Configura la DB, precarga el padrón e inicia el escritor de asistencias."""
+    from modulos.utilidades import setup_database
+    from modulos.cache_alumnos import roster_cache
+    from modulos.asistencia import start_attendance_writer
+    from modulos.metricas import start_metrics_exporter
 
-        # 2. Llenar el ComboBox
-        for cam_id in cameras:
-            self.camera_selector.addItem(f"Cámara ID {cam_id}", cam_id)
-        
-        # 3. Conexión de señales
-        self.btn_start.clicked.connect(self.start_camera)
-        self.btn_stop.clicked.connect(self.stop_camera)
+    # Configuración de DB al inicio de la aplicación
+    setup_database()
+    # Precarga del padrón en memoria para que el escaneo no consulte SQLite
+    roster_cache.warm()
+    # Escritor de asistencias con commit agrupado (se vacía al cerrar)
+    start_attendance_writer()
+    # Volcado periódico de las métricas por etapa (solo si [metricas] archivo está configurado)
+    start_metrics_exporter()
 
-    def start_camera(self):
-        if self.camera_streamer and self.camera_streamer.running:
-            return
 
-        # Obtener el ID seleccionado
-        self.current_camera_id = self.camera_selector.currentData()
-        
-        # Inicializar el streamer
-        self.camera_streamer = CameraStreamer(camera_id=self.current_camera_id)
-        
-        # Conectar las señales del hilo a los slots de la GUI
-        self.camera_streamer.frame_ready.connect(self.update_frame)
-        self.camera_streamer.qr_detected.connect(self.handle_qr_scan)
-        
-        self.camera_streamer.start()
-        
-        self.btn_start.setEnabled(False)
-        self.btn_stop.setEnabled(True)
-        self.camera_feed.setText("Cámara activa...")
-
-    def stop_camera(self):
-        if self.camera_streamer:
-            self.camera_streamer.stop()
-            self.camera_streamer = None
-            self.btn_start.setEnabled(True)
-            self.btn_stop.setEnabled(False)
-            self.camera_feed.setText("Cámara detenida.")
-            self.camera_feed.clear() # Limpiar el feed
-            
-    def update_frame(self, frame):
-        """Convierte el frame de OpenCV a QPixmap para mostrar en el QLabel."""
+class StartupWorker(QThread):
+    """Prepara la base de datos sin bloquear el primer pintado de la ventana."""
+    ready = pyqtSignal(str)   # Vacío si todo salió bien, o el mensaje de error
+
+    def run(self):
         try:
-            # OpenCV usa BGR; debemos convertirlo a RGB para QImage
-            rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb_image.shape
-            bytes_per_line = ch * w
-            
-            # Crear QImage
-            convert_to_Qt_format = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format.Format_RGB888)
-            
-            # Escalar y mostrar
-            p = QPixmap.fromImage(convert_to_Qt_format)
-            self.camera_feed.setPixmap(p.scaled(self.camera_feed.size(), 
-                                               Qt.AspectRatioMode.KeepAspectRatio, 
-                                               Qt.TransformationMode.SmoothTransformation))
+            prepare_backend()
+            self.ready.emit("")
         except Exception as e:
-            print(f"Error al actualizar frame: {e}")
-
-    def handle_qr_scan(self, qr_data):
-        """Maneja el dato del QR escaneado (matrícula) y registra la asistencia."""
-        # 1. Pausamos el stream para evitar re-scaneo inmediato
-        if self.camera_streamer:
-            self.camera_streamer.pause()
-        
-        # 2. Llamar a la lógica de asistencia (Prioridad 5)
-        result = register_attendance(qr_data)
-        
-        # 3. Actualizar la etiqueta y el feedback al usuario
-        self.last_registration_label.setText(f"{result['message']}")
-        
-        # 4. Establecer el color del mensaje según el estado
-        color_map = {
-            "success": "lime",   # Verde
-            "warning": "yellow", # Amarillo
-            "error": "red"       # Rojo
-        }
-        status_color = color_map.get(result['status'], "white")
-        self.last_registration_label.setStyleSheet(f"color: {status_color}; font-weight: bold;")
+            self.ready.emit(str(e))
 
-        # 5. Reanudar el stream después de 3 segundos
-        QTimer.singleShot(3000, self.resume_camera_after_scan)
 
-
-    def resume_camera_after_scan(self):
-        if self.camera_streamer:
-            self.camera_streamer.resume()
+class LazyTab(QWidget):
+    """Pestaña que importa y construye su widget real la primera vez que se necesita."""
+    def __init__(self, module_name, class_name, parent=None):
+        super().__init__(parent)
+        self.module_name = module_name
+        self.class_name = class_name
+        self.widget = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.placeholder = QLabel("Preparando la base de datos...")
+        self.placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.placeholder)
+
+    def build(self):
+        if self.widget is None:
+            widget_class = getattr(importlib.import_module(self.module_name), self.class_name)
+            self.widget = widget_class()
+            self.layout().removeWidget(self.placeholder)
+            self.placeholder.deleteLater()
+            self.layout().addWidget(self.widget)
+        return self.widget
 
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, lazy=LAZY_STARTUP):
         super().__init__()
         self.setWindowTitle("PROYECTIS - Asistencia Docente QR")
         self.setMinimumSize(QSize(900, 600))
@@ -211,34 +129,71 @@ class MainWindow(QMainWindow):
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
         self.main_layout = QVBoxLayout(self.central_widget)
-        
-        # Configuración de DB al inicio de la aplicación
-        setup_database()
 
         self.tabs = QTabWidget()
         self.tabs.setFont(QFont("Arial", 10))
         
-        # 1. Dashboard (PUNTO B APLICADO)
-        self.tab_dashboard = ReportesWidget() # <-- WIDGET DE REPORTES INTEGRADO
-        
-        # 2. Gestión de Alumnos 
-        self.tab_alumnos = AlumnosWidget() # <-- WIDGET DE ALUMNOS INTEGRADO
-        
-        # 3. Pestaña de Asistencia
-        self.tab_asistencia = CameraWidget() 
-        
-        self.tabs.addTab(self.tab_dashboard, "Inicio / Dashboard")
-        self.tabs.addTab(self.tab_alumnos, "Gestión de Alumnos")
-        self.tabs.addTab(self.tab_asistencia, "Registro de Asistencia") 
+        # 1. Dashboard, 2. Gestión de Alumnos, 3. Registro de Asistencia
+        self.lazy_tabs = []
+        for title, module_name, class_name in TABS:
+            tab = LazyTab(module_name, class_name)
+            self.tabs.addTab(tab, title)
+            self.lazy_tabs.append(tab)
         
         self.main_layout.addWidget(self.tabs)
+
+        self.backend_ready = False
+        self.startup_worker = None
+        if lazy:
+            # La DB se prepara en segundo plano cuando la ventana ya está visible
+            self.tabs.currentChanged.connect(self.build_current_tab)
+            self.startup_worker = StartupWorker(self)
+            self.startup_worker.ready.connect(self.on_backend_ready)
+            QTimer.singleShot(0, self.startup_worker.start)
+        else:
+            prepare_backend()
+            self.backend_ready = True
+            for tab in self.lazy_tabs:
+                tab.build()
         
         # Aseguramos que la cámara se detenga al cerrar la aplicación
         QApplication.instance().aboutToQuit.connect(self.cleanup_camera)
 
+    @property
+    def tab_dashboard(self):
+        return self.lazy_tabs[0].widget
+
+    @property
+    def tab_alumnos(self):
+        return self.lazy_tabs[1].widget
+
+    @property
+    def tab_asistencia(self):
+        return self.lazy_tabs[2].widget
+
+    def on_backend_ready(self, error):
+        if error:
+            QMessageBox.critical(self, "Error de Base de Datos", f"No se pudo preparar la base de datos:\n{error}")
+            return
+        self.backend_ready = True
+        self.build_current_tab()
+
+    def build_current_tab(self, *_):
+        """Construye la pestaña visible (solo después de preparar la DB)."""
+        if self.backend_ready:
+            self.tabs.currentWidget().build()
+
     def cleanup_camera(self):
-        """Detiene la cámara al cerrar la ventana."""
-        self.tab_asistencia.stop_camera()
+        """Detiene la cámara al cerrar la ventana, escribe las asistencias pendientes y las métricas."""
+        if self.startup_worker is not None:
+            self.startup_worker.wait()
+        if self.tab_asistencia is not None:
+            self.tab_asistencia.stop_camera()
+            self.tab_asistencia.camera_discovery.wait(1000)
+        from modulos.asistencia import stop_attendance_writer
+        from modulos.metricas import stop_metrics_exporter
+        stop_attendance_writer()
+        stop_metrics_exporter()
 
 
 def run_gui():
@@ -251,4 +206,4 @@ def run_gui():
 
 
 if __name__ == '__main__':
-    run_gui()
\ No newline at end of file
+    run_gui()
@@ -2,13 +2,18 @@
 
 import sys
 import os
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QMessageBox, QFileDialog
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QMessageBox, QFileDialog, QComboBox,
+    QTableWidget, QTableWidgetItem, QHeaderView
+)
 from PyQt6.QtCore import Qt
 
 # Ajuste de PATH para importar módulos del proyecto (necesario si se ejecuta solo)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) 
 
-from modulos.reportes import get_attendance_data, export_attendance_to_csv
+from modulos.reportes import (export_attendance_incremental, get_export_high_water_mark,
+                              DEFAULT_EXPORT_NAME, NO_DATA_MESSAGE)
+from modulos.resumen import get_dashboard_summary, rebuild_daily_summary
 
 class ReportesWidget(QWidget):
     """Widget para la generación y exportación de reportes de asistencia."""
@@ -19,9 +24,32 @@ class ReportesWidget(QWidget):
     def setup_ui(self):
         main_layout = QVBoxLayout(self)
         main_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
+
+        self.setup_dashboard(main_layout)
         
         main_layout.addWidget(QLabel("<h2>Generación de Reportes</h2>"))
         main_layout.addWidget(QLabel("Haz clic para generar un archivo CSV con el registro histórico de todas las asistencias."))
+
+        # Formato de salida (la exportación se hace por bloques, sin cargar todo en memoria)
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel("Formato:"))
+        self.format_selector = QComboBox()
+        self.format_selector.addItem("CSV", "csv")
+        self.format_selector.addItem("CSV comprimido (gzip)", "csv.gz")
+        self.format_selector.addItem("Parquet (requiere pyarrow)", "parquet")
+        format_layout.addWidget(self.format_selector)
+
+        # Modo: historial completo o solo lo nuevo desde la última exportación
+        format_layout.addWidget(QLabel("Modo:"))
+        self.mode_selector = QComboBox()
+        self.mode_selector.addItem("Historial completo", "full")
+        self.mode_selector.addItem("Solo nuevos (desde la última exportación)", "delta")
+        format_layout.addWidget(self.mode_selector)
+        main_layout.addLayout(format_layout)
+
+        self.last_export_label = QLabel()
+        main_layout.addWidget(self.last_export_label)
+        self.update_last_export_label()
         
         self.btn_generate = QPushButton("Generar Reporte General de Asistencia")
         # Estilo para destacar el botón de exportación
@@ -31,17 +59,95 @@ class ReportesWidget(QWidget):
         main_layout.addWidget(self.btn_generate)
         main_layout.addStretch(1)
 
+    # -----------------------------------------------------------------
+    # RESUMEN: cifras de hoy y de la semana (tabla resumen_diario)
+    # -----------------------------------------------------------------
+
+    def setup_dashboard(self, main_layout):
+        main_layout.addWidget(QLabel("<h2>Resumen de Asistencia</h2>"))
+
+        totals_layout = QHBoxLayout()
+        self.today_label = QLabel()
+        self.week_label = QLabel()
+        for label in (self.today_label, self.week_label):
+            label.setStyleSheet("font-size: 14pt; font-weight: bold;")
+            totals_layout.addWidget(label)
+        main_layout.addLayout(totals_layout)
+
+        # Desglose por curso
+        self.summary_table = QTableWidget()
+        self.summary_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.summary_table.setColumnCount(3)
+        self.summary_table.setHorizontalHeaderLabels(["Curso", "Hoy", "Esta Semana"])
+        self.summary_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.summary_table.setMaximumHeight(200)
+        main_layout.addWidget(self.summary_table)
+
+        buttons_layout = QHBoxLayout()
+        self.btn_refresh_summary = QPushButton("Actualizar Resumen")
+        self.btn_refresh_summary.clicked.connect(self.refresh_summary)
+        self.btn_rebuild_summary = QPushButton("Reconstruir Resumen")
+        self.btn_rebuild_summary.clicked.connect(self.rebuild_summary)
+        buttons_layout.addWidget(self.btn_refresh_summary)
+        buttons_layout.addWidget(self.btn_rebuild_summary)
+        main_layout.addLayout(buttons_layout)
+
+        self.refresh_summary()
+
+    def showEvent(self, event):
+        # Las cifras salen del resumen ya calculado, así que refrescar al mostrar la pestaña es barato
+        super().showEvent(event)
+        self.refresh_summary()
+
+    def refresh_summary(self):
+        """Muestra las asistencias de hoy y de la semana actual por curso."""
+        summary = get_dashboard_summary()
+        self.today_label.setText(f"Hoy: {summary['today_total']}")
+        self.week_label.setText(
+            f"Esta semana (desde {summary['week_start'].strftime('%Y-%m-%d')}): {summary['week_total']}"
+        )
+
+        self.summary_table.setRowCount(len(summary["by_course"]))
+        for row, (course, today_count, week_count) in enumerate(summary["by_course"]):
+            self.summary_table.setItem(row, 0, QTableWidgetItem(course))
+            self.summary_table.setItem(row, 1, QTableWidgetItem(str(today_count)))
+            self.summary_table.setItem(row, 2, QTableWidgetItem(str(week_count)))
+
+    def rebuild_summary(self):
+        """Recalcula el resumen completo desde el historial (por si se modificó la DB externamente)."""
+        try:
+            rebuild_daily_summary()
+        except Exception as e:
+            QMessageBox.critical(self, "Error de DB", f"No se pudo reconstruir el resumen. Error: {e}")
+            return
+        self.refresh_summary()
+
+    def update_last_export_label(self):
+        """Muestra hasta qué asistencia llegó la última exportación (marca de agua)."""
+        state = get_export_high_water_mark(DEFAULT_EXPORT_NAME)
+        if state is None:
+            self.last_export_label.setText("Última exportación: ninguna")
+        else:
+            self.last_export_label.setText(
+                f"Última exportación: {state.exported_on.strftime('%Y-%m-%d %H:%M:%S')} "
+                f"(hasta la asistencia #{state.last_attendance_id})"
+            )
+
     def generate_report(self):
-        # 1. Obtener datos
-        df = get_attendance_data()
+        # 1. Exportar por bloques directamente desde la DB al archivo
+        fmt = self.format_selector.currentData()
+        mode = self.mode_selector.currentData()
+        export_result_path = export_attendance_incremental(mode, fmt, DEFAULT_EXPORT_NAME)
         
-        if df.empty:
-            QMessageBox.warning(self, "Sin Datos", "No hay registros de asistencia en la base de datos para generar el reporte.")
+        if export_result_path == NO_DATA_MESSAGE:
+            if mode == "delta":
+                QMessageBox.information(self, "Sin Datos Nuevos", "No hay asistencias nuevas desde la última exportación.")
+            else:
+                QMessageBox.warning(self, "Sin Datos", "No hay registros de asistencia en la base de datos para generar el reporte.")
             return
 
-        # 2. Exportar a CSV
-        export_result_path = export_attendance_to_csv(df, "asistencia_historico")
-        
+        self.update_last_export_label()
+
         if export_result_path.startswith("Error"):
             QMessageBox.critical(self, "Error de Exportación", f"Ocurrió un error al guardar el archivo:\n{export_result_path}")
         else:
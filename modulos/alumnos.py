@@ -10,8 +10,15 @@ from modulos.utilidades import Session, Student, MAIN_EXPORT_FOLDER
 
 # modulos/alumnos.py
 
-from modulos.utilidades import Session, Student, MAIN_EXPORT_FOLDER
+from modulos.utilidades import Session, Student, Attendance, MAIN_EXPORT_FOLDER
+from modulos.cache_alumnos import roster_cache
+from modulos.resumen import decrement_daily_summary
+from sqlalchemy import func
 from datetime import datetime
+import filecmp
+import hashlib
+import re
+import shutil
 import qrcode
 from PIL import Image
 from pathlib import Path
@@ -20,9 +27,57 @@ from pathlib import Path
 QR_FOLDER = MAIN_EXPORT_FOLDER / 'QR'
 QR_FOLDER.mkdir(parents=True, exist_ok=True) # Asegura que la subcarpeta QR exista
 
+# Caché de imágenes indexada por contenido: 'datos QR/QR/.cache/<clave>.png'
+QR_CACHE_FOLDER = QR_FOLDER / '.cache'
+QR_CACHE_FOLDER.mkdir(parents=True, exist_ok=True)
+
+# Parámetros de renderizado (forman parte de la clave de la caché)
+QR_VERSION = 1
+QR_ERROR_CORRECTION = qrcode.constants.ERROR_CORRECT_H
+QR_BOX_SIZE = 10
+QR_BORDER = 4
+
+# Color del QR: 6 dígitos hexadecimales, sin '#'
+_HEX_COLOR = re.compile(r"^[0-9a-fA-F]{6}$")
+
+def is_valid_qr_color(qr_color: str) -> bool:
+    """True si `qr_color` es un color HEX de 6 dígitos (ej: '800080')."""
+    return isinstance(qr_color, str) and _HEX_COLOR.match(qr_color) is not None
+
+def qr_cache_key(qr_data: str, qr_color: str = '000000') -> str:
+    """Clave de la caché: hash de los datos, el color y los parámetros de renderizado."""
+    content = f"{qr_data}|{qr_color.lower()}|{QR_VERSION}|{QR_ERROR_CORRECTION}|{QR_BOX_SIZE}|{QR_BORDER}"
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+def student_qr_path(matricula: str) -> Path:
+    """Ruta del PNG del alumno: student_<matricula>.png [cite: 71, 130]"""
+    return QR_FOLDER / f"student_{matricula}.png"
+
+def render_qr_image(qr_data: str, qr_color: str = '000000') -> Image.Image:
+    """Renderiza el QR en memoria (sin guardarlo)."""
+    # Convertir color HEX a tupla RGB si es necesario (para Pillow)
+    fill_color = tuple(int(qr_color[i:i+2], 16) for i in (0, 2, 4))
+    
+    # Crear el objeto QR
+    qr = qrcode.QRCode(
+        version=QR_VERSION,
+        error_correction=QR_ERROR_CORRECTION,
+        box_size=QR_BOX_SIZE,
+        border=QR_BORDER,
+    )
+    qr.add_data(qr_data)
+    qr.make(fit=True)
+
+    # Crear imagen con color opcional [cite: 15]
+    return qr.make_image(fill_color=fill_color, back_color="white").convert('RGB')
+
 def generate_qr_code(qr_data: str, matricula: str, qr_color: str = '000000') -> str:
     """
-    Genera un QR, lo guarda como PNG y devuelve la ruta del archivo.
+    Devuelve la ruta del PNG del QR, renderizándolo solo si no está en la caché.
+    
+    La imagen se guarda una vez en la caché (por contenido) y el archivo
+    student_<matricula>.png es un enlace a ella, así que volver a pedir el
+    mismo QR con los mismos datos y color no vuelve a renderizar ni a escribir.
     
     Args:
         qr_data (str): El string único a codificar (generalmente la matrícula).
@@ -30,40 +85,96 @@ def generate_qr_code(qr_data: str, matricula: str, qr_color: str = '000000') ->
         qr_color (str): Color HEX del QR (por defecto negro).
         
     Returns:
-        str: La ruta completa donde se guardó el archivo PNG.
+        str: La ruta completa del archivo PNG ("" si hubo un error).
     """
     try:
-        # Convertir color HEX a tupla RGB si es necesario (para Pillow)
-        fill_color = tuple(int(qr_color[i:i+2], 16) for i in (0, 2, 4))
-        
-        # Crear el objeto QR
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_H,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_data)
-        qr.make(fit=True)
+        cached_path = QR_CACHE_FOLDER / f"{qr_cache_key(qr_data, qr_color)}.png"
+        save_path = student_qr_path(matricula)
 
-        # Crear imagen con color opcional [cite: 15]
-        img = qr.make_image(fill_color=fill_color, back_color="white").convert('RGB')
-        
-        # Nombre del archivo: student_<matricula>.png [cite: 71, 130]
-        file_name = f"student_{matricula}.png"
-        save_path = QR_FOLDER / file_name
-        
-        img.save(save_path)
+        # 1. Renderizar solo si la imagen no está en la caché
+        if not cached_path.exists():
+            img = render_qr_image(qr_data, qr_color)
+            # Escritura atómica: otro proceso puede estar generando el mismo QR
+            tmp_path = cached_path.with_name(f"{cached_path.stem}.{os.getpid()}.tmp")
+            img.save(tmp_path, format='PNG')
+            os.replace(tmp_path, cached_path)
+
+        # 2. El archivo del alumno apunta a la imagen en caché
+        if save_path.exists():
+            if os.path.samefile(save_path, cached_path):
+                return str(save_path)
+            # Sin enlaces duros el archivo es una copia: se reutiliza si es idéntica
+            if filecmp.cmp(save_path, cached_path, shallow=False):
+                return str(save_path)
+            save_path.unlink()   # Imagen anterior (otro color o parámetros)
+        try:
+            os.link(cached_path, save_path)
+        except OSError:
+            # Sistemas de archivos sin enlaces duros
+            shutil.copyfile(cached_path, save_path)
         return str(save_path)
         
     except Exception as e:
         print(f"Error al generar QR para {matricula}: {e}")
         return ""
 
+def get_student_qr_path(matricula: str) -> str:
+    """
+    Genera (si hace falta) y devuelve el QR de un alumno registrado.
+
+    Se usa al descargar o imprimir el QR: la generación es perezosa.
+
+    Returns:
+        str: Ruta del PNG o "" si el alumno no existe o hubo un error.
+    """
+    session = Session()
+    try:
+        student = session.query(Student.qr_data, Student.qr_color).filter(Student.matricula == matricula).one_or_none()
+    finally:
+        session.close()
+    if student is None:
+        return ""
+    return generate_qr_code(student.qr_data, matricula, student.qr_color or '000000')
+
+def evict_qr_code(matricula: str, qr_data: str, qr_color: str = '000000') -> None:
+    """Elimina el PNG del alumno y su imagen en caché (al eliminar al alumno)."""
+    for path in (student_qr_path(matricula), QR_CACHE_FOLDER / f"{qr_cache_key(qr_data, qr_color or '000000')}.png"):
+        try:
+            path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"No se pudo eliminar {path}: {e}")
+
+def prune_orphan_qr_codes() -> int:
+    """
+    Elimina los PNG de alumnos que ya no existen y las imágenes de caché sin dueño.
+
+    Returns:
+        int: Número de archivos eliminados.
+    """
+    session = Session()
+    try:
+        students = session.query(Student.matricula, Student.qr_data, Student.qr_color).all()
+    finally:
+        session.close()
+
+    valid_students = {f"student_{s.matricula}.png" for s in students}
+    valid_cache = {f"{qr_cache_key(s.qr_data, s.qr_color or '000000')}.png" for s in students}
+
+    removed = 0
+    for path in QR_FOLDER.glob("student_*.png"):
+        if path.name not in valid_students:
+            path.unlink(missing_ok=True)
+            removed += 1
+    for path in QR_CACHE_FOLDER.glob("*.png"):
+        if path.name not in valid_cache:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
 
 def create_student(first_name: str, last_name: str, matricula: str, course: str, qr_color: str = '000000') -> Student or None:
     """
-    Crea un nuevo alumno, genera su QR y lo registra en la base de datos.
+    Crea un nuevo alumno y lo registra en la base de datos (su QR se genera al usarlo).
     
     Args:
         first_name (str), last_name (str), matricula (str), course (str), qr_color (str)
@@ -71,17 +182,16 @@ def create_student(first_name: str, last_name: str, matricula: str, course: str,
     Returns:
         Student: El objeto Student si fue creado exitosamente, None en caso contrario.
     """
+    # El QR se genera más tarde: un color inválido fallaría recién al descargarlo
+    if not is_valid_qr_color(qr_color):
+        print(f"Error: Color QR inválido: {qr_color}")
+        return None
+
     session = Session()
     try:
         # 1. Usar la matrícula como el dato QR único [cite: 94]
+        # 2. El PNG del QR se genera al descargarlo o imprimirlo (get_student_qr_path)
         qr_data = matricula
-        
-        # 2. Generar y guardar el archivo QR
-        qr_path = generate_qr_code(qr_data, matricula, qr_color)
-        
-        if not qr_path:
-             # Si falla la generación del QR, cancelamos
-            return None
 
         # 3. Crear el nuevo objeto Student
         new_student = Student(
@@ -99,6 +209,9 @@ def create_student(first_name: str, last_name: str, matricula: str, course: str,
         # 4. Agregar a la sesión y hacer commit (guardar) [cite: 101]
         session.add(new_student)
         session.commit()
+
+        # 5. Mantener al día la caché del padrón usada por el escaneo
+        roster_cache.add(new_student)
         
         return new_student
         
@@ -114,8 +227,52 @@ def create_student(first_name: str, last_name: str, matricula: str, course: str,
     finally:
         session.close()
 
+def delete_student(matricula: str) -> None:
+    """
+    Elimina al alumno, todos sus registros de asistencia y sus imágenes de QR.
+
+    También descuenta sus asistencias del resumen diario y lo quita de la caché
+    del padrón. Si algo falla se hace rollback y se propaga la excepción.
+
+    Args:
+        matricula (str): Matrícula del alumno a eliminar.
+    """
+    session = Session()
+    try:
+        student = session.query(Student).filter(Student.matricula == matricula).one()
+
+        # 1. Contar sus asistencias por día (para el resumen) y eliminarlas
+        date_counts = dict(
+            session.query(Attendance.attendance_date, func.count())
+            .filter(Attendance.matricula == matricula)
+            .group_by(Attendance.attendance_date)
+            .all()
+        )
+        session.query(Attendance).filter(Attendance.matricula == matricula).delete(synchronize_session=False)
+        decrement_daily_summary(session, student.course, date_counts)
+
+        # 2. Eliminar al alumno
+        qr_data, qr_color = student.qr_data, student.qr_color
+        session.delete(student)
+        session.commit()
+
+        # 3. Quitarlo de la caché del padrón para que el escaneo ya no lo reconozca
+        roster_cache.remove(matricula)
+        # 4. Borrar su PNG y la imagen en caché
+        evict_qr_code(matricula, qr_data, qr_color)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
 # --- Función de prueba (Simulación del flujo 1) ---
 if __name__ == '__main__':
+    # Mantenimiento: python modulos/alumnos.py --limpiar-qr
+    if '--limpiar-qr' in sys.argv:
+        print(f"QR huérfanos eliminados: {prune_orphan_qr_codes()}")
+        sys.exit(0)
+
     print("--- Prueba de Creación de Alumno y QR (Flujo 1) ---")
     
     # Datos de prueba
@@ -131,7 +288,7 @@ if __name__ == '__main__':
         print(f"\n✅ Alumno creado exitosamente:")
         print(f"   Nombre: {alumno_creado.first_name} {alumno_creado.last_name}")
         print(f"   Matrícula: {alumno_creado.matricula}")
-        print(f"   QR guardado en: {QR_FOLDER}/student_{mat}.png")
+        print(f"   QR guardado en: {get_student_qr_path(mat)}")
         
         # Intentar crear el mismo alumno (debe fallar)
         print("\n--- Intento de duplicado ---")
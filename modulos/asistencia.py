@@ -2,91 +2,376 @@
 
 import sys
 import os
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
 from datetime import datetime
-from sqlalchemy.orm.exc import NoResultFound
-
-from sqlalchemy import Text 
+from sqlalchemy.exc import IntegrityError
 # --- SOLUCIÓN TEMPORAL PARA PRUEBAS ---
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 # ---------------------------------------
 
-from modulos.utilidades import Session, Student, Attendance
+from modulos.utilidades import Session, Attendance
+from modulos.cache_alumnos import roster_cache
+from modulos.resumen import increment_daily_summary
+from modulos.metricas import metrics
 
-def register_attendance(matricula: str) -> dict:
+# --- Parámetros del escritor de asistencias (group commit) ---
+WRITER_MAX_BATCH = 64        # Máximo de asistencias por transacción
+WRITER_MAX_DELAY = 0.05      # Segundos que se espera para completar un lote
+WRITER_QUEUE_SIZE = 1000     # Capacidad de la cola (al llenarse, submit() se bloquea)
+
+def _already_registered(student, time_stamp) -> dict:
+    """Construye la respuesta de advertencia para una asistencia ya registrada hoy."""
+    hora = time_stamp.strftime('%H:%M:%S') if time_stamp else "--:--:--"
+    return {
+        "status": "warning",
+        "message": f"⚠️ {student.first_name} {student.last_name} ya registró su asistencia hoy a las {hora}.",
+        "data": student
+    }
+
+def _unknown_student(matricula: str) -> dict:
+    return {
+        "status": "error",
+        "message": f"❌ Matrícula no registrada: {matricula}",
+        "data": None
+    }
+
+def _registered(student) -> dict:
+    return {
+        "status": "success",
+        "message": f"✅ Asistencia registrada para {student.first_name} {student.last_name} ({student.matricula}).",
+        "data": student
+    }
+
+def _register_batch(matriculas: list) -> list:
     """
-    Busca al alumno por matrícula y registra su asistencia si existe.
+    Registra un lote de asistencias en una sola transacción.
+
+    Las matrículas se resuelven en la caché del padrón, los duplicados del día se
+    buscan con una sola consulta sobre el índice (matricula, attendance_date) y
+    todos los INSERT se confirman con un único commit.
+
+    Args:
+        matriculas (list): Matrículas escaneadas, en orden de llegada.
+
+    Returns:
+        list: Un dict de resultado (status/message/data) por matrícula, en el mismo orden.
     """
+    results = [None] * len(matriculas)
+    lookup_start = time.perf_counter()
+
+    # 1. Resolver alumnos en memoria
+    students = {}
+    for i, matricula in enumerate(matriculas):
+        student = roster_cache.get(matricula)
+        if student is None:
+            results[i] = _unknown_student(matricula)
+        else:
+            students[matricula] = student
+
+    if not students:
+        metrics.observe("db_busqueda", time.perf_counter() - lookup_start)
+        return results
+
     session = Session()
     try:
-        # 1. Buscar al alumno por matrícula
-        student = session.query(Student).filter(Student.matricula == matricula).one_or_none()
+        now = datetime.now()
+        today = now.date()
 
-        if student is None:
-            return {
-                "status": "error",
-                "message": f"❌ Matrícula no registrada: {matricula}",
-                "data": None
-            }
-        
-        # 2. Verificar si ya registró asistencia hoy (Prevención de Duplicados)
-        today = datetime.now().date()
-        
-        # Filtra asistencias del alumno para el día de hoy
-        recent_attendance = (
-            session.query(Attendance)
-            .filter(Attendance.matricula == matricula)
-            # SQLAlchemy: Compara la parte de la fecha del time_stamp con la fecha de hoy
-            .filter(Attendance.time_stamp.cast(Text).like(f"{today.isoformat()}%")) 
-            .one_or_none()
+        # 2. Asistencias de hoy ya guardadas para las matrículas del lote (una sola consulta)
+        registered_at = dict(
+            session.query(Attendance.matricula, Attendance.time_stamp)
+            .filter(Attendance.matricula.in_(list(students)))
+            .filter(Attendance.attendance_date == today)
+            .all()
         )
+        metrics.observe("db_busqueda", time.perf_counter() - lookup_start)
 
-        if recent_attendance:
-            return {
-                "status": "warning",
-                "message": f"⚠️ {student.first_name} {student.last_name} ya registró su asistencia hoy a las {recent_attendance.time_stamp.strftime('%H:%M:%S')}.",
-                "data": student
-            }
-
-        # 3. Registrar la asistencia
-        new_attendance = Attendance(
-            student_id=student.id,
-            matricula=matricula,
-            time_stamp=datetime.now()
-        )
-        
-        session.add(new_attendance)
-        session.commit()
-
-        return {
-            "status": "success",
-            "message": f"✅ Asistencia registrada para {student.first_name} {student.last_name} ({matricula}).",
-            "data": student
-        }
+        # 3. Preparar los INSERT, detectando también duplicados dentro del mismo lote
+        new_rows = []
+        for i, matricula in enumerate(matriculas):
+            if results[i] is not None:
+                continue
+            student = students[matricula]
+            if matricula in registered_at:
+                results[i] = _already_registered(student, registered_at[matricula])
+                continue
+            new_rows.append(Attendance(
+                student_id=student.id,
+                matricula=matricula,
+                time_stamp=now,
+                attendance_date=today
+            ))
+            registered_at[matricula] = now
+            results[i] = _registered(student)
 
-    except NoResultFound:
-        return {
-            "status": "error",
-            "message": f"❌ Error de búsqueda en DB (NoResultFound)",
-            "data": None
-        }
+        if new_rows:
+            with metrics.measure("db_commit"):
+                session.add_all(new_rows)
+                # 4. Actualizar el resumen diario (por curso) en la misma transacción
+                course_counts = Counter(students[row.matricula].course for row in new_rows)
+                increment_daily_summary(session, today, course_counts)
+                session.commit()
+
+        return results
+
+    except IntegrityError as e:
+        # Otro proceso registró alguna de estas asistencias entre la consulta y el commit.
+        # Se reintenta fila por fila para dar a cada escaneo su resultado exacto.
+        session.rollback()
+        if len(matriculas) == 1:
+            matricula = matriculas[0]
+            # La hora que se muestra es la del registro que ganó la carrera
+            existing = (
+                session.query(Attendance.time_stamp)
+                .filter(Attendance.matricula == matricula)
+                .filter(Attendance.attendance_date == datetime.now().date())
+                .first()
+            )
+            if existing is None:
+                return [{"status": "error", "message": f"❌ Error de DB: {e}", "data": None}]
+            return [_already_registered(students[matricula], existing.time_stamp)]
+        return [_register_batch([matricula])[0] for matricula in matriculas]
     except Exception as e:
         session.rollback()
-        return {
+        error = {
             "status": "error",
             "message": f"❌ Error de DB desconocido: {e}",
             "data": None
         }
+        return [result if result is not None and result["status"] == "error" else error
+                for result in results]
     finally:
         session.close()
 
 
+class AttendanceWriter:
+    """
+    Escritor de asistencias con cola acotada y commit agrupado (group commit).
+
+    Un hilo dedicado toma las matrículas de la cola y las registra por lotes en una
+    sola transacción; el lote se cierra al llegar a max_batch elementos o cuando pasan
+    max_delay segundos desde el primero. Cada llamada a submit() devuelve un Future
+    con el mismo dict de resultado que register_attendance.
+    """
+    _STOP = object()
+    _FLUSH = object()
+
+    def __init__(self, max_batch: int = WRITER_MAX_BATCH, max_delay: float = WRITER_MAX_DELAY,
+                 max_queue: int = WRITER_QUEUE_SIZE):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._stopping = False
+        self.batches = 0     # Transacciones realizadas
+        self.processed = 0   # Escaneos procesados
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def stopping(self) -> bool:
+        """True si ya se pidió detenerlo pero el hilo sigue vaciando la cola."""
+        return self._stopping and self.running
+
+    def start(self):
+        """Inicia el hilo escritor (si no está corriendo)."""
+        if self.running:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="AttendanceWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, matricula: str, timeout: float = None) -> Future:
+        """
+        Encola una matrícula para su registro.
+
+        Si la cola está llena, se bloquea hasta `timeout` segundos (backpressure).
+
+        Returns:
+            Future: Se resuelve con el dict de resultado del escaneo.
+        """
+        future = Future()
+        try:
+            self._queue.put((matricula, future), timeout=timeout)
+        except queue.Full:
+            future.set_result({
+                "status": "error",
+                "message": "❌ Cola de registro saturada, intente de nuevo.",
+                "data": None
+            })
+        return future
+
+    def pending(self) -> int:
+        """Número de escaneos en espera de ser escritos."""
+        return self._queue.qsize()
+
+    def flush(self, timeout: float = None) -> bool:
+        """Espera a que se escriba todo lo encolado hasta este momento."""
+        if not self.running:
+            return True
+        future = Future()
+        try:
+            self._queue.put((self._FLUSH, future), timeout=timeout)
+            future.result(timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    def stop(self, timeout: float = None) -> bool:
+        """
+        Escribe lo pendiente y detiene el hilo escritor.
+
+        Returns:
+            bool: False si el hilo sigue vivo al vencer `timeout` (sigue vaciando la cola).
+        """
+        if not self.running:
+            return True
+        future = Future()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if not self._stopping:
+            try:
+                # Con la cola llena, put() sin timeout podría bloquear el cierre de la aplicación
+                self._queue.put((self._STOP, future), timeout=timeout)
+            except queue.Full:
+                print("Advertencia: el escritor de asistencias no se detuvo; todavía hay escaneos pendientes en su cola.")
+                return False
+            self._stopping = True
+        self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if self._thread.is_alive():
+            print("Advertencia: el escritor de asistencias no se detuvo; todavía hay escaneos pendientes en su cola.")
+            return False
+        self._thread = None
+        return True
+
+    def _next_batch(self) -> tuple:
+        """Espera el primer elemento y completa el lote por tamaño o por tiempo."""
+        first = self._queue.get()
+        if first[0] is self._STOP or first[0] is self._FLUSH:
+            return [], first
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item[0] is self._STOP or item[0] is self._FLUSH:
+                return batch, item
+            batch.append(item)
+        return batch, None
+
+    def _write_batch(self, batch: list):
+        matriculas = [matricula for matricula, _ in batch]
+        try:
+            results = _register_batch(matriculas)
+        except Exception as e:
+            results = [{"status": "error", "message": f"❌ Error al registrar: {e}", "data": None}] * len(batch)
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+        self.batches += 1
+        self.processed += len(batch)
+
+    def _run(self):
+        while True:
+            batch, control = self._next_batch()
+
+            if batch:
+                self._write_batch(batch)
+
+            if control is not None:
+                marker, future = control
+                future.set_result(True)
+                if marker is self._STOP:
+                    break
+
+        # Lo encolado después de la orden de detenerse también se escribe (nadie más lo haría)
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] is self._STOP or item[0] is self._FLUSH:
+                item[1].set_result(True)
+            else:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.max_batch):
+            self._write_batch(leftover[start:start + self.max_batch])
+
+
+# Escritor compartido por la aplicación (se inicia desde la GUI)
+_writer = None
+
+def start_attendance_writer(**kwargs) -> AttendanceWriter:
+    """Inicia (una sola vez) el escritor de asistencias compartido."""
+    global _writer
+    if _writer is not None and _writer.stopping:
+        # Un solo hilo escritor a la vez: el anterior termina de vaciar su cola primero
+        _writer.stop()
+    if _writer is None or not _writer.running:
+        _writer = AttendanceWriter(**kwargs)
+        _writer.start()
+    return _writer
+
+def stop_attendance_writer(timeout: float = 10.0):
+    """Vacía la cola del escritor compartido y lo detiene (cierre de la aplicación)."""
+    global _writer
+    if _writer is not None and _writer.stop(timeout):
+        # Si no terminó a tiempo se conserva: un nuevo escritor no debe correr junto a él
+        _writer = None
+
+def submit_attendance(matricula: str, timeout: float = None) -> Future:
+    """
+    Encola un escaneo sin esperar su resultado (para no bloquear la GUI).
+
+    Con el escritor activo, los escaneos se escriben en orden de llegada desde un
+    único hilo, así que dos escaneos de la misma matrícula se resuelven en el orden
+    en que se hicieron. Sin escritor, el registro se hace en el momento.
+
+    Returns:
+        Future: Se resuelve con el dict de resultado (status/message/data).
+    """
+    if _writer is not None and _writer.running:
+        return _writer.submit(matricula, timeout)
+    future = Future()
+    future.set_result(_register_batch([matricula])[0])
+    return future
+
+def pending_attendance() -> int:
+    """Escaneos en cola del escritor compartido (0 si no está activo)."""
+    if _writer is not None and _writer.running:
+        return _writer.pending()
+    return 0
+
+def register_attendance(matricula: str) -> dict:
+    """
+    Busca al alumno por matrícula y registra su asistencia si existe.
+
+    Si el escritor de asistencias está activo, el registro se agrupa con otros
+    escaneos en una sola transacción; si no, se registra de inmediato.
+    """
+    if _writer is not None and _writer.running:
+        return _writer.submit(matricula).result()
+    return _register_batch([matricula])[0]
+
+
 if __name__ == '__main__':
     print("--- Prueba de Registro de Asistencia (Matrícula Válida) ---")
-    
+
     # Intento 1: Primera asistencia del día (Debe ser SUCCESS)
     result_valid = register_attendance("2025001")
     print(result_valid["message"])
-    
+
     # Intento 2: Segunda asistencia del día (Debe ser WARNING)
     print("\n--- Prueba de Detección de Duplicados (Mismo día) ---")
     result_duplicate = register_attendance("2025001")
@@ -95,4 +380,7 @@ if __name__ == '__main__':
     # Intento 3: Matrícula Inválida (Debe ser ERROR)
     print("\n--- Prueba de Matrícula No Registrada ---")
     result_invalid = register_attendance("9999999")
-    print(result_invalid["message"])
\ No newline at end of file
+    print(result_invalid["message"])
+
+    # Contadores de la caché del padrón (las tres búsquedas se resolvieron en memoria)
+    print(f"\nCaché del padrón: {roster_cache.stats()}")
@@ -0,0 +1,111 @@
+# modulos/cache_alumnos.py
+
+import sys
+import os
+import threading
+from typing import NamedTuple, Optional
+
+# Ajuste de PATH para importar módulos del proyecto
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modulos.utilidades import Session, Student
+
+
+class StudentInfo(NamedTuple):
+    """Copia inmutable de los datos del alumno que necesita el escaneo."""
+    id: int
+    matricula: str
+    first_name: str
+    last_name: str
+    course: Optional[str]
+
+    @classmethod
+    def from_student(cls, student: Student) -> "StudentInfo":
+        return cls(student.id, student.matricula, student.first_name, student.last_name, student.course)
+
+
+class RosterCache:
+    """
+    Caché en memoria del padrón de alumnos, indexada por matrícula.
+
+    Se carga una sola vez desde la tabla students y se mantiene al día con
+    add()/remove() cuando se crean o eliminan alumnos. Una vez cargada, tanto
+    las matrículas conocidas como las desconocidas se resuelven sin consultar SQLite.
+    """
+
+    def __init__(self):
+        self._students = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.hits = 0     # Matrículas conocidas resueltas en memoria
+        self.misses = 0   # Matrículas desconocidas resueltas en memoria
+        self.loads = 0    # Cargas completas desde SQLite
+
+    def warm(self) -> int:
+        """
+        (Re)carga el padrón completo desde la base de datos.
+
+        Returns:
+            int: Número de alumnos en la caché.
+        """
+        session = Session()
+        try:
+            rows = session.query(
+                Student.id, Student.matricula, Student.first_name, Student.last_name, Student.course
+            ).all()
+        finally:
+            session.close()
+
+        students = {row.matricula: StudentInfo(*row) for row in rows}
+        with self._lock:
+            self._students = students
+            self._loaded = True
+            self.loads += 1
+        return len(students)
+
+    def get(self, matricula: str) -> Optional[StudentInfo]:
+        """Devuelve el alumno de la caché o None si la matrícula no existe."""
+        if not self._loaded:
+            self.warm()
+        with self._lock:
+            student = self._students.get(matricula)
+            if student is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return student
+
+    def add(self, student) -> None:
+        """Agrega o actualiza un alumno (Student o StudentInfo) en la caché."""
+        if isinstance(student, Student):
+            student = StudentInfo.from_student(student)
+        with self._lock:
+            if self._loaded:
+                self._students[student.matricula] = student
+
+    def remove(self, matricula: str) -> None:
+        """Elimina un alumno de la caché (si estaba)."""
+        with self._lock:
+            self._students.pop(matricula, None)
+
+    def invalidate(self) -> None:
+        """Descarta la caché; se recargará en la siguiente consulta."""
+        with self._lock:
+            self._students = {}
+            self._loaded = False
+
+    def stats(self) -> dict:
+        """Contadores de aciertos/fallos para verificar que la caché funciona."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._students),
+                "hits": self.hits,
+                "misses": self.misses,
+                "loads": self.loads,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+# Instancia única compartida por todo el proceso
+roster_cache = RosterCache()
@@ -1,112 +1,95 @@
 # modulos/camara.py
 
-import cv2
-from pyzbar.pyzbar import decode
-from PyQt6.QtCore import QThread, pyqtSignal, QMutex, QWaitCondition
-import numpy as np
+import sys
+import os
+from PyQt6.QtCore import QThread, pyqtSignal
+
+# Ajuste de PATH para importar módulos del proyecto
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modulos.escaneo import ScanPipeline, FrameBuffer, DECODE_WORKERS, source_label, discover_cameras
 
 # Constantes
 CAMERA_ID_DEFAULT = 0  # Cámara predeterminada
 
 class CameraStreamer(QThread):
     """
-    Clase que maneja el stream de la cámara en un hilo separado y emite 
-    las imágenes de frame y los datos del QR detectado.
+    Clase que maneja el stream de la cámara en un hilo separado, publica
+    los frames para la vista previa y emite los datos del QR detectado.
+
+    La captura corre en este hilo y la decodificación en `decode_workers` hilos
+    propios (ver modulos/escaneo.py), de modo que pyzbar no limita los FPS.
+    Los frames no viajan por señales: se dejan en un triple buffer y la GUI
+    toma el más reciente con latest_frame() a su propio ritmo.
+
+    Para varias cámaras se crea un streamer por cámara y se les pasa el mismo
+    `debounce` (DebounceCache), así un alumno visto por dos cámaras se emite una vez.
     """
     # Señales para comunicar con la GUI
-    frame_ready = pyqtSignal(np.ndarray) # Envía el frame de video (imagen)
-    qr_detected = pyqtSignal(str)       # Envía el contenido del QR detectado
+    qr_detected = pyqtSignal(str, float)   # Contenido del QR y momento de captura del frame (time.monotonic)
 
-    def __init__(self, camera_id=CAMERA_ID_DEFAULT, parent=None):
+    def __init__(self, camera_id=CAMERA_ID_DEFAULT, parent=None, decode_workers=DECODE_WORKERS, debounce=None):
         super().__init__(parent)
         self.camera_id = camera_id
-        self.running = False
-        self.capture = None
-        self.is_paused = False
-        self.mutex = QMutex()
-        self.condition = QWaitCondition()
-        
+        self.preview = FrameBuffer()
+        self.pipeline = ScanPipeline(
+            camera_id,
+            decode_workers=decode_workers,
+            preview=self.preview,
+            debounce=debounce,
+            on_detection=lambda detection: self.qr_detected.emit(detection.data, detection.captured_at),
+        )
+
+    @property
+    def running(self) -> bool:
+        return self.pipeline.running
+
     def run(self):
         """Método que se ejecuta cuando se inicia el hilo."""
-        self.running = True
-        self.capture = cv2.VideoCapture(self.camera_id)
-
-        if not self.capture.isOpened():
-            print(f"Error: No se pudo abrir la cámara {self.camera_id}.")
-            self.running = False
-            return
-
-        while self.running:
-            # Lógica de pausa
-            self.mutex.lock()
-            if self.is_paused:
-                self.condition.wait(self.mutex)
-            self.mutex.unlock()
-            
-            # 1. Leer Frame
-            ret, frame = self.capture.read()
-            if not ret:
-                print("Error: No se pudo leer el frame.")
-                break
-            
-            # 2. Detección de QR
-            decoded_objects = decode(frame)
-            if decoded_objects:
-                for obj in decoded_objects:
-                    qr_data = obj.data.decode('utf-8')
-                    # Emitir la señal de QR detectado
-                    self.qr_detected.emit(qr_data)
-                    
-                    # Dibujar un recuadro verde alrededor del QR detectado
-                    points = obj.polygon
-                    if len(points) == 4:
-                        pts = np.array(points, np.int32)
-                        pts = pts.reshape((-1, 1, 2))
-                        cv2.polylines(frame, [pts], True, (0, 255, 0), 3) # BGR: Verde
-                        
-            # 3. Emitir Frame para mostrar en la GUI
-            self.frame_ready.emit(frame)
-
-        # Liberar recursos al terminar
-        if self.capture:
-            self.capture.release()
-        print(f"Stream de cámara {self.camera_id} detenido.")
+        if self.pipeline.run():
+            stats = self.pipeline.stats()
+            print(f"Stream de {source_label(self.camera_id)} detenido "
+                  f"({stats['capture_fps']:.1f} FPS, latencia p50 {stats['latency_p50_ms']:.0f} ms).")
 
     def stop(self):
         """Detiene el hilo del stream."""
-        self.running = False
-        self.condition.wakeAll() # Despierta el hilo si está en pausa
+        self.pipeline.stop()
         self.wait() # Espera a que el hilo termine
         
     def pause(self):
         """Pausa el procesamiento de frames."""
-        self.is_paused = True
+        self.pipeline.pause()
         
     def resume(self):
         """Reanuda el procesamiento de frames."""
-        self.is_paused = False
-        self.condition.wakeAll()
+        self.pipeline.resume()
+
+    def latest_frame(self):
+        """Último frame capturado (con recuadros) o None si no hay uno nuevo."""
+        return self.preview.read()
+
+    def stats(self) -> dict:
+        """FPS de captura/decodificación, frames descartados y latencia de escaneo."""
+        return self.pipeline.stats()
+
+class CameraDiscovery(QThread):
+    """Detecta las cámaras en segundo plano para no demorar la apertura de la ventana."""
+    cameras_found = pyqtSignal(list)
+
+    def run(self):
+        self.cameras_found.emit(discover_cameras())
 
 # ----------------------------------------------------
 # Función de Utilidad: Listar Cámaras
 # ----------------------------------------------------
 def list_available_cameras():
     """
-    Intenta abrir varias cámaras para detectar cuáles están disponibles.
+    Detecta las cámaras disponibles (en paralelo y con tiempo límite).
     
     Returns:
         list: Lista de IDs de cámaras disponibles (ej: [0, 1]).
     """
-    available_cams = []
-    # Generalmente se prueba hasta el ID 5, ya que pocas máquinas tienen más
-    for i in range(5): 
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            available_cams.append(i)
-            cap.release()
-            # print(f"Cámara detectada en ID: {i}") # Para debug
-        
-    return available_cams
+    return discover_cameras()
 
 # --- Prueba del módulo (solo para validar OpenCV y PyZBar) ---
 if __name__ == '__main__':
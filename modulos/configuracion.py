@@ -0,0 +1,46 @@
+# modulos/configuracion.py
+
+import os
+import configparser
+from pathlib import Path
+
+# Archivo opcional de configuración en la raíz del proyecto: 'config.ini'
+# (ver 'config.ejemplo.ini'). Cada valor puede sobrescribirse con una variable
+# de entorno PROYECTIS_<SECCION>_<CLAVE>, por ejemplo PROYECTIS_BASE_DATOS_PERFIL=durable.
+CONFIG_PATH = Path(__file__).parent.parent / "config.ini"
+
+_parser = configparser.ConfigParser()
+_parser.read(CONFIG_PATH, encoding="utf-8")
+
+_TRUE_VALUES = {"1", "true", "yes", "si", "sí", "on"}
+
+
+def _to_bool(value: str) -> bool:
+    return str(value).strip().lower() in _TRUE_VALUES
+
+
+def get_setting(section: str, key: str, default=None, cast=str):
+    """
+    Lee un valor de configuración (variable de entorno > config.ini > default).
+
+    Args:
+        section (str): Sección del archivo INI (ej: 'base_datos').
+        key (str): Clave dentro de la sección (ej: 'perfil').
+        default: Valor si no está configurado o no se puede convertir.
+        cast: Tipo al que convertir el valor (str, int, float o bool).
+
+    Returns:
+        El valor convertido o `default`.
+    """
+    env_name = f"PROYECTIS_{section}_{key}".upper()
+    value = os.environ.get(env_name)
+    if value is None:
+        value = _parser.get(section, key, fallback=None)
+    if value is None:
+        return default
+
+    try:
+        return _to_bool(value) if cast is bool else cast(value)
+    except ValueError:
+        print(f"Advertencia: valor inválido para [{section}] {key} = {value!r}; se usa {default!r}.")
+        return default
@@ -0,0 +1,833 @@
+# modulos/escaneo.py
+"""
+Pipeline de escaneo independiente de Qt: captura de frames y decodificación de QR.
+
+Un hilo de captura lee frames de la fuente y deja solo el más reciente en un
+"slot"; uno o más hilos de decodificación toman ese frame y descartan los que
+quedaron viejos. Así la decodificación (pyzbar) no frena la captura ni la vista previa.
+"""
+
+import sys
+import os
+import glob
+import json
+import re
+import threading
+import time
+from collections import deque, namedtuple, OrderedDict
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Ajuste de PATH para importar módulos del proyecto
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modulos.configuracion import get_setting
+from modulos.metricas import metrics
+
+# Hilos de decodificación (config.ini: [camara] decode_workers)
+DECODE_WORKERS = get_setting("camara", "decode_workers", 1, int)
+# Segundos que se sigue dibujando el recuadro de un QR después de detectarlo
+OVERLAY_TTL = 0.5
+# Muestras que se guardan para calcular la latencia de escaneo
+LATENCY_SAMPLES = 500
+
+# FPS con los que se reproducen las carpetas de imágenes (los videos usan los suyos)
+IMAGE_FOLDER_FPS = 10
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# --- Detección de cámaras ---
+# Última lista de cámaras que funcionaron (se muestra al instante al abrir la app)
+CAMERA_CACHE_PATH = Path(__file__).parent.parent / "base_datos" / "camaras.json"
+# Segundos máximos para probar todas las cámaras (las que no responden se descartan)
+CAMERA_PROBE_TIMEOUT = get_setting("camara", "timeout_deteccion", 3.0, float)
+# IDs que se prueban si el sistema no tiene /dev/video* (Windows, macOS)
+CAMERA_FALLBACK_IDS = range(5)
+
+# Un mismo código no se vuelve a emitir hasta que pasen estos segundos sin verlo
+DEBOUNCE_WINDOW = get_setting("camara", "debounce", 3.0, float)
+# Códigos recordados como máximo (los más viejos se descartan)
+DEBOUNCE_MAX_CODES = 1024
+
+# --- Preprocesado antes de decodificar (config.ini: [camara]) ---
+PREPROCESS = get_setting("camara", "preprocesado", True, bool)
+PREPROCESS_THRESHOLD = get_setting("camara", "umbral", True, bool)
+# Lado (px) al que se intenta llevar el QR al reducir el frame; pyzbar lo lee bien desde ~80 px
+TARGET_QR_SIDE = 120
+# Lado máximo del frame completo cuando todavía no se vio ningún QR
+MAX_FRAME_SIDE = 800
+# Margen alrededor de cada QR reciente (fracción de su lado) y vigencia de esa región (s)
+ROI_MARGIN = 0.75
+ROI_TTL = 1.0
+# Regiones que se siguen como máximo (con más QR a la vista se busca en el frame completo)
+MAX_ROIS = 4
+# Cada cuántos frames se busca también en el frame completo aunque las regiones den resultados
+FULL_SCAN_INTERVAL = 3
+# Tamaños de QR recientes que se usan para elegir la escala
+SIZE_SAMPLES = 8
+
+# Resultado de decodificar un QR en un frame
+Detection = namedtuple("Detection", "data polygon captured_at decoded_at")
+# QR decodificado con el polígono en coordenadas del frame original
+DecodedQR = namedtuple("DecodedQR", "data polygon")
+
+
+def _pyzbar_decode(frame):
+    from pyzbar.pyzbar import decode
+    return decode(frame)
+
+
+class DebounceCache:
+    """
+    Filtro de repeticiones por código (LRU con vencimiento).
+
+    allow() devuelve True la primera vez que se ve un código y False mientras
+    se lo siga viendo dentro de la ventana; cada avistamiento renueva la ventana,
+    así un alumno que se queda frente a la cámara no genera escaneos repetidos.
+    Códigos distintos son independientes: varios alumnos en el mismo frame o
+    uno detrás de otro se emiten una vez cada uno.
+    """
+
+    def __init__(self, window: float = DEBOUNCE_WINDOW, max_codes: int = DEBOUNCE_MAX_CODES):
+        self.window = window
+        self.max_codes = max_codes
+        self._last_seen = OrderedDict()
+        self._lock = threading.Lock()
+        self.emitted = 0
+        self.suppressed = 0
+
+    def allow(self, data: str, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            last_seen = self._last_seen.pop(data, None)
+            # Queda como el más reciente (LRU); con varios decodificadores un frame
+            # viejo puede llegar tarde, por eso no se retrocede la marca de tiempo
+            self._last_seen[data] = now if last_seen is None else max(now, last_seen)
+            if len(self._last_seen) > self.max_codes:
+                self._last_seen.popitem(last=False)
+
+            if last_seen is not None and now - last_seen < self.window:
+                self.suppressed += 1
+                return False
+            self.emitted += 1
+            return True
+
+    def forget(self, data: str):
+        """Permite volver a emitir un código de inmediato."""
+        with self._lock:
+            self._last_seen.pop(data, None)
+
+    def clear(self):
+        with self._lock:
+            self._last_seen.clear()
+
+
+class FramePreprocessor:
+    """
+    Reduce el costo de decodificar cada frame.
+
+    1. Convierte a escala de grises (pyzbar solo usa la luminancia).
+    2. Busca primero en una región alrededor de cada QR visto recientemente,
+       reducida según el tamaño de ese QR.
+    3. Si las regiones no dieron nada, busca en el frame completo reducido. Cada
+       FULL_SCAN_INTERVAL frames busca además en el frame completo sin reducir,
+       para no perder un QR nuevo (en otra parte del cuadro, o más chico que los
+       vistos); los resultados se combinan por contenido.
+    4. Opcionalmente, si no se encontró nada, reintenta con umbral adaptativo
+       (ayuda con poca luz o reflejos, pero cuesta otra decodificación).
+
+    Los polígonos devueltos están en coordenadas del frame original.
+    """
+
+    def __init__(self, decoder, threshold: bool = PREPROCESS_THRESHOLD):
+        self.decoder = decoder
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        # Una región por código visto: {data: ((x, y, w, h) en coordenadas originales, momento)}
+        self._regions = OrderedDict()
+        self._sizes = deque(maxlen=SIZE_SAMPLES)
+        self._frames = 0
+        self.hits = {"roi": 0, "full": 0, "threshold": 0}
+        self.misses = 0
+
+    def _full_scale(self, width: int, height: int) -> float:
+        """
+        Factor de reducción (<= 1) del frame completo.
+
+        Se acerca a TARGET_QR_SIDE según los QR recientes, pero nunca reduce más
+        que el tope por defecto (MAX_FRAME_SIDE): un QR nuevo más chico o más
+        lejano que los vistos tiene que seguir siendo legible.
+        """
+        default = min(1.0, MAX_FRAME_SIDE / max(width, height))
+        with self._lock:
+            sizes = list(self._sizes)
+        if sizes:
+            return max(default, min(1.0, TARGET_QR_SIDE / min(sizes)))
+        return default
+
+    def _active_regions(self, width: int, height: int) -> list:
+        """Regiones (x0, y0, x1, y1, escala) de los QR vistos hace menos de ROI_TTL."""
+        now = time.monotonic()
+        with self._lock:
+            for data in [data for data, (_, seen_at) in self._regions.items() if now - seen_at > ROI_TTL]:
+                del self._regions[data]
+            rects = [rect for rect, _ in self._regions.values()]
+        if len(rects) > MAX_ROIS:
+            return []
+
+        regions = []
+        for x, y, w, h in rects:
+            side = max(1, w, h)
+            margin = int(side * ROI_MARGIN)
+            x0, y0 = max(0, x - margin), max(0, y - margin)
+            x1, y1 = min(width, x + w + margin), min(height, y + h + margin)
+            # Si la región es casi todo el frame, no vale la pena un intento aparte
+            if (x1 - x0) * (y1 - y0) > 0.6 * width * height:
+                return []
+            regions.append((x0, y0, x1, y1, min(1.0, TARGET_QR_SIDE / side)))
+        return regions
+
+    @staticmethod
+    def _resize(image, scale: float):
+        if scale < 1.0:
+            return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return image
+
+    def _decode_scaled(self, image, scale: float, offset=(0, 0)) -> list:
+        """Decodifica una imagen ya reducida y lleva los polígonos al frame original."""
+        results = []
+        for obj in self.decoder(image):
+            polygon = [(int(px / scale) + offset[0], int(py / scale) + offset[1]) for px, py in obj.polygon]
+            results.append(DecodedQR(obj.data, polygon))
+        return results
+
+    def _remember(self, results: list):
+        now = time.monotonic()
+        with self._lock:
+            for result in results:
+                xs = [px for px, _ in result.polygon]
+                ys = [py for _, py in result.polygon]
+                rect = (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+                self._regions.pop(result.data, None)
+                self._regions[result.data] = (rect, now)
+                self._sizes.append(max(1, max(rect[2], rect[3])))
+            while len(self._regions) > MAX_ROIS:
+                self._regions.popitem(last=False)
+
+    def decode(self, frame) -> list:
+        """Decodifica los QR del frame (BGR o gris). Devuelve una lista de DecodedQR."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        height, width = gray.shape
+        with self._lock:
+            self._frames += 1
+            periodic_full_scan = self._frames % FULL_SCAN_INTERVAL == 0
+
+        # Resultados combinados por contenido: un QR cuenta una vez aunque lo vean dos pasadas
+        found = OrderedDict()
+        stages = set()
+
+        def merge(results, stage):
+            new = [result for result in results if result.data not in found]
+            for result in new:
+                found[result.data] = result
+            if new:
+                stages.add(stage)
+
+        for x0, y0, x1, y1, scale in self._active_regions(width, height):
+            merge(self._decode_scaled(self._resize(gray[y0:y1, x0:x1], scale), scale, (x0, y0)), "roi")
+
+        if not found or periodic_full_scan:
+            # La pasada periódica va sin reducir: busca QR nuevos aunque sean más chicos
+            # o estén más lejos que los vistos; las demás usan la escala adaptativa
+            scale = 1.0 if periodic_full_scan else self._full_scale(width, height)
+            small = self._resize(gray, scale)
+            merge(self._decode_scaled(small, scale), "full")
+            if not found and self.threshold:
+                binary = cv2.adaptiveThreshold(small, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 5)
+                merge(self._decode_scaled(binary, scale), "threshold")
+
+        results = list(found.values())
+        with self._lock:
+            for stage in stages:
+                self.hits[stage] += 1
+            if not results:
+                self.misses += 1
+                # Sin QR, la escala vuelve poco a poco al valor por defecto
+                if self._sizes:
+                    self._sizes.popleft()
+        if results:
+            self._remember(results)
+        return results
+
+
+def _draw_polygons(frame, polygons: list):
+    """Dibuja un recuadro verde alrededor de cada QR (sobre el mismo frame)."""
+    for points in polygons:
+        pts = np.array(points, np.int32).reshape((-1, 1, 2))
+        cv2.polylines(frame, [pts], True, (0, 255, 0), 3) # BGR: Verde
+
+
+class ImageFolderSource:
+    """Fuente de frames a partir de una carpeta de imágenes (en orden alfabético)."""
+
+    def __init__(self, folder):
+        self.paths = sorted(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.index = 0
+
+    def isOpened(self) -> bool:
+        return bool(self.paths)
+
+    def read(self):
+        while self.index < len(self.paths):
+            frame = cv2.imread(self.paths[self.index])
+            self.index += 1
+            if frame is not None:
+                return True, frame
+            print(f"Advertencia: no se pudo leer la imagen {self.paths[self.index - 1]}")
+        return False, None
+
+    def release(self):
+        self.paths = []
+
+
+class PacedSource:
+    """Entrega los frames de un archivo al ritmo de una cámara real (fps fijos)."""
+
+    def __init__(self, source, fps: float):
+        self.source = source
+        self.interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self._next = None
+
+    def isOpened(self) -> bool:
+        return self.source.isOpened()
+
+    def read(self):
+        now = time.monotonic()
+        if self._next is not None and now < self._next:
+            time.sleep(self._next - now)
+        self._next = max(now, self._next or now) + self.interval
+        return self.source.read()
+
+    def release(self):
+        self.source.release()
+
+
+def is_camera_source(source) -> bool:
+    return isinstance(source, int) or str(source).isdigit()
+
+
+def source_label(source) -> str:
+    """Nombre corto para mostrar la fuente ('Cámara 0', 'entrada_norte.mp4')."""
+    if is_camera_source(source):
+        return f"Cámara {int(source)}"
+    return os.path.basename(os.path.normpath(str(source)))
+
+
+def source_key(source):
+    """Identidad de una fuente: 0 y '0' son la misma cámara; './a.mp4' y 'a.mp4', el mismo archivo."""
+    if is_camera_source(source):
+        return int(source)
+    return os.path.normcase(os.path.abspath(str(source)))
+
+
+def duplicate_sources(sources: list) -> list:
+    """Fuentes que aparecen más de una vez en `sources` (en el orden de su repetición)."""
+    seen, duplicates = set(), []
+    for source in sources:
+        key = source_key(source)
+        if key in seen:
+            duplicates.append(source)
+        seen.add(key)
+    return duplicates
+
+
+def open_frame_source(source, realtime: bool = True):
+    """
+    Abre una fuente de frames con la interfaz de cv2.VideoCapture (read/isOpened/release).
+
+    Args:
+        source: ID de cámara (int o '0'), ruta a un archivo de video o a una carpeta de imágenes.
+        realtime (bool): Reproducir archivos y carpetas a su ritmo nominal (como una
+            cámara); si es False se leen tan rápido como sea posible.
+    """
+    if is_camera_source(source):
+        return cv2.VideoCapture(int(source))
+    if os.path.isdir(source):
+        capture, fps = ImageFolderSource(source), IMAGE_FOLDER_FPS
+    else:
+        capture = cv2.VideoCapture(str(source))
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30
+    return PacedSource(capture, fps) if realtime else capture
+
+
+def _camera_candidates() -> list:
+    """IDs de cámara a probar: los nodos /dev/videoN en Linux, o 0..4 en otros sistemas."""
+    if sys.platform.startswith("linux"):
+        devices = glob.glob("/dev/video*")
+        return sorted({int(match.group(1)) for match in
+                       (re.search(r"video(\d+)$", device) for device in devices) if match})
+    return list(CAMERA_FALLBACK_IDS)
+
+
+def _probe_camera(camera_id: int) -> bool:
+    capture = cv2.VideoCapture(camera_id)
+    try:
+        return capture.isOpened()
+    finally:
+        capture.release()
+
+
+def load_camera_cache() -> list:
+    """Última lista de cámaras detectadas (vacía si no hay caché)."""
+    try:
+        with open(CAMERA_CACHE_PATH, encoding="utf-8") as f:
+            return [int(camera_id) for camera_id in json.load(f).get("cameras", [])]
+    except (OSError, ValueError, AttributeError):
+        return []
+
+
+def save_camera_cache(cameras: list):
+    try:
+        CAMERA_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(CAMERA_CACHE_PATH, "w", encoding="utf-8") as f:
+            json.dump({"cameras": cameras, "updated": time.strftime("%Y-%m-%d %H:%M:%S")}, f)
+    except OSError as e:
+        print(f"Advertencia: no se pudo guardar la caché de cámaras: {e}")
+
+
+def discover_cameras(timeout: float = CAMERA_PROBE_TIMEOUT) -> list:
+    """
+    Detecta las cámaras disponibles probándolas en paralelo.
+
+    En Linux solo se prueban los /dev/videoN existentes. Las cámaras que no
+    responden dentro de `timeout` segundos se consideran no disponibles. El
+    resultado se guarda como caché para el próximo inicio.
+
+    Returns:
+        list: IDs de cámaras disponibles (ej: [0, 2]).
+    """
+    candidates = _camera_candidates()
+    available = {}
+
+    def probe(camera_id):
+        try:
+            available[camera_id] = _probe_camera(camera_id)
+        except Exception:
+            available[camera_id] = False
+
+    # Hilos daemon: una cámara colgada no debe retrasar ni el resultado ni el cierre del programa
+    threads = [threading.Thread(target=probe, args=(camera_id,), name=f"CameraProbe-{camera_id}", daemon=True)
+               for camera_id in candidates]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    # Las que no respondieron a tiempo no figuran en `available` (o siguen en False)
+    cameras = sorted(camera_id for camera_id, ok in list(available.items()) if ok)
+    save_camera_cache(cameras)
+    return cameras
+
+
+class LatestFrameSlot:
+    """
+    Buzón de un solo frame: put() reemplaza el frame pendiente (contándolo como
+    descartado) y take() entrega siempre el más reciente.
+
+    Con put(..., block=True) el productor espera a que el frame pendiente se
+    tome, de modo que no se descarta ninguno (para archivos, no para cámaras).
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame, captured_at: float, block: bool = False):
+        with self._condition:
+            if block:
+                while self._item is not None and not self._closed:
+                    self._condition.wait()
+            if self._item is not None:
+                self.dropped += 1
+            self._item = (frame, captured_at)
+            self._condition.notify_all()
+
+    def take(self, timeout: float = None):
+        """Devuelve (frame, captured_at) o None si se cerró o venció el timeout."""
+        with self._condition:
+            if self._item is None and not self._closed:
+                self._condition.wait(timeout)
+            item, self._item = self._item, None
+            if item is not None:
+                self._condition.notify_all()   # Despierta a un productor en espera
+            return item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class FrameBuffer:
+    """
+    Entrega del último frame al hilo de la GUI con tres buffers preasignados
+    (triple buffer): el productor escribe en uno, otro guarda el último frame
+    listo y el tercero es el que está leyendo el consumidor.
+
+    El productor nunca espera y el consumidor siempre obtiene el frame más
+    reciente; los frames que nadie alcanzó a leer se descartan (y se cuentan).
+    La memoria queda fija en tres frames sin importar la velocidad de la GUI.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffers = None
+        self._back, self._ready, self._front = 0, 1, 2
+        self._fresh = False
+        self.written = 0
+        self.read_count = 0
+        self.dropped = 0
+
+    def write(self, frame, draw=None):
+        """
+        Copia el frame en el buffer libre y lo publica como el más reciente.
+
+        Args:
+            frame: Frame de origen (no se modifica).
+            draw: Función opcional draw(buffer) para dibujar sobre la copia.
+        """
+        buffers = self._buffers
+        if buffers is None or buffers[0].shape != frame.shape or buffers[0].dtype != frame.dtype:
+            # Primera vez (o cambio de resolución): se reservan los tres buffers
+            with self._lock:
+                self._buffers = buffers = [np.empty_like(frame) for _ in range(3)]
+                self._fresh = False
+
+        target = buffers[self._back]     # Solo el productor toca este buffer
+        np.copyto(target, frame)
+        if draw is not None:
+            draw(target)
+
+        with self._lock:
+            if self._fresh:
+                self.dropped += 1
+            self._back, self._ready = self._ready, self._back
+            self._fresh = True
+            self.written += 1
+
+    def read(self):
+        """
+        Devuelve el frame más reciente o None si no hay uno nuevo desde la última lectura.
+
+        El array devuelto es válido hasta la siguiente llamada a read().
+        """
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._front, self._ready = self._ready, self._front
+            self._fresh = False
+            self.read_count += 1
+            return self._buffers[self._front]
+
+
+class ScanPipeline:
+    """
+    Captura y decodificación de QR en hilos separados.
+
+    run() ejecuta el bucle de captura en el hilo que lo llama; los hilos de
+    decodificación se crean y detienen junto con él.
+
+    Args:
+        source: ID de cámara, ruta de video o carpeta de imágenes (ver open_frame_source).
+        decode_workers (int): Hilos de decodificación.
+        on_frame: Función on_frame(frame) con cada frame capturado (con recuadros dibujados).
+        preview (FrameBuffer): Buffer donde se publica cada frame (con recuadros) para
+            que la GUI tome el último cuando pueda.
+        on_detection: Función on_detection(Detection) por cada QR decodificado que pasa
+            el filtro de repeticiones.
+        decoder: Función decoder(frame) -> objetos con .data y .polygon (por defecto pyzbar).
+        preprocess (bool): Usar FramePreprocessor (gris, escala adaptativa, región de interés).
+        debounce (DebounceCache): Filtro de repeticiones (por defecto, uno propio con
+            DEBOUNCE_WINDOW); se puede compartir entre varias cámaras.
+    """
+
+    def __init__(self, source, decode_workers: int = DECODE_WORKERS, on_frame=None,
+                 on_detection=None, decoder=None, preprocess: bool = PREPROCESS, debounce=None,
+                 preview=None, realtime: bool = True, drop_frames: bool = True):
+        self.source = source
+        self.realtime = realtime
+        self.drop_frames = drop_frames
+        self.decode_workers = max(1, decode_workers)
+        self.on_frame = on_frame
+        self.preview = preview
+        self.on_detection = on_detection
+        self.decoder = decoder or _pyzbar_decode
+        self.preprocessor = FramePreprocessor(self.decoder) if preprocess else None
+        self.debounce = debounce if debounce is not None else DebounceCache()
+
+        self.running = False
+        self._resume = threading.Event()
+        self._resume.set()
+        self._slot = LatestFrameSlot()
+        self._workers = []
+        self._workers_alive = 0
+
+        # Recuadros a dibujar: {data: (polígono, momento de la detección)}
+        self._overlays = {}
+        self._overlay_lock = threading.Lock()
+
+        # Estadísticas
+        self._stats_lock = threading.Lock()
+        self.frames_captured = 0
+        self.frames_decoded = 0
+        self.detections = 0
+        self.decode_errors = 0
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._started_at = None
+        self._stopped_at = None
+
+    # --- Control ---
+
+    def run(self) -> bool:
+        """
+        Bucle de captura (bloqueante hasta stop() o fin de la fuente).
+
+        Returns:
+            bool: False si no se pudo abrir la fuente.
+        """
+        capture = open_frame_source(self.source, self.realtime)
+        if not capture.isOpened():
+            print(f"Error: No se pudo abrir la fuente de video {self.source}.")
+            return False
+
+        self.running = True
+        self._started_at = time.monotonic()
+        self._stopped_at = None
+        self._slot = LatestFrameSlot()
+        self._workers = [
+            threading.Thread(target=self._decode_loop, name=f"QRDecoder-{i}", daemon=True)
+            for i in range(self.decode_workers)
+        ]
+        self._workers_alive = len(self._workers)
+        for worker in self._workers:
+            worker.start()
+
+        try:
+            while self.running:
+                # Lógica de pausa
+                self._resume.wait()
+                if not self.running:
+                    break
+
+                # 1. Leer Frame
+                read_start = time.perf_counter()
+                ret, frame = capture.read()
+                metrics.observe("captura", time.perf_counter() - read_start)
+                if not ret:
+                    if is_camera_source(self.source):
+                        print("Error: No se pudo leer el frame.")
+                    break
+                captured_at = time.monotonic()
+                with self._stats_lock:
+                    self.frames_captured += 1
+
+                # 2. Entregar a los decodificadores (si están ocupados, el frame anterior se descarta)
+                self._slot.put(frame, captured_at, block=not self.drop_frames)
+
+                # 3. Publicar el frame para mostrar (con los recuadros de los QR recientes)
+                polygons = self._overlay_polygons(captured_at)
+                if self.preview is not None:
+                    self.preview.write(frame, lambda target: _draw_polygons(target, polygons))
+                if self.on_frame:
+                    if polygons:
+                        # Se dibuja sobre una copia: el mismo frame puede estar siendo decodificado
+                        frame = frame.copy()
+                        _draw_polygons(frame, polygons)
+                    self.on_frame(frame)
+        finally:
+            self.running = False
+            self._slot.close()
+            for worker in self._workers:
+                worker.join()
+            capture.release()
+            self._stopped_at = time.monotonic()
+        return True
+
+    def stop(self):
+        self.running = False
+        self._resume.set()   # Despierta el bucle si está en pausa
+        self._slot.close()
+
+    def pause(self):
+        self._resume.clear()
+
+    def resume(self):
+        self._resume.set()
+
+    # --- Decodificación ---
+
+    def _decode_loop(self):
+        try:
+            # Al terminar se decodifica lo que haya quedado pendiente en el slot
+            while True:
+                item = self._slot.take(timeout=0.1)
+                if item is None:
+                    if not self.running:
+                        break
+                    continue
+                # Un frame que falla no debe matar al hilo: la captura quedaría esperándolo
+                try:
+                    self._decode_frame(*item)
+                except Exception as e:
+                    with self._stats_lock:
+                        self.decode_errors += 1
+                    print(f"Error al decodificar un frame de {self.source}: {e}")
+        finally:
+            with self._stats_lock:
+                self._workers_alive -= 1
+                last = self._workers_alive == 0
+            if last:
+                # Sin decodificadores, un put(block=True) esperaría para siempre
+                self.stop()
+
+    def _decode_frame(self, frame, captured_at: float):
+        decode_start = time.monotonic()
+        if self.preprocessor is not None:
+            decoded_objects = self.preprocessor.decode(frame)
+        else:
+            decoded_objects = self.decoder(frame)
+        decoded_at = time.monotonic()
+        metrics.observe("decodificacion", decoded_at - decode_start)
+        with self._stats_lock:
+            self.frames_decoded += 1
+
+        for obj in decoded_objects:
+            detection = Detection(obj.data.decode('utf-8', errors="replace"), list(obj.polygon),
+                                  captured_at, decoded_at)
+            with self._overlay_lock:
+                previous = self._overlays.get(detection.data)
+                # Un decodificador más lento no debe pisar un recuadro más nuevo
+                if previous is None or previous[1] <= captured_at:
+                    self._overlays[detection.data] = (detection.polygon, captured_at)
+            with self._stats_lock:
+                self.detections += 1
+                self._latencies.append(decoded_at - captured_at)
+            # Las repeticiones se descartan acá, antes de llegar a la base de datos
+            if self.on_detection and self.debounce.allow(detection.data, captured_at):
+                try:
+                    self.on_detection(detection)
+                except Exception as e:
+                    print(f"Error al procesar el escaneo de {detection.data}: {e}")
+
+    def _overlay_polygons(self, now: float) -> list:
+        """Polígonos de los QR detectados recientemente (descarta los vencidos)."""
+        with self._overlay_lock:
+            expired = [data for data, (_, seen_at) in self._overlays.items() if now - seen_at > OVERLAY_TTL]
+            for data in expired:
+                del self._overlays[data]
+            return [polygon for polygon, _ in self._overlays.values() if len(polygon) == 4]
+
+    # --- Estadísticas ---
+
+    def stats(self) -> dict:
+        """FPS de captura y decodificación, frames descartados y latencia de escaneo (ms)."""
+        with self._stats_lock:
+            elapsed = (self._stopped_at or time.monotonic()) - self._started_at if self._started_at else 0.0
+            latencies = sorted(self._latencies)
+            captured, decoded, detections = self.frames_captured, self.frames_decoded, self.detections
+            errors = self.decode_errors
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+        stats = {
+            "capture_fps": captured / elapsed if elapsed else 0.0,
+            "decode_fps": decoded / elapsed if elapsed else 0.0,
+            "frames_captured": captured,
+            "frames_decoded": decoded,
+            "frames_dropped": self._slot.dropped,
+            "preview_dropped": self.preview.dropped if self.preview is not None else 0,
+            "detections": detections,
+            "decode_errors": errors,
+            "suppressed": self.debounce.suppressed,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p95_ms": percentile(0.95),
+        }
+        if self.preprocessor is not None:
+            stats["preprocess_hits"] = dict(self.preprocessor.hits)
+        return stats
+
+
+class MultiCameraScanner:
+    """
+    Varias fuentes escaneando en paralelo (un ScanPipeline y un hilo de captura
+    por fuente) con un único filtro de repeticiones compartido: un alumno que
+    pasa frente a dos cámaras en el mismo segundo se emite una sola vez.
+
+    Args:
+        sources (list): IDs de cámara, videos o carpetas de imágenes.
+        on_detection: Función on_detection(source, Detection).
+        debounce (DebounceCache): Filtro compartido (por defecto, uno nuevo).
+        **pipeline_options: Argumentos adicionales para cada ScanPipeline.
+
+    Raises:
+        ValueError: Si una fuente aparece más de una vez (tendría un solo pipeline).
+    """
+
+    def __init__(self, sources: list, on_detection=None, debounce=None, **pipeline_options):
+        duplicates = duplicate_sources(sources)
+        if duplicates:
+            raise ValueError(f"Fuentes repetidas: {', '.join(source_label(source) for source in duplicates)}")
+        self.debounce = debounce if debounce is not None else DebounceCache()
+        self.on_detection = on_detection
+        self.pipelines = {
+            source: ScanPipeline(
+                source,
+                on_detection=self._detection_callback(source),
+                debounce=self.debounce,
+                **pipeline_options,
+            )
+            for source in sources
+        }
+        self._threads = []
+
+    def _detection_callback(self, source):
+        def callback(detection):
+            if self.on_detection:
+                self.on_detection(source, detection)
+        return callback
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=pipeline.run, name=f"Capture-{source_label(source)}", daemon=True)
+            for source, pipeline in self.pipelines.items()
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def wait(self, timeout: float = None):
+        """Espera a que terminen todas las fuentes (fin de los archivos o stop())."""
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def stop(self):
+        for pipeline in self.pipelines.values():
+            pipeline.stop()
+        self.wait()
+
+    def stats(self) -> dict:
+        """Estadísticas por fuente: {fuente: ScanPipeline.stats()}."""
+        return {source: pipeline.stats() for source, pipeline in self.pipelines.items()}
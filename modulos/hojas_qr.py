@@ -0,0 +1,275 @@
+# modulos/hojas_qr.py
+
+import sys
+import os
+import re
+import time
+import zlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Ajuste de PATH para importar módulos del proyecto
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modulos.utilidades import Session, Student
+from modulos.alumnos import generate_qr_code, QR_FOLDER
+
+# --- Diseño de las hojas (A4 a 150 ppp) ---
+SHEET_DPI = 150
+SHEET_SIZE = (1240, 1754)      # A4 vertical en píxeles
+SHEET_MARGIN = 60
+SHEET_COLUMNS = 4
+SHEET_ROWS = 5
+SHEET_WORKERS = os.cpu_count() or 1
+
+SHEET_FORMATS = ("pdf", "png")
+
+
+def list_courses() -> list:
+    """Cursos distintos con alumnos registrados (para elegir qué hojas imprimir)."""
+    session = Session()
+    try:
+        rows = session.query(Student.course).distinct().order_by(Student.course).all()
+    finally:
+        session.close()
+    return [course for (course,) in rows if course]
+
+
+def _load_font(size: int):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def _fit_text(draw, text: str, font, max_width: int) -> str:
+    """Recorta el texto con '…' para que quepa en el ancho de la celda."""
+    if draw.textlength(text, font=font) <= max_width:
+        return text
+    while text and draw.textlength(text + "…", font=font) > max_width:
+        text = text[:-1]
+    return text + "…"
+
+
+def _compose_page(job: tuple) -> tuple:
+    """
+    Compone una hoja con la cuadrícula de QR y nombres (se ejecuta en un proceso del pool).
+
+    Args:
+        job: (número de página, título, columnas, filas, [(matrícula, qr_data, color, nombre)],
+              carpeta de salida para PNG o None para PDF).
+
+    Returns:
+        tuple: (número de página, píxeles RGB comprimidos con zlib o None si se guardó
+                como PNG, QR que no se pudieron generar).
+    """
+    page_number, title, columns, rows, students, png_folder = job
+    page = Image.new("RGB", SHEET_SIZE, "white")
+    draw = ImageDraw.Draw(page)
+    title_font = _load_font(28)
+    name_font = _load_font(20)
+    small_font = _load_font(16)
+
+    header_height = 60
+    draw.text((SHEET_MARGIN, SHEET_MARGIN // 2), title, fill="black", font=title_font)
+
+    cell_width = (SHEET_SIZE[0] - 2 * SHEET_MARGIN) // columns
+    cell_height = (SHEET_SIZE[1] - 2 * SHEET_MARGIN - header_height) // rows
+    text_height = 50
+    qr_size = min(cell_width, cell_height - text_height) - 10
+
+    failed = []
+    for index, (matricula, qr_data, qr_color, name) in enumerate(students):
+        x = SHEET_MARGIN + (index % columns) * cell_width
+        y = SHEET_MARGIN + header_height + (index // columns) * cell_height
+
+        # Reutiliza la caché de QR (solo renderiza si la imagen no existe)
+        qr_path = generate_qr_code(qr_data, matricula, qr_color or '000000')
+        if qr_path:
+            with Image.open(qr_path) as qr_image:
+                qr_image = qr_image.convert("RGB").resize((qr_size, qr_size), Image.Resampling.NEAREST)
+                page.paste(qr_image, (x + (cell_width - qr_size) // 2, y))
+        else:
+            failed.append(matricula)
+
+        text_y = y + qr_size + 4
+        draw.text((x + 10, text_y), _fit_text(draw, name, name_font, cell_width - 20), fill="black", font=name_font)
+        draw.text((x + 10, text_y + 24), matricula, fill="dimgray", font=small_font)
+
+    if png_folder is not None:
+        # Cada proceso guarda su propia hoja
+        page.save(os.path.join(png_folder, f"hoja_{page_number + 1:03d}.png"), compress_level=1)
+        return page_number, None, failed
+
+    # Para el PDF se devuelven los píxeles comprimidos: las hojas son casi blancas y
+    # se comprimen mucho, y el proceso principal solo tiene que copiarlos al archivo
+    return page_number, zlib.compress(page.tobytes(), 3), failed
+
+
+class _StreamingPdfWriter:
+    """
+    Escritor mínimo de PDF que agrega páginas (una imagen RGB cada una) a medida que
+    llegan, sin mantener el documento en memoria.
+    """
+
+    def __init__(self, path, dpi: int = SHEET_DPI):
+        self.file = open(path, "wb")
+        self.dpi = dpi
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 3    # 1 = catálogo, 2 = árbol de páginas (se escriben al cerrar)
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write_object(self, object_id: int, body: bytes, stream: bytes = None):
+        self.offsets[object_id] = self.file.tell()
+        self.file.write(f"{object_id} 0 obj\n".encode() + body)
+        if stream is not None:
+            self.file.write(b"\nstream\n" + stream + b"\nendstream")
+        self.file.write(b"\nendobj\n")
+
+    def add_page(self, width: int, height: int, flate_rgb: bytes):
+        image_id, content_id, page_id = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+        width_pt = width * 72 / self.dpi
+        height_pt = height * 72 / self.dpi
+
+        self._write_object(image_id, (
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode /Length {len(flate_rgb)} >>"
+        ).encode(), flate_rgb)
+        content = f"q {width_pt:.2f} 0 0 {height_pt:.2f} 0 0 cm /Im0 Do Q".encode()
+        self._write_object(content_id, f"<< /Length {len(content)} >>".encode(), content)
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width_pt:.2f} {height_pt:.2f}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode())
+        self.page_ids.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode())
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = self.file.tell()
+        total = self.next_id
+        lines = [f"xref\n0 {total}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets[object_id]:010d} 00000 n \n" for object_id in range(1, total)]
+        lines.append(f"trailer\n<< /Size {total} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self.file.write("".join(lines).encode())
+        self.file.close()
+
+
+def _course_slug(course: str) -> str:
+    return re.sub(r"[^\w-]+", "_", course).strip("_") or "curso"
+
+
+def generate_course_sheets(course: str, fmt: str = "pdf", workers: int = SHEET_WORKERS,
+                           columns: int = SHEET_COLUMNS, rows: int = SHEET_ROWS, progress=None) -> str:
+    """
+    Genera hojas imprimibles con los QR (y nombres) de todos los alumnos de un curso.
+
+    Las hojas se componen en paralelo en un pool de procesos y se escriben en orden
+    en 'datos QR/QR/': un PDF de varias páginas o una carpeta con un PNG por hoja.
+
+    Args:
+        course (str): Curso (filtro Student.course).
+        fmt (str): 'pdf' o 'png'.
+        workers (int): Procesos del pool.
+        columns (int), rows (int): Cuadrícula de QR por hoja.
+        progress: Función opcional progress(hojas_listas, total_hojas).
+
+    Returns:
+        str: Ruta del PDF o de la carpeta de PNG, o mensaje de error.
+    """
+    if fmt not in SHEET_FORMATS:
+        return f"Error: Formato de hoja no soportado: {fmt}"
+
+    session = Session()
+    try:
+        students = (
+            session.query(Student.matricula, Student.qr_data, Student.qr_color, Student.first_name, Student.last_name)
+            .filter(Student.course == course)
+            .order_by(Student.last_name, Student.first_name)
+            .all()
+        )
+    finally:
+        session.close()
+
+    if not students:
+        return f"Error: No hay alumnos registrados en el curso '{course}'."
+
+    # 1. Repartir los alumnos en hojas
+    per_page = columns * rows
+    total_pages = (len(students) + per_page - 1) // per_page
+    jobs = []
+    for page_index in range(total_pages):
+        page_students = [
+            (s.matricula, s.qr_data, s.qr_color, f"{s.last_name}, {s.first_name}")
+            for s in students[page_index * per_page:(page_index + 1) * per_page]
+        ]
+        title = f"{course} - Hoja {page_index + 1} de {total_pages}"
+        jobs.append((page_index, title, columns, rows, page_students, None))
+
+    # 2. Ruta de salida
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    base_name = f"hojas_{_course_slug(course)}_{timestamp}"
+    pdf_writer = None
+    if fmt == "pdf":
+        output_path = QR_FOLDER / f"{base_name}.pdf"
+    else:
+        output_path = QR_FOLDER / base_name
+        output_path.mkdir(parents=True, exist_ok=True)
+        jobs = [job[:5] + (str(output_path),) for job in jobs]
+
+    # 3. Componer en paralelo y escribir en orden ('spawn' es seguro desde un hilo de Qt)
+    failed = []
+    try:
+        if fmt == "pdf":
+            pdf_writer = _StreamingPdfWriter(output_path)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=context) as pool:
+            for done, (page_number, flate_rgb, page_failed) in enumerate(pool.map(_compose_page, jobs), start=1):
+                failed.extend(page_failed)
+                if pdf_writer is not None:
+                    pdf_writer.add_page(SHEET_SIZE[0], SHEET_SIZE[1], flate_rgb)
+                if progress:
+                    progress(done, total_pages)
+        if pdf_writer is not None:
+            pdf_writer.close()
+    except Exception as e:
+        if pdf_writer is not None:
+            pdf_writer.file.close()
+        return f"Error al generar las hojas de QR: {e}"
+
+    if failed:
+        print(f"Advertencia: no se pudo generar el QR de {len(failed)} alumnos: {', '.join(failed[:10])}")
+    return str(output_path)
+
+
+# --- GENERACIÓN DESDE LA TERMINAL ---
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Genera hojas imprimibles con los QR de un curso.")
+    parser.add_argument("curso", nargs="?", help="Curso a imprimir (sin argumento, lista los cursos)")
+    parser.add_argument("--formato", choices=SHEET_FORMATS, default="pdf")
+    parser.add_argument("--procesos", type=int, default=SHEET_WORKERS)
+    parser.add_argument("--columnas", type=int, default=SHEET_COLUMNS)
+    parser.add_argument("--filas", type=int, default=SHEET_ROWS)
+    args = parser.parse_args()
+
+    if not args.curso:
+        print("Cursos disponibles:")
+        for course in list_courses():
+            print(f"  - {course}")
+        sys.exit(0)
+
+    start = time.perf_counter()
+    result = generate_course_sheets(
+        args.curso, args.formato, args.procesos, args.columnas, args.filas,
+        progress=lambda done, total: print(f"\rHojas: {done}/{total}", end="", flush=True)
+    )
+    print(f"\nResultado: {result} ({time.perf_counter() - start:.1f} s)")
@@ -0,0 +1,247 @@
+# modulos/importacion.py
+
+import sys
+import os
+import time
+import unicodedata
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+# Ajuste de PATH para importar módulos del proyecto
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modulos.utilidades import Session, Student
+from modulos.cache_alumnos import roster_cache
+from modulos.alumnos import generate_qr_code, is_valid_qr_color
+
+# Alumnos insertados por transacción
+IMPORT_BATCH_SIZE = 1000
+# Procesos que generan los PNG de QR (por defecto, uno por núcleo)
+IMPORT_QR_WORKERS = os.cpu_count() or 1
+
+# Nombres de columna aceptados en el archivo (sin acentos, en minúsculas) -> campo de Student
+COLUMN_ALIASES = {
+    "matricula": "matricula",
+    "nombre": "first_name",
+    "first_name": "first_name",
+    "apellido": "last_name",
+    "apellidos": "last_name",
+    "last_name": "last_name",
+    "curso": "course",
+    "course": "course",
+    "color": "qr_color",
+    "color_qr": "qr_color",
+    "qr_color": "qr_color",
+}
+
+REQUIRED_FIELDS = ("matricula", "first_name", "last_name")
+
+
+def _normalize_header(name: str) -> str:
+    """'Matrícula ' -> 'matricula'"""
+    name = unicodedata.normalize("NFKD", str(name)).encode("ascii", "ignore").decode("ascii")
+    return name.strip().lower().replace(" ", "_")
+
+
+def read_roster(path) -> pd.DataFrame:
+    """
+    Lee un padrón de alumnos desde CSV o XLSX y normaliza los nombres de columna.
+
+    Args:
+        path: Ruta al archivo (.csv o .xlsx).
+
+    Returns:
+        pd.DataFrame: Columnas renombradas a los campos de Student (todo como texto).
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".xls":
+        # El formato antiguo de Excel necesita xlrd, que no es dependencia del proyecto
+        raise ValueError("Formato .xls no soportado: guarde el padrón como .xlsx o .csv.")
+    if suffix == ".xlsx":
+        # pandas necesita openpyxl para leer archivos de Excel
+        df = pd.read_excel(path, dtype=str)
+    else:
+        # sep=None detecta ',' o ';' automáticamente
+        df = pd.read_csv(path, dtype=str, sep=None, engine="python", encoding="utf-8-sig")
+
+    df = df.rename(columns=lambda column: COLUMN_ALIASES.get(_normalize_header(column), _normalize_header(column)))
+    missing = [field for field in REQUIRED_FIELDS if field not in df.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas obligatorias en el archivo: {', '.join(missing)}")
+    return df.fillna("")
+
+
+def _render_qr(row: tuple) -> tuple:
+    """Genera el PNG de un alumno (se ejecuta en un proceso del pool)."""
+    matricula, qr_color = row
+    return matricula, generate_qr_code(matricula, matricula, qr_color)
+
+
+def _insert_rows(session, rows: list, errors: list) -> list:
+    """
+    Inserta un lote en una transacción; si falla, reintenta fila por fila para
+    identificar exactamente qué alumnos no se pudieron registrar.
+
+    Returns:
+        list: Filas insertadas.
+    """
+    records = [row["record"] for row in rows]
+    try:
+        session.execute(insert(Student), records)
+        session.commit()
+        return rows
+    except IntegrityError:
+        session.rollback()
+
+    inserted = []
+    for row in rows:
+        try:
+            session.execute(insert(Student), [row["record"]])
+            session.commit()
+            inserted.append(row)
+        except IntegrityError as e:
+            session.rollback()
+            errors.append((row["line"], row["record"]["matricula"], f"Error de integridad: {e.orig}"))
+    return inserted
+
+
+def import_students(path, qr_color: str = '000000', batch_size: int = IMPORT_BATCH_SIZE,
+                    workers: int = IMPORT_QR_WORKERS, render_qr: bool = False) -> dict:
+    """
+    Importa un padrón de alumnos desde CSV/XLSX.
+
+    Valida datos obligatorios y duplicados (dentro del archivo y contra la tabla
+    students en una sola consulta) e inserta en transacciones de `batch_size`
+    alumnos. Los QR se generan al descargarlos o imprimirlos (get_student_qr_path);
+    con render_qr=True se generan todos por adelantado en un pool de procesos.
+
+    Args:
+        path: Ruta al archivo CSV o XLSX.
+        qr_color (str): Color HEX por defecto (si el archivo no trae columna de color).
+        batch_size (int): Alumnos por transacción.
+        workers (int): Procesos para generar los PNG de QR.
+        render_qr (bool): Generar los PNG de QR durante la importación (por defecto, no).
+
+    Returns:
+        dict: total, inserted, qr_generated, errors [(línea, matrícula, mensaje)],
+              seconds y rows_per_second.
+    """
+    start = time.perf_counter()
+    errors = []
+
+    df = read_roster(path)
+
+    # 1. Matrículas existentes (una sola consulta)
+    session = Session()
+    try:
+        existing = {matricula for (matricula,) in session.query(Student.matricula)}
+    finally:
+        session.close()
+
+    # 2. Validación fila por fila (sin tocar la DB)
+    rows = []
+    seen = set()
+    now = datetime.now()
+    for line, record in enumerate(df.to_dict("records"), start=2):   # Línea 1 = encabezado
+        matricula = str(record.get("matricula", "")).strip()
+        first_name = str(record.get("first_name", "")).strip()
+        last_name = str(record.get("last_name", "")).strip()
+        color = str(record.get("qr_color", "")).strip().lstrip("#") or qr_color
+
+        if not matricula or not first_name or not last_name:
+            errors.append((line, matricula, "Matrícula, Nombre y Apellido son obligatorios."))
+            continue
+        if not is_valid_qr_color(color):
+            errors.append((line, matricula, f"Color QR inválido: {color}"))
+            continue
+        if matricula in existing:
+            errors.append((line, matricula, "La matrícula ya está registrada."))
+            continue
+        if matricula in seen:
+            errors.append((line, matricula, "Matrícula duplicada dentro del archivo."))
+            continue
+        seen.add(matricula)
+
+        rows.append({
+            "line": line,
+            "record": {
+                "matricula": matricula,
+                "first_name": first_name,
+                "last_name": last_name,
+                "course": str(record.get("course", "")).strip(),
+                "qr_data": matricula,
+                "qr_color": color,
+                "photo_path": "",
+                "active": True,
+                "registered_on": now,
+            },
+        })
+
+    # 3. Inserción por lotes
+    inserted = []
+    session = Session()
+    try:
+        for batch_start in range(0, len(rows), batch_size):
+            inserted.extend(_insert_rows(session, rows[batch_start:batch_start + batch_size], errors))
+    finally:
+        session.close()
+
+    # 4. La caché del padrón se recarga una sola vez con todos los alumnos nuevos
+    roster_cache.warm()
+
+    # 5. Generación de QR en paralelo ('spawn' es seguro aunque se llame desde un hilo de Qt)
+    qr_generated = 0
+    if render_qr and inserted:
+        qr_jobs = [(row["record"]["matricula"], row["record"]["qr_color"]) for row in inserted]
+        lines = {row["record"]["matricula"]: row["line"] for row in inserted}
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=context) as pool:
+            for matricula, qr_path in pool.map(_render_qr, qr_jobs, chunksize=64):
+                if qr_path:
+                    qr_generated += 1
+                else:
+                    errors.append((lines[matricula], matricula, "No se pudo generar el QR."))
+
+    seconds = time.perf_counter() - start
+    errors.sort()
+    return {
+        "total": len(df),
+        "inserted": len(inserted),
+        "qr_generated": qr_generated,
+        "errors": errors,
+        "seconds": seconds,
+        "rows_per_second": len(df) / seconds if seconds else 0.0,
+    }
+
+
+# --- IMPORTACIÓN DESDE LA TERMINAL ---
+if __name__ == '__main__':
+    import argparse
+    from modulos.utilidades import setup_database
+
+    parser = argparse.ArgumentParser(description="Importa alumnos desde un archivo CSV o XLSX.")
+    parser.add_argument("archivo", help="Columnas: matricula, nombre, apellido, curso (opcional), color (opcional)")
+    parser.add_argument("--color", default="000000", help="Color HEX por defecto del QR")
+    parser.add_argument("--lote", type=int, default=IMPORT_BATCH_SIZE, help="Alumnos por transacción")
+    parser.add_argument("--procesos", type=int, default=IMPORT_QR_WORKERS, help="Procesos para generar QR (con --con-qr)")
+    parser.add_argument("--con-qr", action="store_true",
+                        help="Generar todos los PNG de QR ahora (por defecto, al descargarlos o imprimirlos)")
+    args = parser.parse_args()
+
+    setup_database()
+    print(f"--- Importación de alumnos: {args.archivo} ---")
+    report = import_students(args.archivo, args.color, args.lote, args.procesos, args.con_qr)
+
+    for line, matricula, message in report["errors"]:
+        print(f"  Línea {line} ({matricula or 'sin matrícula'}): {message}")
+    generated = f"{report['qr_generated']} QR generados, " if args.con_qr else ""
+    print(f"✅ {report['inserted']} de {report['total']} alumnos importados, "
+          f"{generated}{len(report['errors'])} errores.")
+    print(f"Tiempo: {report['seconds']:.2f} s ({report['rows_per_second']:.0f} filas/s)")
@@ -0,0 +1,313 @@
+# modulos/metricas.py
+"""
+Tiempos por etapa del escaneo: captura, decodificación, búsqueda en la base,
+commit y dibujo de la vista previa, más la latencia completa de cada escaneo
+(captura del frame -> asistencia registrada).
+
+Cada etapa guarda sus duraciones en un histograma de cubetas fijas con dos
+vistas: el acumulado desde el inicio (para Prometheus) y una ventana deslizante
+de los últimos segundos (para el panel de la GUI). Registrar una muestra es una
+búsqueda binaria y unas sumas bajo un lock, así que se puede medir cada frame.
+"""
+
+import sys
+import os
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+
+# Ajuste de PATH para importar módulos del proyecto
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modulos.configuracion import get_setting
+
+# --- Configuración (config.ini: [metricas]) ---
+METRICS_ENABLED = get_setting("metricas", "activas", True, bool)
+# Segundos que abarca la ventana deslizante del panel
+METRICS_WINDOW = get_setting("metricas", "ventana", 60, int)
+# Archivo donde se vuelcan periódicamente (.json = JSON, cualquier otro = texto de Prometheus)
+METRICS_FILE = get_setting("metricas", "archivo", "", str)
+METRICS_INTERVAL = get_setting("metricas", "intervalo", 15.0, float)
+
+# Límites superiores de las cubetas (ms); la última cubeta es "+Inf"
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Etapas instrumentadas (en el orden en que se muestran)
+STAGES = {
+    "captura": "Lectura de un frame de la fuente",
+    "decodificacion": "Decodificación de QR de un frame (con preprocesado)",
+    "db_busqueda": "Búsqueda del alumno y de su asistencia del día",
+    "db_commit": "Inserción y commit de un lote de asistencias",
+    "render": "Conversión y dibujo de un frame en la vista previa",
+    # Escaneo completo: incluye la espera en la cola del escritor y el commit agrupado
+    "registro": "Desde la captura del frame hasta el registro de la asistencia",
+}
+
+PROMETHEUS_METRIC = "proyectis_etapa_segundos"
+
+
+class RollingHistogram:
+    """
+    Histograma de duraciones con cubetas fijas.
+
+    Guarda el acumulado desde el inicio y, aparte, un casillero por segundo para
+    consultar solo los últimos `window` segundos.
+    """
+
+    def __init__(self, window: int = METRICS_WINDOW, buckets_ms=BUCKETS_MS):
+        self.bounds = [bound / 1000 for bound in buckets_ms]
+        self.window = window
+        self._lock = threading.Lock()
+        # Acumulado (cubetas no acumulativas; la última es el desborde)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        # Casilleros por segundo: [segundo, cubetas, cantidad, suma, máximo]
+        self._slots = deque()
+
+    def observe(self, seconds: float, now: float = None):
+        index = bisect_left(self.bounds, seconds)
+        second = int(time.monotonic() if now is None else now)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+
+            if not self._slots or self._slots[-1][0] != second:
+                self._slots.append([second, [0] * len(self.counts), 0, 0.0, 0.0])
+                self._expire(second)
+            slot = self._slots[-1]
+            slot[1][index] += 1
+            slot[2] += 1
+            slot[3] += seconds
+            slot[4] = max(slot[4], seconds)
+
+    def _expire(self, second: int):
+        while self._slots and self._slots[0][0] <= second - self.window:
+            self._slots.popleft()
+
+    def _quantile(self, counts: list, total: int, q: float, maximum: float) -> float:
+        """Cuantil aproximado: interpolación lineal dentro de la cubeta que lo contiene."""
+        target = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= target:
+                if index == len(self.bounds):
+                    return maximum
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = min(self.bounds[index], maximum)
+                return lower + (upper - lower) * (target - seen) / count
+            seen += count
+        return maximum
+
+    def snapshot(self, now: float = None) -> dict:
+        """Resumen de la ventana deslizante (duraciones en ms)."""
+        second = int(time.monotonic() if now is None else now)
+        with self._lock:
+            self._expire(second)
+            counts = [0] * len(self.counts)
+            total, total_sum, maximum = 0, 0.0, 0.0
+            for _, slot_counts, slot_total, slot_sum, slot_max in self._slots:
+                for index, count in enumerate(slot_counts):
+                    counts[index] += count
+                total += slot_total
+                total_sum += slot_sum
+                maximum = max(maximum, slot_max)
+            span = min(self.window, second - self._slots[0][0] + 1) if self._slots else self.window
+
+        if not total:
+            return {"count": 0, "rate": 0.0, "mean_ms": 0.0, "p50_ms": 0.0,
+                    "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": total,
+            "rate": total / span,
+            "mean_ms": total_sum / total * 1000,
+            "p50_ms": self._quantile(counts, total, 0.50, maximum) * 1000,
+            "p95_ms": self._quantile(counts, total, 0.95, maximum) * 1000,
+            "p99_ms": self._quantile(counts, total, 0.99, maximum) * 1000,
+            "max_ms": maximum * 1000,
+        }
+
+    def cumulative(self) -> tuple:
+        """(cubetas, cantidad, suma) desde el inicio."""
+        with self._lock:
+            return list(self.counts), self.count, self.sum
+
+
+class StageMetrics:
+    """
+    Histogramas por etapa, compartidos por todos los hilos.
+
+    Uso:
+        with metrics.measure("db_commit"):
+            session.commit()
+        metrics.observe("captura", segundos)
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, window: int = METRICS_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> RollingHistogram:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, RollingHistogram(self.window))
+        return histogram
+
+    def observe(self, stage: str, seconds: float):
+        if self.enabled:
+            self.histogram(stage).observe(seconds)
+
+    @contextmanager
+    def measure(self, stage: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(stage).observe(time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def _stages(self) -> list:
+        """[(etapa, histograma)] con datos: primero las conocidas, en orden, y después el resto."""
+        # Copia bajo el lock: otro hilo puede estar agregando una etapa nueva
+        with self._lock:
+            histograms = dict(self._histograms)
+        known = [stage for stage in STAGES if stage in histograms]
+        others = sorted(stage for stage in histograms if stage not in STAGES)
+        return [(stage, histograms[stage]) for stage in known + others]
+
+    def snapshot(self) -> dict:
+        """{etapa: resumen de la ventana deslizante} (ver RollingHistogram.snapshot)."""
+        return {stage: histogram.snapshot() for stage, histogram in self._stages()}
+
+    def to_prometheus(self) -> str:
+        """Texto en formato de exposición de Prometheus (histograma acumulado + cuantiles de la ventana)."""
+        lines = [
+            f"# HELP {PROMETHEUS_METRIC} Duración de cada etapa del escaneo.",
+            f"# TYPE {PROMETHEUS_METRIC} histogram",
+        ]
+        windows = []
+        for stage, histogram in self._stages():
+            counts, count, total = histogram.cumulative()
+            cumulative = 0
+            for bound, bucket in zip(histogram.bounds + [None], counts):
+                cumulative += bucket
+                le = "+Inf" if bound is None else repr(bound)
+                lines.append(f'{PROMETHEUS_METRIC}_bucket{{etapa="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{PROMETHEUS_METRIC}_sum{{etapa="{stage}"}} {total:.6f}')
+            lines.append(f'{PROMETHEUS_METRIC}_count{{etapa="{stage}"}} {count}')
+            windows.append((stage, histogram.snapshot()))
+
+        lines += [
+            f"# HELP {PROMETHEUS_METRIC}_ventana Cuantiles de los últimos {self.window} s.",
+            f"# TYPE {PROMETHEUS_METRIC}_ventana gauge",
+        ]
+        for stage, snapshot in windows:
+            for quantile in ("p50", "p95", "p99"):
+                value = snapshot[f"{quantile}_ms"] / 1000
+                lines.append(f'{PROMETHEUS_METRIC}_ventana{{etapa="{stage}",cuantil="0.{quantile[1:]}"}} {value:.6f}')
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "window_s": self.window,
+            "stages": self.snapshot(),
+        }, ensure_ascii=False, indent=2)
+
+    def dump(self, path) -> bool:
+        """Escribe las métricas en `path` (reemplazo atómico; .json = JSON, si no, Prometheus)."""
+        path = Path(path)
+        content = self.to_json() if path.suffix.lower() == ".json" else self.to_prometheus()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_text(content, encoding="utf-8")
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            print(f"Advertencia: no se pudieron guardar las métricas en {path}: {e}")
+            return False
+
+
+class MetricsExporter:
+    """Hilo que vuelca las métricas a un archivo cada `interval` segundos."""
+
+    def __init__(self, path, interval: float = METRICS_INTERVAL, registry: StageMetrics = None):
+        self.path = path
+        self.interval = max(1.0, interval)
+        self.registry = registry or metrics
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="MetricsExporter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """Detiene el hilo y hace un último volcado."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.registry.dump(self.path)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            # Un volcado fallido no debe detener los siguientes
+            try:
+                self.registry.dump(self.path)
+            except Exception as e:
+                print(f"Advertencia: error al volcar las métricas en {self.path}: {e}")
+
+
+# Métricas compartidas por la aplicación
+metrics = StageMetrics()
+
+# Exportador compartido (se inicia solo si hay un archivo configurado)
+_exporter = None
+
+def start_metrics_exporter(path=None, interval: float = METRICS_INTERVAL) -> MetricsExporter:
+    """Inicia (una sola vez) el volcado periódico; devuelve None si no hay archivo configurado."""
+    global _exporter
+    path = path or METRICS_FILE
+    if not path or not metrics.enabled:
+        return None
+    if _exporter is None or not _exporter.running:
+        _exporter = MetricsExporter(path, interval)
+        _exporter.start()
+    return _exporter
+
+def stop_metrics_exporter(timeout: float = 5.0):
+    """Detiene el volcado periódico (con un último volcado al cerrar)."""
+    global _exporter
+    if _exporter is not None:
+        _exporter.stop(timeout)
+        _exporter = None
+
+
+if __name__ == '__main__':
+    # Muestra el formato de salida con datos de ejemplo
+    import random
+    for _ in range(1000):
+        metrics.observe("decodificacion", random.lognormvariate(-4, 0.5))
+        metrics.observe("db_commit", random.lognormvariate(-6, 0.8))
+    print(metrics.to_prometheus())
+    print(metrics.to_json())
@@ -2,59 +2,111 @@
 
 import sys
 import os
-import pandas as pd
+import gzip
 from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+from sqlalchemy import select, type_coerce, Text
 
 # Ajuste de PATH para importar módulos del proyecto
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))) 
 
-from modulos.utilidades import Session, Student, Attendance, MAIN_EXPORT_FOLDER
+from modulos.utilidades import Session, Student, Attendance, ExportState, MAIN_EXPORT_FOLDER
+
+# pandas se importa al exportar (no al abrir la aplicación): es el import más pesado
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Asegúrate de que pandas esté instalado: pip install pandas
 
-def get_attendance_data() -> pd.DataFrame:
+# Filas que se leen de SQLite por bloque al generar reportes
+REPORT_CHUNK_SIZE = 50000
+
+# Columnas del reporte (en este orden)
+REPORT_COLUMNS = ['ID_Asistencia', 'Matrícula', 'Nombre', 'Apellido', 'Curso', 'Fecha', 'Hora']
+
+def _attendance_report_query(since_id: int = None):
+    """Consulta única asistencias JOIN students, ordenada por ID (opcionalmente solo IDs > since_id)."""
+    query = (
+        select(
+            Attendance.id.label('ID_Asistencia'),
+            Attendance.matricula.label('Matrícula'),
+            Student.first_name.label('Nombre'),
+            Student.last_name.label('Apellido'),
+            Student.course.label('Curso'),
+            # Se lee como texto ('YYYY-MM-DD HH:MM:SS.ffffff') para no convertir fila por fila a datetime
+            type_coerce(Attendance.time_stamp, Text).label('time_stamp'),
+        )
+        .join(Student, Student.matricula == Attendance.matricula)
+        .order_by(Attendance.id)
+    )
+    if since_id is not None:
+        query = query.where(Attendance.id > since_id)
+    return query
+
+def _format_report_chunk(chunk: "pd.DataFrame") -> "pd.DataFrame":
+    """Separa fecha y hora de forma vectorizada y deja las columnas del reporte."""
+    time_stamp = chunk.pop('time_stamp').astype(str)
+    chunk['Fecha'] = time_stamp.str.slice(0, 10)
+    chunk['Hora'] = time_stamp.str.slice(11, 19)
+    return chunk[REPORT_COLUMNS]
+
+def iter_attendance_chunks(chunksize: int = REPORT_CHUNK_SIZE, since_id: int = None):
+    """
+    Lee la asistencia combinada con los datos del alumno por bloques.
+
+    Args:
+        chunksize (int): Filas por bloque.
+        since_id (int): Si se indica, solo asistencias con ID mayor (exportación incremental).
+
+    Yields:
+        pd.DataFrame: Bloques con las columnas de REPORT_COLUMNS.
+    """
+    import pandas as pd
+
+    session = Session()
+    try:
+        for chunk in pd.read_sql(_attendance_report_query(since_id), session.connection(), chunksize=chunksize):
+            yield _format_report_chunk(chunk)
+    finally:
+        session.close()
+
+def get_attendance_data() -> "pd.DataFrame":
     """
     Obtiene todos los registros de asistencia y los combina con los datos del alumno.
     
     Returns:
         pd.DataFrame: DataFrame con la asistencia y detalles del alumno.
     """
-    session = Session()
+    import pandas as pd
+
     try:
-        # Consulta para obtener todos los registros de asistencia
-        attendance_records = session.query(Attendance).all()
-        
-        # Convertir los resultados en una lista de diccionarios
-        data = []
-        for record in attendance_records:
-            # Obtener el alumno usando el matricula del registro (eficiente)
-            student = session.query(Student).filter(Student.matricula == record.matricula).one_or_none()
-            
-            if student:
-                data.append({
-                    'ID_Asistencia': record.id,
-                    'Matrícula': record.matricula,
-                    'Nombre': student.first_name,
-                    'Apellido': student.last_name,
-                    'Curso': student.course,
-                    'Fecha': record.time_stamp.strftime('%Y-%m-%d'),
-                    'Hora': record.time_stamp.strftime('%H:%M:%S')
-                })
-        
-        return pd.DataFrame(data)
+        chunks = list(iter_attendance_chunks())
+        if not chunks:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        return pd.concat(chunks, ignore_index=True)
     except Exception as e:
         print(f"Error al obtener datos de asistencia: {e}")
         return pd.DataFrame()
-    finally:
-        session.close()
 
-def export_attendance_to_csv(df: pd.DataFrame, filename_suffix: str = "reporte") -> str:
+def _export_file_path(filename_suffix: str, extension: str, export_folder=None) -> Path:
+    """Ruta de salida dentro de la subcarpeta con la fecha de hoy ('datos QR/YYYY-MM-DD/')."""
+    # 1. Crear la carpeta con la fecha de hoy dentro de 'datos QR'
+    today_folder = Path(export_folder or MAIN_EXPORT_FOLDER) / datetime.now().strftime('%Y-%m-%d')
+    today_folder.mkdir(parents=True, exist_ok=True)
+    
+    # 2. Generar nombre de archivo único
+    timestamp = datetime.now().strftime('%H%M%S')
+    return today_folder / f"{filename_suffix}_{timestamp}{extension}"
+
+def export_attendance_to_csv(df: "pd.DataFrame", filename_suffix: str = "reporte", export_folder=None) -> str:
     """
     Exporta un DataFrame de asistencia a un archivo CSV en la carpeta de exportación.
     
     Args:
         df (pd.DataFrame): DataFrame a exportar.
         filename_suffix (str): Sufijo para el nombre del archivo.
+        export_folder: Carpeta base (por defecto MAIN_EXPORT_FOLDER).
         
     Returns:
         str: Ruta completa donde se guardó el archivo o mensaje de error.
@@ -62,14 +114,7 @@ def export_attendance_to_csv(df: pd.DataFrame, filename_suffix: str = "reporte")
     if df.empty:
         return "Error: DataFrame vacío. No hay datos para exportar."
 
-    # 1. Crear la carpeta con la fecha de hoy dentro de 'datos QR'
-    today_folder = MAIN_EXPORT_FOLDER / datetime.now().strftime('%Y-%m-%d')
-    today_folder.mkdir(parents=True, exist_ok=True)
-    
-    # 2. Generar nombre de archivo único
-    timestamp = datetime.now().strftime('%H%M%S')
-    filename = f"{filename_suffix}_{timestamp}.csv"
-    file_path = today_folder / filename
+    file_path = _export_file_path(filename_suffix, ".csv", export_folder)
 
     try:
         # 3. Guardar el archivo CSV
@@ -78,17 +123,187 @@ def export_attendance_to_csv(df: pd.DataFrame, filename_suffix: str = "reporte")
     except Exception as e:
         return f"Error al exportar CSV: {e}"
 
-# --- PRUEBA DE FUNCIONALIDAD ---
+# --- Exportación por bloques (memoria acotada) ---
+
+# Formatos soportados por export_attendance_streaming y su extensión
+EXPORT_FORMATS = {
+    "csv": ".csv",
+    "csv.gz": ".csv.gz",     # CSV comprimido con gzip
+    "parquet": ".parquet",   # Requiere pyarrow (opcional)
+}
+
+NO_DATA_MESSAGE = "Error: No hay registros de asistencia para exportar."
+
+def _write_csv_chunks(chunks, file_path: Path, compressed: bool) -> int:
+    """Escribe los bloques uno tras otro en el CSV (con encabezado solo en el primero)."""
+    opener = gzip.open if compressed else open
+    rows = 0
+    header_written = False
+    with opener(file_path, 'wt', encoding='utf-8', newline='') as output:
+        for chunk in chunks:
+            # Un primer bloque vacío igual escribe el encabezado: no debe repetirse en el siguiente
+            chunk.to_csv(output, index=False, header=not header_written)
+            header_written = True
+            rows += len(chunk)
+    return rows
+
+def _write_parquet_chunks(chunks, file_path: Path) -> int:
+    """Escribe cada bloque como un row group del archivo Parquet."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Esquema fijo: un bloque con 'Curso' vacío no debe cambiar el tipo de la columna
+    schema = pa.schema([('ID_Asistencia', pa.int64())] +
+                       [(column, pa.string()) for column in REPORT_COLUMNS[1:]])
+    rows = 0
+    with pq.ParquetWriter(file_path, schema, compression='snappy') as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            rows += len(chunk)
+    return rows
+
+def _track_last_id(chunks, tracker: dict):
+    """Deja pasar los bloques anotando el último ID_Asistencia visto."""
+    for chunk in chunks:
+        if len(chunk):
+            tracker['last_id'] = int(chunk['ID_Asistencia'].iloc[-1])
+        yield chunk
+
+def _export_chunks(filename_suffix: str, fmt: str, chunksize: int, export_folder, since_id: int = None) -> tuple:
+    """
+    Exporta por bloques y devuelve (ruta o mensaje de error, último ID exportado o None).
+    """
+    if fmt not in EXPORT_FORMATS:
+        return f"Error: Formato de exportación no soportado: {fmt}", None
+
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return "Error: La exportación a Parquet requiere pyarrow (pip install pyarrow).", None
+
+    file_path = _export_file_path(filename_suffix, EXPORT_FORMATS[fmt], export_folder)
+    tracker = {'last_id': None}
+
+    try:
+        chunks = _track_last_id(iter_attendance_chunks(chunksize, since_id), tracker)
+        if fmt == "parquet":
+            rows = _write_parquet_chunks(chunks, file_path)
+        else:
+            rows = _write_csv_chunks(chunks, file_path, compressed=(fmt == "csv.gz"))
+    except Exception as e:
+        file_path.unlink(missing_ok=True)
+        return f"Error al exportar {fmt}: {e}", None
+
+    if rows == 0:
+        file_path.unlink(missing_ok=True)
+        return NO_DATA_MESSAGE, None
+    return str(file_path), tracker['last_id']
+
+def export_attendance_streaming(filename_suffix: str = "reporte", fmt: str = "csv",
+                                chunksize: int = REPORT_CHUNK_SIZE, export_folder=None,
+                                since_id: int = None) -> str:
+    """
+    Exporta la asistencia leyendo la DB por bloques y escribiéndolos directamente al archivo.
+
+    La memoria usada depende de `chunksize` y no del tamaño del historial.
+
+    Args:
+        filename_suffix (str): Sufijo para el nombre del archivo.
+        fmt (str): Uno de EXPORT_FORMATS ('csv', 'csv.gz' o 'parquet').
+        chunksize (int): Filas leídas de SQLite por bloque.
+        export_folder: Carpeta base (por defecto MAIN_EXPORT_FOLDER).
+        since_id (int): Si se indica, solo exporta asistencias con ID mayor.
+
+    Returns:
+        str: Ruta completa del archivo generado o mensaje de error.
+    """
+    result, _ = _export_chunks(filename_suffix, fmt, chunksize, export_folder, since_id)
+    return result
+
+# --- Exportación incremental (marca de agua) ---
+
+EXPORT_MODES = ("full", "delta")
+
+# Marca de agua compartida por la pestaña de reportes y la exportación desde la terminal
+DEFAULT_EXPORT_NAME = "asistencia_historico"
+
+def get_export_high_water_mark(name: str = DEFAULT_EXPORT_NAME):
+    """
+    Devuelve el estado de la última exportación registrada.
+
+    Returns:
+        ExportState o None si nunca se ha exportado con ese nombre.
+    """
+    session = Session()
+    try:
+        return session.get(ExportState, name)
+    finally:
+        session.close()
+
+def _save_export_high_water_mark(name: str, last_id: int):
+    session = Session()
+    try:
+        state = session.get(ExportState, name)
+        if state is None:
+            state = ExportState(name=name, last_attendance_id=last_id)
+            session.add(state)
+        state.last_attendance_id = last_id
+        state.exported_on = datetime.now()
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def export_attendance_incremental(mode: str = "delta", fmt: str = "csv", name: str = DEFAULT_EXPORT_NAME,
+                                  chunksize: int = REPORT_CHUNK_SIZE, export_folder=None) -> str:
+    """
+    Exporta la asistencia en modo completo o solo lo nuevo desde la última exportación.
+
+    La marca de agua (último Attendance.id exportado) se guarda en la tabla
+    estado_exportacion y solo avanza cuando el archivo se escribió correctamente.
+
+    Args:
+        mode (str): 'full' exporta todo el historial y reinicia la marca de agua;
+                    'delta' exporta solo las asistencias con ID mayor a la marca.
+        fmt (str): Uno de EXPORT_FORMATS.
+        name (str): Nombre de la exportación (permite varias sincronizaciones independientes).
+        chunksize (int): Filas leídas de SQLite por bloque.
+        export_folder: Carpeta base (por defecto MAIN_EXPORT_FOLDER).
+
+    Returns:
+        str: Ruta del archivo generado o mensaje de error (NO_DATA_MESSAGE si no hay filas nuevas).
+    """
+    if mode not in EXPORT_MODES:
+        return f"Error: Modo de exportación no soportado: {mode}"
+
+    since_id = None
+    if mode == "delta":
+        state = get_export_high_water_mark(name)
+        since_id = state.last_attendance_id if state else None
+
+    result, last_id = _export_chunks(f"{name}_{mode}", fmt, chunksize, export_folder, since_id)
+
+    if last_id is not None:
+        try:
+            _save_export_high_water_mark(name, last_id)
+        except Exception as e:
+            return f"Error al guardar la marca de agua de exportación: {e}"
+    return result
+
+# --- EXPORTACIÓN DESDE LA TERMINAL (ej: sincronización nocturna) ---
 if __name__ == '__main__':
-    print("--- Prueba de Reportes ---")
-    
-    # 1. Obtener los datos
-    df_reporte = get_attendance_data()
-    print(f"Registros de asistencia encontrados: {len(df_reporte)}")
-    
-    if not df_reporte.empty:
-        # 2. Exportar
-        export_result = export_attendance_to_csv(df_reporte, "asistencia_general")
-        print(f"Resultado de la exportación: {export_result}")
-    else:
-        print("No hay registros de asistencia en la base de datos para exportar.")
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Exporta la asistencia a la carpeta 'datos QR'.")
+    parser.add_argument("--modo", choices=EXPORT_MODES, default="full",
+                        help="full: todo el historial; delta: solo lo nuevo desde la última exportación")
+    parser.add_argument("--formato", choices=list(EXPORT_FORMATS), default="csv")
+    parser.add_argument("--nombre", default=DEFAULT_EXPORT_NAME, help="Nombre de la exportación (marca de agua)")
+    args = parser.parse_args()
+
+    print(f"--- Exportación de asistencia ({args.modo}, {args.formato}) ---")
+    export_result = export_attendance_incremental(args.modo, args.formato, args.nombre)
+    print(f"Resultado de la exportación: {export_result}")
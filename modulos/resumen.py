@@ -0,0 +1,133 @@
+# modulos/resumen.py
+
+import sys
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, delete, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+# Ajuste de PATH para importar módulos del proyecto
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modulos.utilidades import Session, Student, Attendance, DailySummary
+
+
+def _course_key(course) -> str:
+    """Clave de curso en el resumen ('' para alumnos sin curso)."""
+    return course or ''
+
+
+def increment_daily_summary(session, attendance_date, course_counts: dict):
+    """
+    Suma asistencias nuevas al resumen dentro de la transacción de `session`.
+
+    Args:
+        session: Sesión activa (la misma que inserta las asistencias).
+        attendance_date (date): Día de las asistencias.
+        course_counts (dict): {curso: cantidad} a sumar (o restar si es negativa).
+    """
+    for course, count in course_counts.items():
+        if not count:
+            continue
+        stmt = sqlite_insert(DailySummary).values(
+            attendance_date=attendance_date, course=_course_key(course), total=count
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailySummary.attendance_date, DailySummary.course],
+            set_={"total": DailySummary.total + stmt.excluded.total},
+        )
+        session.execute(stmt)
+
+
+def decrement_daily_summary(session, course, date_counts: dict):
+    """
+    Resta asistencias eliminadas del resumen (por ejemplo, al borrar un alumno).
+
+    Args:
+        session: Sesión activa (la misma que elimina las asistencias).
+        course (str): Curso del alumno.
+        date_counts (dict): {fecha: cantidad eliminada}.
+    """
+    for attendance_date, count in date_counts.items():
+        session.query(DailySummary).filter(
+            DailySummary.attendance_date == attendance_date,
+            DailySummary.course == _course_key(course),
+        ).update({DailySummary.total: DailySummary.total - count}, synchronize_session=False)
+    session.query(DailySummary).filter(DailySummary.total <= 0).delete(synchronize_session=False)
+
+
+def rebuild_daily_summary() -> int:
+    """
+    Recalcula todo el resumen diario a partir de la tabla asistencias.
+
+    Returns:
+        int: Número de filas (día, curso) en el resumen.
+    """
+    course = func.coalesce(Student.course, '')
+    summary_query = (
+        select(Attendance.attendance_date, course, func.count())
+        .join(Student, Student.matricula == Attendance.matricula)
+        .group_by(Attendance.attendance_date, course)
+    )
+    session = Session()
+    try:
+        session.execute(delete(DailySummary))
+        session.execute(
+            insert(DailySummary).from_select(["attendance_date", "course", "total"], summary_query)
+        )
+        session.commit()
+        return session.query(func.count()).select_from(DailySummary).scalar()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def get_dashboard_summary(today=None) -> dict:
+    """
+    Cifras del día y de la semana actual leídas del resumen (sin recorrer el historial).
+
+    Args:
+        today (date): Día de referencia (por defecto, hoy).
+
+    Returns:
+        dict: today_total, week_total, week_start y by_course [(curso, hoy, semana)].
+    """
+    today = today or datetime.now().date()
+    week_start = today - timedelta(days=today.weekday())   # Lunes de esta semana
+
+    session = Session()
+    try:
+        rows = (
+            session.query(DailySummary.attendance_date, DailySummary.course, DailySummary.total)
+            .filter(DailySummary.attendance_date >= week_start)
+            .filter(DailySummary.attendance_date <= today)
+            .all()
+        )
+    finally:
+        session.close()
+
+    by_course = {}
+    for attendance_date, course, total in rows:
+        today_count, week_count = by_course.get(course, (0, 0))
+        if attendance_date == today:
+            today_count += total
+        by_course[course] = (today_count, week_count + total)
+
+    return {
+        "today_total": sum(counts[0] for counts in by_course.values()),
+        "week_total": sum(counts[1] for counts in by_course.values()),
+        "week_start": week_start,
+        "by_course": sorted(
+            ((course or "N/A", today_count, week_count) for course, (today_count, week_count) in by_course.items()),
+            key=lambda row: (-row[1], -row[2], row[0]),
+        ),
+    }
+
+
+if __name__ == '__main__':
+    print("--- Reconstrucción del Resumen Diario ---")
+    rows = rebuild_daily_summary()
+    print(f"Resumen reconstruido: {rows} filas (día, curso).")
+    print(get_dashboard_summary())
@@ -1,18 +1,26 @@
 # modulos/utilidades.py
 
 import os
+import sys
 # Eliminamos import sqlite3, ya que SQLAlchemy lo maneja internamente
 from pathlib import Path
-from sqlalchemy import create_engine, Column, Integer, Text, Boolean, DateTime
+from sqlalchemy import create_engine, event, Column, Integer, Text, Boolean, DateTime, Date, Index, inspect, text
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
 
+# Ajuste de PATH para importar módulos del proyecto (necesario si se ejecuta solo)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modulos.configuracion import get_setting
+
 # --- Configuración de Rutas ---
 
 # Carpeta principal del proyecto
 PROJECT_ROOT = Path(__file__).parent.parent
-# Ruta a la DB: 'base_datos/asistencia.db'
-DB_PATH = PROJECT_ROOT / "base_datos" / "asistencia.db"
+# Ruta a la DB: 'base_datos/asistencia.db' (config.ini: [base_datos] ruta)
+DB_PATH = Path(get_setting("base_datos", "ruta", str(PROJECT_ROOT / "base_datos" / "asistencia.db")))
 
 def get_desktop_folder():
     """Busca y devuelve la ruta al Escritorio en sistemas Linux/Windows."""
@@ -32,8 +40,69 @@ MAIN_EXPORT_FOLDER = get_desktop_folder() / 'datos QR'
 # Crea el directorio si no existe (importante antes de conectar)
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
+# Perfiles de rendimiento de SQLite (se aplican como PRAGMA en cada conexión nueva).
+# Ambos usan WAL para que los lectores (reportes, lista de alumnos) no bloqueen
+# las escrituras del escaneo; difieren en cuánto se sincroniza a disco.
+DB_PROFILES = {
+    "durable": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",       # Cada commit se sincroniza a disco
+        "cache_size": -16000,        # ~16 MB (valor negativo = KiB)
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,        # ms de espera si la DB está bloqueada
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",     # Sin fsync por commit; WAL sigue siendo consistente
+        "cache_size": -64000,        # ~64 MB
+        "mmap_size": 268435456,      # 256 MB mapeados en memoria
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+# Perfil seleccionado en config.ini ([base_datos] perfil) o PROYECTIS_BASE_DATOS_PERFIL
+DB_PROFILE = get_setting("base_datos", "perfil", "fast")
+DB_POOL_SIZE = get_setting("base_datos", "pool_size", 5, int)
+
+def create_db_engine(db_path=DB_PATH, profile: str = DB_PROFILE, pool_size: int = DB_POOL_SIZE):
+    """
+    Crea un motor SQLite con el perfil de rendimiento indicado.
+
+    Args:
+        db_path: Ruta al archivo de la base de datos.
+        profile (str): Nombre del perfil en DB_PROFILES ('durable' o 'fast').
+        pool_size (int): Conexiones que el pool mantiene abiertas.
+
+    Returns:
+        Engine: Motor de SQLAlchemy con los PRAGMA aplicados en cada conexión.
+    """
+    if profile not in DB_PROFILES:
+        print(f"Advertencia: perfil de DB desconocido '{profile}'; se usa 'durable'.")
+        profile = "durable"
+    pragmas = DB_PROFILES[profile]
+
+    new_engine = create_engine(
+        f"sqlite:///{db_path}",
+        # Pool de conexiones compartidas entre hilos (GUI, escritor de asistencias, reportes)
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=pool_size * 2,
+        connect_args={"check_same_thread": False, "timeout": pragmas["busy_timeout"] / 1000},
+    )
+
+    @event.listens_for(new_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return new_engine
+
 # Define el motor de la base de datos
-engine = create_engine(f"sqlite:///{DB_PATH}")
+engine = create_db_engine()
 # Clase base para la definición de tablas (ORM)
 Base = declarative_base()
 # Generador de sesiones (para interactuar con la DB)
@@ -67,15 +136,161 @@ class Attendance(Base):
     student_id = Column(Integer, nullable=False) # ID del alumno (Clave foránea virtual)
     matricula = Column(Text, nullable=False) # Copia de la matrícula (para búsquedas rápidas)
     time_stamp = Column(DateTime, default=datetime.now)
+    # Día del registro (sin hora). Permite verificar duplicados con el índice único
+    attendance_date = Column(Date, nullable=False, default=lambda: datetime.now().date())
+
+    # Un solo registro por alumno y día: la verificación de duplicados es una búsqueda en el índice.
+    # AUTOINCREMENT: los IDs nunca se reutilizan tras borrar filas (la marca de agua
+    # de las exportaciones incrementales depende de que solo crezcan).
+    __table_args__ = (
+        Index('ux_asistencias_matricula_fecha', 'matricula', 'attendance_date', unique=True),
+        {'sqlite_autoincrement': True},
+    )
 
     def __repr__(self):
         return f"<Attendance(matricula='{self.matricula}', time='{self.time_stamp}')>"
 
 
+class ExportState(Base):
+    """Modelo ORM para la tabla estado_exportacion (marca de agua de exportaciones incrementales)"""
+    __tablename__ = 'estado_exportacion'
+
+    name = Column(Text, primary_key=True)                 # Nombre de la exportación (ej: 'asistencia_historico')
+    last_attendance_id = Column(Integer, nullable=False)  # Último Attendance.id exportado
+    exported_on = Column(DateTime, default=datetime.now)
+
+    def __repr__(self):
+        return f"<ExportState(name='{self.name}', last_id={self.last_attendance_id})>"
+
+
+class DailySummary(Base):
+    """Modelo ORM para la tabla resumen_diario (asistencias por día y curso, mantenida al registrar)"""
+    __tablename__ = 'resumen_diario'
+
+    attendance_date = Column(Date, primary_key=True)
+    course = Column(Text, primary_key=True)   # '' para alumnos sin curso
+    total = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailySummary(date='{self.attendance_date}', course='{self.course}', total={self.total})>"
+
+
+def migrate_attendance_date(bind=None):
+    """
+    Migra bases de datos existentes que no tienen la columna attendance_date.
+
+    Agrega la columna, la rellena a partir de time_stamp y crea el índice único
+    (matricula, attendance_date). Si la tabla ya tiene duplicados del mismo día
+    (registros anteriores a esta versión), se crea un índice normal en su lugar
+    para no perder datos.
+
+    Args:
+        bind: Motor de SQLAlchemy sobre el que migrar (por defecto, el global).
+    """
+    bind = bind if bind is not None else engine
+    inspector = inspect(bind)
+    if not inspector.has_table(Attendance.__tablename__):
+        return
+
+    columns = {col['name'] for col in inspector.get_columns(Attendance.__tablename__)}
+    indexes = {idx['name'] for idx in inspector.get_indexes(Attendance.__tablename__)}
+
+    with bind.begin() as conn:
+        if 'attendance_date' not in columns:
+            print("Migrando tabla asistencias: agregando columna attendance_date...")
+            conn.execute(text("ALTER TABLE asistencias ADD COLUMN attendance_date DATE"))
+            conn.execute(text("UPDATE asistencias SET attendance_date = date(time_stamp)"))
+
+        if 'ux_asistencias_matricula_fecha' not in indexes and 'ix_asistencias_matricula_fecha' not in indexes:
+            duplicates = conn.execute(text(
+                "SELECT 1 FROM asistencias GROUP BY matricula, attendance_date HAVING COUNT(*) > 1 LIMIT 1"
+            )).first()
+            if duplicates is None:
+                conn.execute(text(
+                    "CREATE UNIQUE INDEX ux_asistencias_matricula_fecha "
+                    "ON asistencias (matricula, attendance_date)"
+                ))
+            else:
+                print("Advertencia: existen asistencias duplicadas en un mismo día; se crea un índice no único.")
+                conn.execute(text(
+                    "CREATE INDEX ix_asistencias_matricula_fecha "
+                    "ON asistencias (matricula, attendance_date)"
+                ))
+
+
+def migrate_attendance_autoincrement(bind=None):
+    """
+    Reconstruye la tabla asistencias con AUTOINCREMENT si fue creada sin él.
+
+    Sin AUTOINCREMENT, SQLite reutiliza los IDs más altos después de borrar filas
+    (por ejemplo, al eliminar un alumno) y la exportación incremental por ID los
+    saltearía. La tabla se copia a una nueva con el esquema del modelo, se
+    recrean sus índices y la secuencia arranca por encima tanto del ID más alto
+    como de la marca de agua de exportación más alta.
+
+    Args:
+        bind: Motor de SQLAlchemy sobre el que migrar (por defecto, el global).
+    """
+    bind = bind if bind is not None else engine
+    inspector = inspect(bind)
+    if not inspector.has_table(Attendance.__tablename__):
+        return
+
+    with bind.connect() as conn:
+        table_sql = conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'asistencias'"
+        )).scalar()
+        if 'AUTOINCREMENT' in table_sql.upper():
+            return
+
+        print("Migrando tabla asistencias: IDs con AUTOINCREMENT...")
+        index_sqls = [sql for (sql,) in conn.execute(text(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = 'asistencias' AND sql IS NOT NULL"
+        ))]
+        columns = ", ".join(column.name for column in Attendance.__table__.columns)
+        new_table_sql = str(CreateTable(Attendance.__table__).compile(bind)).replace(
+            "CREATE TABLE asistencias", "CREATE TABLE asistencias_nueva", 1)
+
+        # El módulo sqlite3 no abre transacción antes de DDL: se abre explícitamente
+        # para que la reconstrucción sea todo o nada
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            conn.execute(text("DROP TABLE IF EXISTS asistencias_nueva"))
+            conn.execute(text(new_table_sql))
+            conn.execute(text(f"INSERT INTO asistencias_nueva ({columns}) SELECT {columns} FROM asistencias"))
+            conn.execute(text("DROP TABLE asistencias"))
+            conn.execute(text("ALTER TABLE asistencias_nueva RENAME TO asistencias"))
+            for index_sql in index_sqls:
+                conn.execute(text(index_sql))
+
+            # La secuencia no puede quedar por debajo de un ID ya exportado (pudo haberse borrado)
+            last_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM asistencias")).scalar()
+            if inspector.has_table(ExportState.__tablename__):
+                exported = conn.execute(text(
+                    "SELECT COALESCE(MAX(last_attendance_id), 0) FROM estado_exportacion"
+                )).scalar()
+                last_id = max(last_id, exported)
+            conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'asistencias'"))
+            conn.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('asistencias', :seq)"),
+                         {"seq": last_id})
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
 def setup_database():
     """Crea todas las tablas definidas si no existen en la DB."""
+    # Las tablas existentes deben migrarse antes de que create_all intente crear sus índices
+    migrate_attendance_date()
+    migrate_attendance_autoincrement()
+    summary_exists = inspect(engine).has_table(DailySummary.__tablename__)
     # Base.metadata.create_all(engine) crea *todas* las clases derivadas de Base (Student y Attendance).
     Base.metadata.create_all(engine)
+    if not summary_exists:
+        # Primera vez con la tabla de resumen: se calcula a partir del historial existente
+        from modulos.resumen import rebuild_daily_summary
+        rebuild_daily_summary()
     # Crea la carpeta principal de guardado si no existe en el Escritorio
     MAIN_EXPORT_FOLDER.mkdir(parents=True, exist_ok=True)
     print(f"Base de datos y carpetas de exportación configuradas.")